@@ -1,25 +1,142 @@
-from django.contrib import admin
-from .models import Category, Component, Beneficiary, Transaction
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db.transaction import atomic
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from . import payments, stats, stock
+from .models import Category, Component, Beneficiary, Transaction, Sale, EmailOutbox
+
+
+class RestockForm(forms.Form):
+    quantity = forms.IntegerField(min_value=1, help_text="Added to every selected component.")
+
+
+class DashboardStatsMixin:
+    """Rebuild the dashboard counters after admin edits and deletes, in the same transaction.
+
+    The app's own views adjust the counters incrementally; admin edits are rare
+    and can cascade, so they simply recount.
+    """
+
+    def save_model(self, request, obj, form, change):
+        with atomic():
+            super().save_model(request, obj, form, change)
+            stats.rebuild()
+
+    def delete_model(self, request, obj):
+        with atomic():
+            super().delete_model(request, obj)
+            stats.rebuild()
+
+    def delete_queryset(self, request, queryset):
+        # Used by the "Delete selected" action.
+        with atomic():
+            super().delete_queryset(request, queryset)
+            stats.rebuild()
+
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(DashboardStatsMixin, admin.ModelAdmin):
     list_display = ('name', 'description')
     search_fields = ('name',)
 
 @admin.register(Component)
-class ComponentAdmin(admin.ModelAdmin):
+class ComponentAdmin(DashboardStatsMixin, admin.ModelAdmin):
     list_display = ('serial_number', 'name', 'category', 'quantity', 'box_number', 'last_updated')
-    list_filter = ('category',)
+    list_filter = ('component_type', 'category')
+    list_select_related = ('category',)
     search_fields = ('name', 'serial_number', 'description')
+    autocomplete_fields = ('category',)
+    date_hierarchy = 'last_updated'
+    show_full_result_count = False
+    # Stock only moves through the restock action and the app, which log each change in the ledger.
+    readonly_fields = ('quantity',)
+    actions = ['restock']
+
+    @admin.action(description="Restock selected components", permissions=['change'])
+    def restock(self, request, queryset):
+        """Add the same quantity to every selected component with one UPDATE and one ledger row each."""
+        form = RestockForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            quantity = form.cleaned_data['quantity']
+            with atomic():
+                movements = stock.apply_movements([(component, quantity, None) for component in queryset],
+                                                  'RESTOCK', user=request.user)
+                stats.record_movements(movements)
+            self.message_user(request, f"Added {quantity} to {len(movements)} component(s).", messages.SUCCESS)
+            return None
+        return TemplateResponse(request, 'admin/inventory/component/restock.html', {
+            **self.admin_site.each_context(request),
+            'title': "Restock components",
+            'opts': self.model._meta,
+            'form': form,
+            'components': queryset,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
 
 @admin.register(Beneficiary)
-class BeneficiaryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'role', 'email', 'added_by')
-    list_filter = ('role',)
-    search_fields = ('name', 'email')
+class BeneficiaryAdmin(DashboardStatsMixin, admin.ModelAdmin):
+    list_display = ('name', 'category', 'email', 'added_by')
+    list_filter = ('category',)
+    list_select_related = ('added_by',)
+    search_fields = ('name', 'email', 'student_id', 'employee_id')
+    autocomplete_fields = ('added_by',)
+    show_full_result_count = False
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
-    list_display = ('component', 'borrower', 'quantity_taken', 'checkout_time', 'return_time', 'authorized_by')
+class TransactionAdmin(DashboardStatsMixin, admin.ModelAdmin):
+    list_display = ('component', 'borrower', 'quantity_taken', 'checkout_time', 'due_at', 'return_time', 'authorized_by')
     list_filter = ('return_time', 'checkout_time')
+    list_select_related = ('component', 'borrower', 'authorized_by')
     search_fields = ('component__name', 'borrower__name')
+    autocomplete_fields = ('component', 'borrower', 'authorized_by')
+    date_hierarchy = 'checkout_time'
+    show_full_result_count = False
+    actions = ['mark_returned']
+
+    @admin.action(description="Mark selected loans as returned", permissions=['change'])
+    def mark_returned(self, request, queryset):
+        """Close the open loans with one UPDATE and restock them with one more, logging each return.
+
+        Unlike the return form, no confirmation emails are queued.
+        """
+        with atomic():
+            # Lock through a subquery so the changelist's joins aren't locked too.
+            loans = list(
+                Transaction.objects.open().filter(pk__in=queryset.values('pk'))
+                .select_related('component').select_for_update(of=('self',)).order_by('pk')
+            )
+            if loans:
+                returned_at = timezone.now()
+                Transaction.objects.filter(pk__in=[loan.pk for loan in loans]).update(return_time=returned_at)
+                movements = stock.apply_movements([(loan.component, loan.quantity_taken, loan) for loan in loans],
+                                                  'RETURN', user=request.user)
+                stats.record_movements(movements, active_checkouts=-len(loans))
+        self.message_user(request, f"Marked {len(loans)} loan(s) as returned.", messages.SUCCESS)
+
+@admin.register(Sale)
+class SaleAdmin(DashboardStatsMixin, admin.ModelAdmin):
+    list_display = ('component', 'buyer', 'quantity_sold', 'total_price', 'is_paid', 'sale_time', 'authorized_by')
+    list_filter = ('is_paid',)
+    list_select_related = ('component', 'buyer', 'authorized_by')
+    search_fields = ('component__name', 'buyer__name')
+    autocomplete_fields = ('component', 'buyer', 'authorized_by')
+    date_hierarchy = 'sale_time'
+    show_full_result_count = False
+    actions = ['mark_paid']
+
+    @admin.action(description="Mark selected sales as paid", permissions=['change'])
+    def mark_paid(self, request, queryset):
+        count, amount = payments.mark_paid(queryset)
+        self.message_user(request, f"Marked {count} sale(s) paid (₹{amount}).", messages.SUCCESS)
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    date_hierarchy = 'created_at'
+    show_full_result_count = False
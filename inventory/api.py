@@ -0,0 +1,194 @@
+"""Read-only JSON API (v1) over components, categories, loans and sales.
+
+Each resource is declared as a model, the fields a client may request and
+a keyset ordering. ``?fields=id,name,quantity`` narrows the output, and
+only the columns behind those fields, plus the joins they need, are
+selected through ``only()`` and ``select_related()``. List pages use the
+same opaque cursors as the HTML views (``?cursor=``, ``?limit=``) and are
+written as compact JSON.
+
+Every response carries an ETag. For components and categories it is
+derived from the catalogue version, so a client polling an unchanged
+catalogue gets a 304 after a single primary-key lookup. Loans and sales
+have no such counter and are hashed after rendering, which still spares
+the client the download.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.fields.files import FieldFile
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import urlencode
+
+from . import catalogue_cache
+from .models import Category, Component, Sale, Transaction
+from .pagination import decode_cursor, keyset_paginate
+
+VERSION = 'v1'
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidRequest(ValueError):
+    pass
+
+
+class Resource:
+    def __init__(self, model, fields, ordering, staff_only=False, version=None):
+        self.model = model
+        # Public field name -> model path; ``__`` follows a foreign key.
+        self.fields = fields
+        self.ordering = ordering
+        self.staff_only = staff_only
+        self.version = version
+
+    def queryset(self, fields):
+        """Rows loading just the columns behind ``fields`` (and the ordering)."""
+        paths = {self.fields[name] for name in fields} | {field.lstrip('-') for field in self.ordering}
+        related = {path.rsplit('__', 1)[0] for path in paths if '__' in path}
+        return self.model.objects.select_related(*related).only(*paths)
+
+    def serialize(self, obj, fields):
+        return {name: _value(obj, self.fields[name]) for name in fields}
+
+
+RESOURCES = {
+    'components': Resource(Component, {
+        'id': 'id',
+        'serial_number': 'serial_number',
+        'name': 'name',
+        'category': 'category_id',
+        'category_name': 'category__name',
+        'component_type': 'component_type',
+        'quantity': 'quantity',
+        'reorder_level': 'reorder_level',
+        'box_number': 'box_number',
+        'location': 'location',
+        'description': 'description',
+        'datasheet_link': 'datasheet_link',
+        'image': 'image',
+        'last_updated': 'last_updated',
+    }, ordering=('id',), version=catalogue_cache.version),
+    'categories': Resource(Category, {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+    }, ordering=('id',), version=catalogue_cache.version),
+    'transactions': Resource(Transaction, {
+        'id': 'id',
+        'component': 'component_id',
+        'component_name': 'component__name',
+        'borrower': 'borrower_id',
+        'borrower_name': 'borrower__name',
+        'quantity_taken': 'quantity_taken',
+        'checkout_time': 'checkout_time',
+        'return_time': 'return_time',
+        'notes': 'notes',
+    }, ordering=('-id',), staff_only=True),
+    'sales': Resource(Sale, {
+        'id': 'id',
+        'component': 'component_id',
+        'component_name': 'component__name',
+        'buyer': 'buyer_id',
+        'buyer_name': 'buyer__name',
+        'quantity_sold': 'quantity_sold',
+        'price_per_unit': 'price_per_unit',
+        'total_price': 'total_price',
+        'is_paid': 'is_paid',
+        'sale_time': 'sale_time',
+        'notes': 'notes',
+    }, ordering=('-id',), staff_only=True),
+}
+
+
+def _value(obj, path):
+    for attr in path.split('__'):
+        if obj is None:
+            # A nullable foreign key (e.g. a loan whose borrower was removed).
+            return None
+        obj = getattr(obj, attr)
+    if isinstance(obj, FieldFile):
+        return obj.url if obj else None
+    return obj
+
+
+def parse_fields(resource, raw):
+    """Field names from ``?fields=``, every field when absent."""
+    if not raw:
+        return list(resource.fields)
+    requested = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in requested if name not in resource.fields]
+    if unknown or not requested:
+        raise InvalidRequest(f"Unknown field(s): {', '.join(unknown) or raw}. Available: {', '.join(resource.fields)}.")
+    return requested
+
+
+def parse_limit(raw):
+    if not raw:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise InvalidRequest("limit must be a whole number.")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise InvalidRequest(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    return limit
+
+
+def _dumps(payload):
+    return json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def _respond(request, resource, build):
+    """JSON response with an ETag; ``build()`` is skipped when a versioned ETag still matches."""
+    if resource.version is not None:
+        digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        etag = f'"{VERSION}-{resource.version()}-{digest}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            payload = build()
+            if payload is None:
+                return JsonResponse({'error': 'Not found.'}, status=404)
+            response = HttpResponse(_dumps(payload), content_type='application/json')
+    else:
+        payload = build()
+        if payload is None:
+            return JsonResponse({'error': 'Not found.'}, status=404)
+        content = _dumps(payload)
+        etag = '"%s"' % hashlib.md5(content.encode()).hexdigest()
+        response = get_conditional_response(request, etag=etag) or HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def list_response(request, resource):
+    """One cursor page of ``resource``; raises InvalidRequest or InvalidCursor on bad parameters."""
+    fields = parse_fields(resource, request.GET.get('fields'))
+    limit = parse_limit(request.GET.get('limit'))
+    cursor = request.GET.get('cursor') or None
+    if cursor:
+        decode_cursor(cursor, resource.ordering, resource.model)
+
+    def build():
+        page = keyset_paginate(resource.queryset(fields), resource.ordering, cursor, limit)
+        next_url = None
+        if page.has_next:
+            params = {name: request.GET[name] for name in ('fields', 'limit') if request.GET.get(name)}
+            params['cursor'] = page.next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{urlencode(params)}")
+        return {'results': [resource.serialize(obj, fields) for obj in page], 'next': next_url}
+
+    return _respond(request, resource, build)
+
+
+def detail_response(request, resource, pk):
+    fields = parse_fields(resource, request.GET.get('fields'))
+
+    def build():
+        obj = resource.queryset(fields).filter(pk=pk).first()
+        return None if obj is None else resource.serialize(obj, fields)
+
+    return _respond(request, resource, build)
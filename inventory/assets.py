@@ -0,0 +1,185 @@
+"""Self-hosted front-end assets.
+
+Bootstrap, Font Awesome and the Inter font are pinned here and fetched by
+``manage.py vendor_assets`` into ``inventory/static/inventory/vendor``,
+where they are committed. Pages then load nothing from other origins,
+which matters on the lab LAN where the internet link is slow or down.
+``collectstatic`` fingerprints and pre-compresses them like any other
+static file, and WhiteNoise serves the fingerprinted names with
+far-future, immutable caching. ``inter.css`` is written by the command
+together with the fonts it names, because the manifest storage refuses a
+stylesheet whose ``url()`` targets are missing.
+
+Font Awesome is cut down to the icons the templates actually use:
+``subset_fontawesome()`` keeps the framework rules and only the icon
+rules whose names appear in a template, and when fontTools is installed
+the webfont is trimmed to the same glyphs. Re-run the command after
+using a new icon.
+"""
+import re
+import urllib.request
+from io import BytesIO
+from pathlib import Path
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    font_subset = None
+
+APP_DIR = Path(__file__).resolve().parent
+VENDOR_DIR = APP_DIR / 'static' / 'inventory' / 'vendor'
+SOURCE_DIRS = [APP_DIR / 'templates', APP_DIR / 'static' / 'inventory' / 'js']
+
+BOOTSTRAP_VERSION = '5.3.2'
+FONTAWESOME_VERSION = '6.4.0'
+INTER_VERSION = '5.0.8'
+INTER_WEIGHTS = (400, 500, 600, 700)
+
+_BOOTSTRAP = f'https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist'
+_FONTAWESOME = f'https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@{FONTAWESOME_VERSION}'
+_INTER = f'https://cdn.jsdelivr.net/npm/@fontsource/inter@{INTER_VERSION}/files'
+
+# Vendored path -> source URL.
+DOWNLOADS = {
+    'bootstrap/bootstrap.min.css': f'{_BOOTSTRAP}/css/bootstrap.min.css',
+    'bootstrap/bootstrap.bundle.min.js': f'{_BOOTSTRAP}/js/bootstrap.bundle.min.js',
+    **{f'inter/inter-latin-{weight}-normal.woff2': f'{_INTER}/inter-latin-{weight}-normal.woff2' for weight in INTER_WEIGHTS},
+}
+FONTAWESOME_CSS_URL = f'{_FONTAWESOME}/css/all.min.css'
+# The templates only use the solid style; its rules reference ../webfonts/.
+FONTAWESOME_FONTS = ['fa-solid-900.woff2']
+FONTAWESOME_SUBSET = 'fontawesome/css/fontawesome.subset.css'
+INTER_CSS = 'inter/inter.css'
+INTER_UNICODE_RANGE = ('U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, '
+                       'U+0329, U+2000-206F, U+2074, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD')
+
+ICON_NAME = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)')
+ICON_SELECTOR = re.compile(r'^\.fa-([a-z0-9-]+):{1,2}(?:before|after)$')
+ICON_CONTENT = re.compile(r'content:\s*"\\([0-9a-f]+)"')
+FONT_URL = re.compile(r'url\((?P<quote>["\']?)\.\./webfonts/(?P<name>[^"\')]+)(?P=quote)\)\s*format\([^)]*\)')
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+# Django's manifest storage follows these comments and fails on the missing .map files.
+SOURCE_MAP = re.compile(r'\s*/[/*]# sourceMappingURL=[^\n]*?(?:\*/)?\s*$', re.M)
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+def used_icons(directories=SOURCE_DIRS):
+    """Every ``fa-*`` class named in the templates and scripts."""
+    names = set()
+    for directory in directories:
+        if not directory.is_dir():
+            continue
+        for path in directory.rglob('*'):
+            if path.suffix in ('.html', '.js') and path.is_file():
+                names.update(ICON_NAME.findall(path.read_text(encoding='utf-8')))
+    return names
+
+
+def _blocks(css):
+    """Top-level ``(prelude, body)`` pairs of a stylesheet; nested @-rule bodies stay intact."""
+    blocks, depth, start, prelude_end = [], 0, 0, None
+    for index, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude_end = index
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((css[start:prelude_end].strip(), css[prelude_end + 1:index]))
+                start = index + 1
+    return blocks
+
+
+def _font_face(body, fonts):
+    """``body`` with only the vendored woff2 sources left, or None when it has none."""
+    sources = [m.group(0) for m in FONT_URL.finditer(body) if m.group('name') in fonts]
+    if not sources:
+        return None
+    return re.sub(r'src:[^;}]*', 'src:' + ','.join(sources), body, count=1)
+
+
+def subset_fontawesome(css, icons, fonts=FONTAWESOME_FONTS):
+    """Font Awesome CSS with only the icon rules for ``icons``; returns (css, codepoints)."""
+    kept, codepoints = [], set()
+    for prelude, body in _blocks(COMMENT.sub('', css)):
+        if prelude == '@font-face':
+            body = _font_face(body, fonts)
+            if body is None:
+                continue
+        else:
+            selectors = [selector.strip() for selector in prelude.split(',')]
+            matches = [ICON_SELECTOR.match(selector) for selector in selectors]
+            if all(matches):
+                selectors = [s for s, m in zip(selectors, matches) if m.group(1) in icons]
+                if not selectors:
+                    continue
+                prelude = ','.join(selectors)
+                codepoints.update(int(value, 16) for value in ICON_CONTENT.findall(body))
+        kept.append(f'{prelude}{{{body}}}')
+    header = f'/* Font Awesome Free {FONTAWESOME_VERSION} (CSS: MIT, fonts: SIL OFL 1.1), subset by manage.py vendor_assets. */\n'
+    return header + ''.join(kept) + '\n', codepoints
+
+
+def subset_font(data, codepoints):
+    """A woff2 font cut down to ``codepoints``; unchanged when fontTools is unavailable."""
+    if font_subset is None or not codepoints:
+        return data
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    font = font_subset.load_font(BytesIO(data), options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = BytesIO()
+    font_subset.save_font(font, out, options)
+    return out.getvalue()
+
+
+def inter_css(weights=INTER_WEIGHTS):
+    faces = [
+        "@font-face {\n"
+        "    font-family: 'Inter';\n"
+        "    font-style: normal;\n"
+        f"    font-weight: {weight};\n"
+        "    font-display: swap;\n"
+        f"    src: url(inter-latin-{weight}-normal.woff2) format('woff2');\n"
+        f"    unicode-range: {INTER_UNICODE_RANGE};\n"
+        "}\n"
+        for weight in weights
+    ]
+    header = f'/* Inter {INTER_VERSION} (SIL Open Font License 1.1), latin subset from @fontsource/inter, written by manage.py vendor_assets. */\n'
+    return header + '\n'.join(faces)
+
+
+def _write(relative, content, vendor_dir):
+    path = vendor_dir / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    path.write_bytes(content)
+    return len(content)
+
+
+def vendor(vendor_dir=VENDOR_DIR, fetch=fetch, icons=None):
+    """Download every pinned asset and write the Font Awesome subset; returns {path: bytes written}."""
+    written = {}
+    for relative, url in DOWNLOADS.items():
+        content = fetch(url)
+        if relative.endswith(('.css', '.js')):
+            content = SOURCE_MAP.sub('', content.decode('utf-8')) + '\n'
+        written[relative] = _write(relative, content, vendor_dir)
+    written[INTER_CSS] = _write(INTER_CSS, inter_css(), vendor_dir)
+
+    icons = used_icons() if icons is None else icons
+    css, codepoints = subset_fontawesome(fetch(FONTAWESOME_CSS_URL).decode('utf-8'), icons)
+    written[FONTAWESOME_SUBSET] = _write(FONTAWESOME_SUBSET, css, vendor_dir)
+    for name in FONTAWESOME_FONTS:
+        relative = f'fontawesome/webfonts/{name}'
+        written[relative] = _write(relative, subset_font(fetch(f'{_FONTAWESOME}/webfonts/{name}'), codepoints), vendor_dir)
+    return written
@@ -0,0 +1,237 @@
+"""Deterministic benchmark data and a view benchmark driven by the test client.
+
+``seed()`` fills the database with a fixed, seed-determined catalogue,
+beneficiaries, loans and sales, so two runs with the same arguments
+produce the same rows. ``run()`` requests a fixed set of views through
+``django.test.Client`` and reports latency percentiles and query counts.
+With ``asgi=True`` the same requests go through ``AsyncClient`` and the
+ASGI handler instead, which is how the uvicorn deployment serves them.
+The JSON output can be diffed between commits or between the two
+handlers. Both functions back the ``seed_benchmark_data`` and ``bench``
+management commands.
+"""
+import datetime
+import math
+import random
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.transaction import atomic, set_rollback
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import catalogue_cache, stats
+from .models import Beneficiary, BeneficiaryIdentifier, Category, Component, Sale, Transaction
+from .search import refresh_search_vectors
+
+SERIAL_PREFIX = 'BENCH-'
+BENEFICIARY_ROLE = 'benchmark'
+BATCH_SIZE = 2000
+# Fixed so generated timestamps don't depend on when the seed ran.
+EPOCH = datetime.datetime(2025, 1, 1, 9, 0, tzinfo=datetime.timezone.utc)
+
+CATEGORIES = [
+    'Sensors', 'Motors', 'Microcontrollers', 'Power', 'Displays', 'Communication',
+    'Passives', 'Connectors', 'Tools', 'Mechanical', 'Robotics Kits', 'Cameras',
+]
+PARTS = [
+    'Ultrasonic Sensor', 'Servo Motor', 'Stepper Driver', 'Arduino Uno', 'ESP32 DevKit', 'Raspberry Pi',
+    'LiPo Battery', 'Buck Converter', 'OLED Display', 'LCD 16x2', 'Bluetooth Module', 'LoRa Module',
+    'Resistor Pack', 'Capacitor Kit', 'Jumper Wires', 'Breadboard', 'IMU', 'Line Follower Array',
+    'Gear Motor', 'Relay Board', 'Camera Module', 'Soldering Iron', 'Wheel Set', 'Chassis Kit',
+]
+FIRST_NAMES = ['Asha', 'Ravi', 'Meera', 'Arjun', 'Fatima', 'John', 'Priya', 'Rahul', 'Sneha', 'Vikram', 'Anu', 'Joseph']
+LAST_NAMES = ['Nair', 'Menon', 'Kumar', 'Thomas', 'Rao', 'Pillai', 'Khan', 'Das', 'Iyer', 'George']
+
+DEFAULT_COUNTS = {
+    'components': 20000,
+    'beneficiaries': 3000,
+    'transactions': 60000,
+    'sales': 20000,
+}
+
+
+def reset():
+    """Delete rows created by an earlier seed (loans and sales cascade)."""
+    Component.objects.filter(serial_number__startswith=SERIAL_PREFIX).delete()
+    Beneficiary.objects.filter(role=BENEFICIARY_ROLE).delete()
+
+
+def _when(rng, days=365):
+    return EPOCH + datetime.timedelta(seconds=rng.randrange(days * 86400))
+
+
+def _create(model, rows):
+    created = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        created.extend(model.objects.bulk_create(rows[start:start + BATCH_SIZE]))
+    return created
+
+
+def seed(components, beneficiaries, transactions, sales, seed=0):
+    """Create the given volumes of benchmark rows; returns the counts created.
+
+    Raises ValueError if an earlier seed's rows are still there: their serial
+    numbers and IDs would collide, so they have to be reset first.
+    """
+    if (Component.objects.filter(serial_number__startswith=SERIAL_PREFIX).exists()
+            or Beneficiary.objects.filter(role=BENEFICIARY_ROLE).exists()):
+        raise ValueError("Benchmark data is already seeded; pass --reset to replace it.")
+    rng = random.Random(seed)
+    staff = User.objects.filter(is_staff=True).order_by('pk').first()
+    with atomic():
+        categories = [Category.objects.get_or_create(name=name)[0] for name in CATEGORIES]
+
+        parts = _create(Component, [
+            Component(
+                serial_number=f"{SERIAL_PREFIX}{i:06d}",
+                name=f"{rng.choice(PARTS)} {rng.choice('ABCDEFGH')}{rng.randrange(100)}",
+                category=rng.choice(categories),
+                component_type='KIT' if rng.random() < 0.05 else 'GENERAL',
+                box_number=f"B{rng.randrange(400):03d}",
+                quantity=rng.choice([0, 1, 2, 3, 5]) if rng.random() < 0.1 else rng.randrange(6, 250),
+                location=f"Rack {rng.randrange(1, 21)}",
+                description=f"Benchmark part {i}",
+            )
+            for i in range(components)
+        ])
+
+        people = []
+        for i in range(beneficiaries):
+            category = rng.choices(['Student', 'Employee', 'Intern', 'Other'], weights=[70, 20, 6, 4])[0]
+            people.append(Beneficiary(
+                name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                category=category,
+                student_id=f"BS{i:06d}" if category == 'Student' else None,
+                stream=rng.choice(['BCA', 'AI & Robotics']) if category == 'Student' else None,
+                employee_id=f"BE{i:06d}" if category == 'Employee' else None,
+                phone_number=f"9{rng.randrange(10 ** 9):09d}",
+                role=BENEFICIARY_ROLE,
+            ))
+        people = _create(Beneficiary, people)
+        # bulk_create skips the post_save signal that maintains the lookup table.
+        _create(BeneficiaryIdentifier, [
+            BeneficiaryIdentifier(beneficiary=person, kind=kind, value=value)
+            for person in people
+            for kind, value in (('EMPLOYEE', person.employee_id), ('STUDENT', person.student_id)) if value
+        ])
+
+        loans, loan_times = [], []
+        for _ in range(transactions if parts and people else 0):
+            taken = _when(rng)
+            returned = taken + datetime.timedelta(hours=rng.randrange(1, 24 * 30)) if rng.random() < 0.9 else None
+            loans.append(Transaction(component=rng.choice(parts), borrower=rng.choice(people),
+                                     authorized_by=staff, quantity_taken=rng.randrange(1, 4)))
+            loan_times.append((taken, returned))
+        loans = _create(Transaction, loans)
+        # auto_now_add overwrote the times on insert, and due_at defaulted from "now";
+        # bulk_update writes them as given.
+        loan_period = datetime.timedelta(days=settings.LOAN_PERIOD_DAYS)
+        for loan, (taken, returned) in zip(loans, loan_times):
+            loan.checkout_time, loan.return_time, loan.due_at = taken, returned, taken + loan_period
+        Transaction.objects.bulk_update(loans, ['checkout_time', 'return_time', 'due_at'], batch_size=BATCH_SIZE)
+
+        receipts, sale_times = [], []
+        for _ in range(sales if parts and people else 0):
+            quantity = rng.randrange(1, 5)
+            price = rng.randrange(10, 2000)
+            receipts.append(Sale(component=rng.choice(parts), buyer=rng.choice(people), authorized_by=staff,
+                                 quantity_sold=quantity, price_per_unit=price, total_price=price * quantity,
+                                 is_paid=rng.random() < 0.8))
+            sale_times.append(_when(rng))
+        receipts = _create(Sale, receipts)
+        for sale, sold in zip(receipts, sale_times):
+            sale.sale_time = sold
+        Sale.objects.bulk_update(receipts, ['sale_time'], batch_size=BATCH_SIZE)
+
+        refresh_search_vectors(Component.objects.filter(serial_number__startswith=SERIAL_PREFIX))
+        stats.rebuild()
+        catalogue_cache.bump()
+    return {'components': len(parts), 'beneficiaries': len(people), 'transactions': len(loans), 'sales': len(receipts)}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def targets():
+    """(name, method, url, data) for every benchmarked view."""
+    component = Component.objects.filter(quantity__gt=0).order_by('pk').first()
+    person = Beneficiary.objects.filter(identifiers__isnull=False).order_by('-pk').first()
+    if component is None or person is None:
+        raise ValueError("Seed some data first (manage.py seed_benchmark_data).")
+    identifier = person.identifiers.values_list('value', flat=True).first()
+    return [
+        ('dashboard', 'get', reverse('dashboard'), None),
+        ('component_detail', 'get', reverse('component_detail', args=[component.pk]), None),
+        ('component_list', 'get', reverse('component_list'), None),
+        ('component_list_search', 'get', reverse('component_list'), {'q': component.name.split()[0]}),
+        ('sale_list', 'get', reverse('sale_list'), None),
+        ('beneficiary_detail', 'get', reverse('beneficiary_detail', args=[person.pk]), None),
+        ('checkout_component', 'get', reverse('checkout_component', args=[component.pk]), None),
+        ('checkout_component_post', 'post', reverse('checkout_component', args=[component.pk]),
+         {'borrower_id': identifier, 'quantity_taken': 1, 'notes': 'benchmark'}),
+        ('get_beneficiary_data', 'get', reverse('get_beneficiary_data', args=[identifier]), None),
+    ]
+
+
+def _timed(client, method, url, data):
+    send = getattr(client, method)
+    if isinstance(client, AsyncClient):
+        # Each request gets its own event loop; sync views and ORM calls run
+        # on this thread, so the rollback below still covers them.
+        send = async_to_sync(send)
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        if method == 'post':
+            # Measure the write path without keeping what it writes.
+            with atomic():
+                response = send(url, data)
+                set_rollback(True)
+        else:
+            response = send(url, data)
+        elapsed = time.perf_counter() - start
+    return response.status_code, elapsed, len(queries)
+
+
+def run(user, iterations=20, warmup=2, asgi=False):
+    """Benchmark every target view as ``user``; returns a JSON-ready dict."""
+    client = AsyncClient() if asgi else Client()
+    client.force_login(user)
+    results = {}
+    for name, method, url, data in targets():
+        timings, query_counts, statuses = [], [], set()
+        for i in range(warmup + iterations):
+            status, elapsed, query_count = _timed(client, method, url, data)
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+                query_counts.append(query_count)
+                statuses.add(status)
+        results[name] = {
+            'url': url,
+            'method': method.upper(),
+            'status': sorted(statuses),
+            'runs': iterations,
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries': max(query_counts),
+        }
+    return {
+        'database': connection.vendor,
+        'handler': 'asgi' if asgi else 'wsgi',
+        'rows': {
+            'components': Component.objects.count(),
+            'beneficiaries': Beneficiary.objects.count(),
+            'transactions': Transaction.objects.count(),
+            'sales': Sale.objects.count(),
+        },
+        'views': results,
+    }
@@ -0,0 +1,81 @@
+"""Cached public catalogue pages with conditional GET.
+
+Anonymous pages are rendered once per catalogue version and search, facet
+and cursor query, then served from the cache. The version is a counter on the
+DashboardStats row. Any change to a component or category increments it
+in the same database transaction, so every worker process sees the new
+version exactly when the change becomes visible. Pages cached under an
+older version are never read again and simply expire. Responses carry an
+ETag built from the version and a Last-Modified of the time the version
+was bumped. Each bump moves that time at least a second past the previous
+one, so an If-Modified-Since sent for an older version never matches a
+newer one. A revalidating browser or health check gets a 304 after a
+single primary-key lookup.
+"""
+import datetime
+import hashlib
+from urllib.parse import urlencode
+
+from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import DateTimeField, F
+from django.db.models.functions import Greatest, Now
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from . import facets, stats
+from .models import DashboardStats
+
+PAGE_TIMEOUT = 60 * 60
+
+
+def state():
+    """``(catalogue_version, catalogue_modified)`` in one primary-key lookup."""
+    current = (DashboardStats.objects.filter(pk=DashboardStats.SINGLETON_PK)
+               .values_list('catalogue_version', 'catalogue_modified').first())
+    if current is None:
+        snapshot = stats.rebuild()
+        current = snapshot.catalogue_version, snapshot.catalogue_modified
+    return current
+
+
+def version():
+    return state()[0]
+
+
+def bump():
+    """Invalidate every cached page; call inside the transaction making the change."""
+    DashboardStats.objects.filter(pk=DashboardStats.SINGLETON_PK).update(
+        catalogue_version=F('catalogue_version') + 1,
+        # Last-Modified has whole-second precision; two versions must never share a second.
+        catalogue_modified=Greatest(Now(), F('catalogue_modified') + datetime.timedelta(seconds=1),
+                                    output_field=DateTimeField()),
+    )
+
+
+def cached_page(request, template, get_context):
+    """Render ``template`` with ``get_context(request)`` for an anonymous visitor, from cache when possible."""
+    if len(messages.get_messages(request)):
+        # Flash messages belong to this visitor only; never cache them.
+        return HttpResponse(render_to_string(template, get_context(request), request))
+
+    current, modified = state()
+    params = urlencode([(name, request.GET.get(name, '')) for name in ('q', 'cursor', *facets.PARAMS)])
+    digest = hashlib.md5(f"{template}?{params}".encode()).hexdigest()
+    etag = f'"{current}-{digest}"'
+    last_modified = int(modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        key = f"catalogue-page:{current}:{digest}"
+        content = cache.get(key)
+        if content is None:
+            content = render_to_string(template, get_context(request), request)
+            cache.set(key, content, PAGE_TIMEOUT)
+        response = HttpResponse(content)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,131 @@
+"""Streaming CSV exports of sales, transactions and stock.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a
+server-side cursor on PostgreSQL) and encoded one at a time, so an export of
+any size holds only one chunk of rows in memory. Under ASGI the same rows
+come from ``aiterator()`` instead, because the ASGI handler would read a
+sync iterator to the end before sending the first byte.
+"""
+import csv
+import datetime
+
+from django.utils import timezone
+
+from .models import Component, Sale, Transaction
+
+CHUNK_SIZE = 2000
+
+
+def _time(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def _person(username, first_name, last_name):
+    return f"{first_name} {last_name}".strip() or username or ''
+
+
+def _date_range(queryset, field, start=None, end=None):
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': _day_start(start)})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lt': _day_start(end + datetime.timedelta(days=1))})
+    return queryset
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+SALES_HEADER = ['Sale ID', 'Sale Time', 'Serial Number', 'Component', 'Buyer', 'Buyer Category', 'Quantity',
+                'Price per Unit', 'Total Price', 'Paid', 'Authorized By', 'Notes']
+TRANSACTIONS_HEADER = ['Transaction ID', 'Checkout Time', 'Return Time', 'Serial Number', 'Component', 'Borrower',
+                       'Borrower Category', 'Quantity', 'Authorized By', 'Notes']
+STOCK_HEADER = ['Serial Number', 'Name', 'Category', 'Type', 'Box', 'Location', 'Quantity', 'Last Updated']
+
+
+def _sales(start=None, end=None, is_paid=None):
+    sales = _date_range(Sale.objects.all(), 'sale_time', start, end)
+    if is_paid is not None:
+        sales = sales.filter(is_paid=is_paid)
+    return sales.order_by('sale_time', 'id').values_list(
+        'id', 'sale_time', 'component__serial_number', 'component__name', 'buyer__name', 'buyer__category',
+        'quantity_sold', 'price_per_unit', 'total_price', 'is_paid',
+        'authorized_by__username', 'authorized_by__first_name', 'authorized_by__last_name', 'notes', named=True,
+    )
+
+
+def _sale_row(pk, sale_time, serial, component, buyer, buyer_category, quantity, price, total, paid,
+              username, first_name, last_name, notes):
+    return [pk, _time(sale_time), serial, component, buyer or 'Unknown', buyer_category or '', quantity,
+            price, total, 'Yes' if paid else 'No', _person(username, first_name, last_name), notes or '']
+
+
+def _transactions(start=None, end=None, **filters):
+    transactions = _date_range(Transaction.objects.all(), 'checkout_time', start, end)
+    return transactions.order_by('checkout_time', 'id').values_list(
+        'id', 'checkout_time', 'return_time', 'component__serial_number', 'component__name',
+        'borrower__name', 'borrower__category', 'quantity_taken',
+        'authorized_by__username', 'authorized_by__first_name', 'authorized_by__last_name', 'notes', named=True,
+    )
+
+
+def _transaction_row(pk, checkout_time, return_time, serial, component, borrower, borrower_category, quantity,
+                     username, first_name, last_name, notes):
+    return [pk, _time(checkout_time), _time(return_time), serial, component, borrower or 'Unknown',
+            borrower_category or '', quantity, _person(username, first_name, last_name), notes or '']
+
+
+def _stock(**filters):
+    return Component.objects.order_by('name', 'id').values_list(
+        'serial_number', 'name', 'category__name', 'component_type', 'box_number', 'location', 'quantity',
+        'last_updated', named=True,
+    )
+
+
+def _stock_row(serial, name, category, component_type, box, location, quantity, updated):
+    return [serial, name, category, component_type, box or '', location, quantity, _time(updated)]
+
+
+# kind -> (header, queryset of value tuples for the filters, tuple -> CSV row). The querysets use
+# named=True because Django runs a plain values_list() query as soon as it is iterated, which
+# aiterator() can't do from the event loop; the named iterable defers it like the others.
+EXPORTS = {
+    'sales': (SALES_HEADER, _sales, _sale_row),
+    'transactions': (TRANSACTIONS_HEADER, _transactions, _transaction_row),
+    'stock': (STOCK_HEADER, _stock, _stock_row),
+}
+
+
+def rows(kind, **filters):
+    """Header and rows of the ``kind`` export, read a chunk at a time."""
+    header, queryset, format_row = EXPORTS[kind]
+    yield header
+    for values in queryset(**filters).iterator(chunk_size=CHUNK_SIZE):
+        yield format_row(*values)
+
+
+async def arows(kind, **filters):
+    """Async ``rows()`` for ASGI, which buffers a sync iterator whole before sending any of it."""
+    header, queryset, format_row = EXPORTS[kind]
+    yield header
+    async for values in queryset(**filters).aiterator(chunk_size=CHUNK_SIZE):
+        yield format_row(*values)
+
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+async def acsv_lines(rows):
+    writer = csv.writer(_Echo())
+    async for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,119 @@
+"""Faceted browsing of the component catalogue.
+
+A facet narrows the catalogue by one attribute: category, component type,
+box or stock level. ``apply()`` adds the selected facets to a component
+queryset, and ``groups()`` counts, for every facet, how many components
+each of its values would leave. Each facet's counts come from one grouped
+query over the catalogue as narrowed by the *other* selected facets, so a
+page costs one query per facet however many components or categories
+there are. Box counts are capped to the fullest boxes.
+
+The filtered listings stay on indexes: (category, name, id),
+(component_type, name, id) and (box_number, name, id) serve the keyset
+walk for one selected value, and the low/out stock values share the
+predicate of the partial low-stock index.
+"""
+import asyncio
+
+from django.db.models import Count, F, Q
+from django.utils.http import urlencode
+
+from .models import Component
+
+PARAMS = ('category', 'type', 'box', 'stock')
+BOX_FACET_LIMIT = 12
+
+STOCK_CHOICES = [
+    ('in', 'In stock'),
+    ('low', 'Low stock'),
+    ('out', 'Out of stock'),
+]
+# Out of stock is low stock too (reorder levels are never negative), so both
+# stay inside component_low_stock_idx.
+STOCK_FILTERS = {
+    'in': Q(quantity__gt=0),
+    'low': Q(quantity__lte=F('reorder_level')),
+    'out': Q(quantity__lte=F('reorder_level')) & Q(quantity__lte=0),
+}
+
+
+def _condition(name, value):
+    if name == 'category':
+        return Q(category_id=value)
+    if name == 'type':
+        return Q(component_type=value)
+    if name == 'box':
+        return Q(box_number=value)
+    return STOCK_FILTERS[value]
+
+
+def apply(queryset, selected, skip=None):
+    """Narrow ``queryset`` by every selected facet except ``skip``."""
+    for name, value in selected.items():
+        if name != skip and value not in (None, ''):
+            queryset = queryset.filter(_condition(name, value))
+    return queryset
+
+
+def _query(selected, name, value, search):
+    """Query string for the listing with ``name`` toggled to ``value``."""
+    params = {'q': search} if search else {}
+    params.update((key, val) for key, val in selected.items() if val not in (None, ''))
+    if selected.get(name) == value:
+        params.pop(name)
+    else:
+        params[name] = value
+    return urlencode(params)
+
+
+def _option(selected, name, value, label, count, search):
+    return {
+        'value': value,
+        'label': label,
+        'count': count,
+        'active': selected.get(name) == value,
+        'query': _query(selected, name, value, search),
+    }
+
+
+async def groups(queryset, selected, search=None):
+    """Facet groups for the catalogue page, each a list of options with counts.
+
+    ``queryset`` is the catalogue, already searched for ``search``, before
+    any facet is applied; ``selected`` maps facet names to cleaned values.
+    """
+    base = queryset.order_by()
+
+    async def rows(name, *fields):
+        grouped = apply(base, selected, skip=name).values(*fields).annotate(count=Count('id'))
+        if name == 'box':
+            grouped = grouped.filter(box_number__isnull=False).exclude(box_number='').order_by('-count', 'box_number')[:BOX_FACET_LIMIT]
+        else:
+            grouped = grouped.order_by(*fields)
+        return [row async for row in grouped]
+
+    categories, types, boxes, stock = await asyncio.gather(
+        rows('category', 'category__name', 'category_id'),
+        rows('type', 'component_type'),
+        rows('box', 'box_number'),
+        apply(base, selected, skip='stock').aaggregate(
+            **{value: Count('id', filter=condition) for value, condition in STOCK_FILTERS.items()}
+        ),
+    )
+    type_labels = dict(Component.TYPE_CHOICES)
+    return [
+        {'name': 'category', 'label': 'Category', 'options': [
+            _option(selected, 'category', row['category_id'], row['category__name'], row['count'], search)
+            for row in categories
+        ]},
+        {'name': 'type', 'label': 'Type', 'options': [
+            _option(selected, 'type', row['component_type'], type_labels.get(row['component_type'], row['component_type']), row['count'], search)
+            for row in types
+        ]},
+        {'name': 'stock', 'label': 'Stock', 'options': [
+            _option(selected, 'stock', value, label, stock[value], search) for value, label in STOCK_CHOICES
+        ]},
+        {'name': 'box', 'label': 'Box', 'options': [
+            _option(selected, 'box', row['box_number'], row['box_number'], row['count'], search) for row in boxes
+        ]},
+    ]
@@ -1,8 +1,10 @@
 from django import forms
-from django.db.models import Q
-from .models import Transaction, Component, Beneficiary, Sale
+from .models import Transaction, Component, Beneficiary, Sale, Category
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from . import facets, identifiers, importer, payments
+import io
+
 
 class CheckoutForm(forms.ModelForm):
     borrower_id = forms.CharField(
@@ -42,9 +44,7 @@ class CheckoutForm(forms.ModelForm):
 
         if borrower_id:
             # Try to find beneficiary by employee_id or student_id
-            beneficiary = Beneficiary.objects.filter(
-                Q(employee_id=borrower_id) | Q(student_id=borrower_id)
-            ).first()
+            beneficiary = identifiers.find(borrower_id)
             
             if beneficiary:
                 cleaned_data['borrower'] = beneficiary
@@ -63,7 +63,7 @@ class CheckoutForm(forms.ModelForm):
 class ComponentForm(forms.ModelForm):
     class Meta:
         model = Component
-        fields = ['serial_number', 'name', 'category', 'component_type', 'box_number', 'quantity', 'image', 'description']
+        fields = ['serial_number', 'name', 'category', 'component_type', 'box_number', 'quantity', 'reorder_level', 'image', 'description']
         widgets = {
             'serial_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g., SN12345'}),
             'name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g., Ultrasonic Sensor HC-SR04'}),
@@ -71,6 +71,7 @@ class ComponentForm(forms.ModelForm):
             'component_type': forms.Select(attrs={'class': 'form-select'}),
             'box_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g., Box A1 or Shelf 3'}),
             'quantity': forms.NumberInput(attrs={'class': 'form-control', 'min': 0, 'placeholder': '0'}),
+            'reorder_level': forms.NumberInput(attrs={'class': 'form-control', 'min': 0, 'placeholder': 'Default for type'}),
             'image': forms.FileInput(attrs={'class': 'form-control'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Optional: Add any additional details about this component...'}),
         }
@@ -81,6 +82,8 @@ class ComponentForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['category'].empty_label = "-- Select Category --"
+        # Blank means "the default for the chosen type"; Component.save() fills it in.
+        self.fields['reorder_level'].required = False
 
 class BeneficiaryForm(forms.ModelForm):
     class Meta:
@@ -131,6 +134,13 @@ class BeneficiaryForm(forms.ModelForm):
             cleaned_data['employee_id'] = None
             cleaned_data['stream'] = None
             cleaned_data['student_id'] = None
+
+        for field in ('employee_id', 'student_id'):
+            value = cleaned_data.get(field)
+            if value:
+                owner = identifiers.taken_by(value, exclude=self.instance)
+                if owner:
+                    self.add_error(field, f"This ID already belongs to {owner.name}.")
         
         return cleaned_data
 
@@ -226,9 +236,7 @@ class SellForm(forms.ModelForm):
             raise forms.ValidationError("Please provide either a Buyer ID or select a buyer from the list.")
 
         if buyer_id:
-            beneficiary = Beneficiary.objects.filter(
-                Q(employee_id=buyer_id) | Q(student_id=buyer_id)
-            ).first()
+            beneficiary = identifiers.find(buyer_id)
             
             if beneficiary:
                 cleaned_data['buyer'] = beneficiary
@@ -244,3 +252,237 @@ class SellForm(forms.ModelForm):
             raise forms.ValidationError(f"Only {self.component.quantity} items available to sell.")
         return quantity
 
+
+class CartCheckoutForm(forms.Form):
+    """Borrower and notes for a multi-item checkout; the items come from CartLineFormSet."""
+    borrower_id = forms.CharField(
+        required=False,
+        label="Borrower ID (Student/Employee)",
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Enter ID to search...'})
+    )
+    borrower = forms.ModelChoiceField(
+        queryset=Beneficiary.objects.filter(category__in=['Intern', 'Other']),
+        required=False,
+        label="Select Borrower (Intern/Other)",
+        empty_label="-- Select Borrower (Intern/Other) --",
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    notes = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 2, 'placeholder': 'Optional notes or description...'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        borrower_id = cleaned_data.get('borrower_id')
+        borrower = cleaned_data.get('borrower')
+
+        if not borrower_id and not borrower:
+            raise forms.ValidationError("Please provide either a Borrower ID or select a borrower from the list.")
+
+        if borrower_id:
+            beneficiary = identifiers.find(borrower_id)
+            if beneficiary:
+                cleaned_data['borrower'] = beneficiary
+            elif not borrower:
+                self.add_error('borrower_id', "No beneficiary found with this ID.")
+
+        return cleaned_data
+
+
+class CartLineForm(forms.Form):
+    serial_number = forms.CharField(
+        max_length=100,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Scan or type serial number'}),
+    )
+    quantity = forms.IntegerField(
+        min_value=1,
+        initial=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
+    )
+
+
+class BaseCartLineFormSet(forms.BaseFormSet):
+    def clean(self):
+        """Resolve every line's component and check stock with a single query.
+
+        Repeated serial numbers are merged, so ``self.lines`` holds one
+        ``(component, quantity)`` pair per distinct component.
+        """
+        super().clean()
+        if any(self.errors):
+            return
+
+        quantities = {}
+        for form in self.forms:
+            if not form.has_changed() or self._should_delete_form(form):
+                continue
+            serial = form.cleaned_data['serial_number'].strip()
+            quantities[serial] = quantities.get(serial, 0) + form.cleaned_data['quantity']
+
+        if not quantities:
+            raise forms.ValidationError("Add at least one component to check out.")
+
+        components = Component.objects.in_bulk(list(quantities), field_name='serial_number')
+        errors = []
+        self.lines = []
+        for serial, quantity in quantities.items():
+            component = components.get(serial)
+            if component is None:
+                errors.append(f"No component with serial number '{serial}'.")
+            elif quantity > component.quantity:
+                errors.append(f"{component.name}: only {component.quantity} items available.")
+            else:
+                self.lines.append((component, quantity))
+        if errors:
+            raise forms.ValidationError(errors)
+
+
+CartLineFormSet = forms.formset_factory(CartLineForm, formset=BaseCartLineFormSet, extra=5)
+
+
+class ComponentImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV, JSON array or JSON Lines with serial_number, name, category, quantity and optional "
+                  "component_type, box_number, description, datasheet_link, location columns.",
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,.json,.jsonl,.ndjson'}),
+    )
+
+
+class PaymentReconcileForm(forms.Form):
+    file = forms.FileField(
+        required=False,
+        help_text="CSV with buyer and amount columns; buyer is a student/employee ID or #id.",
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv'}),
+    )
+    lines = forms.CharField(
+        required=False,
+        help_text="Or one payment per line as buyer,amount.",
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 4, 'placeholder': 'CS21B001,250.00'}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Only check the matches, don't mark anything paid",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('file') and not (cleaned_data.get('lines') or '').strip():
+            raise forms.ValidationError("Upload a CSV or enter at least one payment.")
+        return cleaned_data
+
+    def rows(self):
+        """``(line, buyer, amount)`` rows from the upload, or from the pasted lines."""
+        upload = self.cleaned_data.get('file')
+        if upload:
+            return payments.read_payments(importer.open_text(upload.file))
+        return payments.read_payments(io.StringIO(','.join(payments.COLUMNS) + '\n' + self.cleaned_data['lines']))
+
+
+class ExportFilterForm(forms.Form):
+    PAID_CHOICES = [
+        ('', 'All sales'),
+        ('paid', 'Paid only'),
+        ('unpaid', 'Unpaid only'),
+    ]
+
+    start = forms.DateField(required=False, widget=forms.DateInput(attrs={'class': 'form-control form-control-sm', 'type': 'date'}))
+    end = forms.DateField(required=False, widget=forms.DateInput(attrs={'class': 'form-control form-control-sm', 'type': 'date'}))
+    paid = forms.ChoiceField(choices=PAID_CHOICES, required=False, widget=forms.Select(attrs={'class': 'form-select form-select-sm'}))
+
+    def filters(self):
+        paid = self.cleaned_data.get('paid')
+        return {
+            'start': self.cleaned_data.get('start'),
+            'end': self.cleaned_data.get('end'),
+            'is_paid': {'paid': True, 'unpaid': False}.get(paid),
+        }
+
+
+class ComponentFilterForm(forms.Form):
+    """Catalogue facets from the query string; validated without touching the database."""
+    category = forms.IntegerField(required=False, min_value=1)
+    type = forms.ChoiceField(choices=Component.TYPE_CHOICES, required=False)
+    box = forms.CharField(required=False, max_length=50)
+    stock = forms.ChoiceField(choices=facets.STOCK_CHOICES, required=False)
+
+    def selected(self):
+        """Facet name -> value for the valid, non-empty facets; invalid ones are ignored."""
+        if not self.is_bound:
+            return {}
+        self.is_valid()
+        return {name: self.cleaned_data[name] for name in facets.PARAMS if self.cleaned_data.get(name) not in (None, '')}
+
+
+class ReportFilterForm(forms.Form):
+    PERIOD_CHOICES = [
+        ('day', 'Daily'),
+        ('week', 'Weekly'),
+        ('month', 'Monthly'),
+    ]
+
+    period = forms.ChoiceField(choices=PERIOD_CHOICES, required=False, widget=forms.Select(attrs={'class': 'form-select form-select-sm'}))
+    start = forms.DateField(required=False, widget=forms.DateInput(attrs={'class': 'form-control form-control-sm', 'type': 'date'}))
+    end = forms.DateField(required=False, widget=forms.DateInput(attrs={'class': 'form-control form-control-sm', 'type': 'date'}))
+    category = forms.ModelChoiceField(queryset=Category.objects.order_by('name'), required=False, empty_label="All categories",
+                                      widget=forms.Select(attrs={'class': 'form-select form-select-sm'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError("The start date must be on or before the end date.")
+        return cleaned_data
+
+
+class ScanForm(forms.Form):
+    """One scan at the issue desk: a serial number plus the borrower's ID card."""
+    ACTION_CHOICES = [
+        ('checkout', 'Check out'),
+        ('return', 'Return'),
+    ]
+
+    serial_number = forms.CharField(max_length=100)
+    borrower_id = forms.CharField(max_length=50, required=False)
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    quantity = forms.IntegerField(min_value=1, required=False)
+    notes = forms.CharField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        serial = (cleaned_data.get('serial_number') or '').strip()
+        borrower_id = cleaned_data.get('borrower_id')
+        action = cleaned_data.get('action')
+        if not serial or not action:
+            return cleaned_data
+
+        component = Component.objects.filter(serial_number=serial).first()
+        if component is None:
+            self.add_error('serial_number', f"No component with serial number '{serial}'.")
+            return cleaned_data
+        cleaned_data['component'] = component
+
+        borrower = identifiers.find(borrower_id) if borrower_id else None
+        if borrower_id and borrower is None:
+            self.add_error('borrower_id', "No beneficiary found with this ID.")
+            return cleaned_data
+        cleaned_data['borrower'] = borrower
+
+        if action == 'checkout':
+            quantity = cleaned_data.get('quantity') or 1
+            cleaned_data['quantity'] = quantity
+            if borrower is None:
+                self.add_error('borrower_id', "Scan the borrower's ID before checking out.")
+            elif quantity > component.quantity:
+                self.add_error('quantity', f"Only {component.quantity} items available.")
+        else:
+            # The borrower's oldest open loan of this part, or anyone's if no ID was scanned.
+            loans = Transaction.objects.filter(component=component, return_time__isnull=True).select_related('borrower')
+            if borrower is not None:
+                loans = loans.filter(borrower=borrower)
+            cleaned_data['loan'] = loans.order_by('checkout_time', 'pk').first()
+            if cleaned_data['loan'] is None:
+                owner = f" by {borrower.name}" if borrower else ""
+                self.add_error('serial_number', f"{component.name} is not checked out{owner}.")
+        return cleaned_data
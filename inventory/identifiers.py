@@ -0,0 +1,100 @@
+"""Beneficiary lookup by employee or student ID.
+
+Both IDs are copied, normalized, into the uniquely indexed
+BeneficiaryIdentifier table whenever a beneficiary is saved, so a scan at
+the desk is one index lookup instead of an OR across two unindexed
+columns. Lookup results for the AJAX endpoint are cached briefly and
+dropped whenever the beneficiary behind them changes.
+"""
+from django.core.cache import cache
+
+from .models import Beneficiary, BeneficiaryIdentifier
+
+CACHE_TIMEOUT = 60
+CACHE_PREFIX = 'beneficiary-lookup'
+
+
+def normalize(identifier):
+    return (identifier or '').strip().upper()
+
+
+def _identifiers(beneficiary):
+    pairs = [('EMPLOYEE', beneficiary.employee_id), ('STUDENT', beneficiary.student_id)]
+    return {normalize(value): kind for kind, value in pairs if normalize(value)}
+
+
+def find(identifier):
+    """Beneficiary whose employee or student ID is ``identifier``, or None."""
+    value = normalize(identifier)
+    if not value:
+        return None
+    return Beneficiary.objects.filter(identifiers__value=value).first()
+
+
+def taken_by(identifier, exclude=None):
+    """The other beneficiary already holding ``identifier``, if any."""
+    owners = Beneficiary.objects.filter(identifiers__value=normalize(identifier))
+    if exclude is not None and exclude.pk:
+        owners = owners.exclude(pk=exclude.pk)
+    return owners.first()
+
+
+def _cache_key(value):
+    return f"{CACHE_PREFIX}:{value}"
+
+
+def invalidate(values):
+    cache.delete_many([_cache_key(value) for value in values])
+
+
+def sync(beneficiary):
+    """Replace ``beneficiary``'s identifier rows with its current IDs."""
+    wanted = _identifiers(beneficiary)
+    existing = set(beneficiary.identifiers.values_list('value', flat=True))
+    beneficiary.identifiers.exclude(value__in=wanted).delete()
+    # An ID already held by someone else is left with its current owner.
+    BeneficiaryIdentifier.objects.bulk_create(
+        [BeneficiaryIdentifier(beneficiary=beneficiary, kind=kind, value=value)
+         for value, kind in wanted.items() if value not in existing],
+        ignore_conflicts=True,
+    )
+    invalidate(existing | set(wanted))
+
+
+def payload(beneficiary):
+    if not beneficiary:
+        return {'exists': False}
+    # Try to parse name into first and last
+    name_parts = beneficiary.name.split(' ')
+    return {
+        'exists': True,
+        'name': beneficiary.name,
+        'first_name': name_parts[0],
+        'last_name': ' '.join(name_parts[1:]),
+        'email': beneficiary.email,
+        'designation': beneficiary.designation,
+        'category': beneficiary.category,
+    }
+
+
+def lookup(identifier):
+    """JSON-ready lookup result for ``identifier``, served from the cache when fresh."""
+    value = normalize(identifier)
+    key = _cache_key(value)
+    data = cache.get(key)
+    if data is None:
+        data = payload(find(value))
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
+
+
+async def alookup(identifier):
+    """``lookup()`` for async views."""
+    value = normalize(identifier)
+    key = _cache_key(value)
+    data = await cache.aget(key)
+    if data is None:
+        beneficiary = await Beneficiary.objects.filter(identifiers__value=value).afirst() if value else None
+        data = payload(beneficiary)
+        await cache.aset(key, data, CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,253 @@
+"""Streaming bulk import of components from CSV or JSON.
+
+Rows are read one at a time and written in fixed-size chunks with
+``bulk_create(update_conflicts=True)`` keyed on ``serial_number``, so memory
+use depends on the chunk size rather than the file size. Invalid rows are
+reported with their line number and skipped; the rest of the file is still
+imported.
+"""
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.transaction import atomic
+
+from . import catalogue_cache, stats
+from .models import Category, Component, StockMovement
+from .search import refresh_search_vectors
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# reorder_level is only written for new components, so levels tuned in the app survive a re-import.
+UPDATE_FIELDS = ['name', 'category', 'component_type', 'box_number', 'quantity', 'description', 'datasheet_link', 'location']
+TYPE_CODES = {code for code, _ in Component.TYPE_CHOICES}
+# Checked against the model fields' validators (max_length, URL) before anything is written.
+VALIDATED_FIELDS = ['serial_number', 'name', 'box_number', 'datasheet_link', 'location']
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def _iter_json_array(stream, chunk_size=64 * 1024):
+    """Yield the objects of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started:
+            if buffer.startswith('['):
+                buffer = buffer[1:]
+                started = True
+                continue
+        elif buffer.startswith(','):
+            buffer = buffer[1:]
+            continue
+        elif buffer.startswith(']'):
+            return
+        elif buffer:
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                yield obj
+                buffer = buffer[end:]
+                continue
+        if eof:
+            if buffer.strip() or not started:
+                raise ValueError("Expected a JSON array of objects.")
+            return
+        data = stream.read(chunk_size)
+        eof = not data
+        buffer += data
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line, row_dict)`` from a text stream in ``csv``, ``json`` or ``jsonl`` format."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line, text in enumerate(stream, start=1):
+            if text.strip():
+                try:
+                    yield line, json.loads(text)
+                except ValueError:
+                    yield line, None
+    elif fmt == 'json':
+        for index, row in enumerate(_iter_json_array(stream), start=1):
+            yield index, row
+    else:
+        raise ValueError(f"Unsupported import format '{fmt}'.")
+
+
+def open_text(binary_file):
+    # utf-8-sig strips the BOM Excel puts at the start of CSV exports.
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+
+def format_for(filename):
+    name = filename.lower()
+    if name.endswith('.jsonl') or name.endswith('.ndjson'):
+        return 'jsonl'
+    if name.endswith('.json'):
+        return 'json'
+    return 'csv'
+
+
+class _CategoryCache:
+    """Category name -> pk, loaded once and extended as new names appear."""
+
+    def __init__(self):
+        self.ids = dict(Category.objects.values_list('name', 'pk'))
+
+    def resolve(self, name):
+        if name not in self.ids:
+            self.ids[name] = Category.objects.get_or_create(name=name)[0].pk
+        return self.ids[name]
+
+
+def _validate(model, field_name, value, label=None):
+    """Run the model field's validators; blank values are left to the callers' own checks."""
+    try:
+        model._meta.get_field(field_name).run_validators(value)
+    except ValidationError as e:
+        raise ValueError(f"{label or field_name}: {' '.join(e.messages)}")
+
+
+def _clean_row(row, categories):
+    def value(key):
+        raw = row.get(key)
+        return '' if raw is None else str(raw).strip()
+
+    serial = value('serial_number')
+    name = value('name')
+    category = value('category')
+    if not serial:
+        raise ValueError("serial_number is required.")
+    if not name:
+        raise ValueError("name is required.")
+    if not category:
+        raise ValueError("category is required.")
+    # A blank quantity leaves an existing component's stock alone; new ones start at 0.
+    quantity = None
+    if value('quantity'):
+        try:
+            quantity = int(value('quantity'))
+        except ValueError:
+            raise ValueError(f"quantity '{value('quantity')}' is not a whole number.")
+        if quantity < 0:
+            raise ValueError("quantity cannot be negative.")
+    component_type = (value('component_type') or 'GENERAL').upper()
+    if component_type not in TYPE_CODES:
+        raise ValueError(f"component_type must be one of {', '.join(sorted(TYPE_CODES))}.")
+    reorder_level = None
+    if value('reorder_level'):
+        try:
+            reorder_level = int(value('reorder_level'))
+        except ValueError:
+            raise ValueError(f"reorder_level '{value('reorder_level')}' is not a whole number.")
+        if reorder_level < 0:
+            raise ValueError("reorder_level cannot be negative.")
+    for field_name in VALIDATED_FIELDS:
+        _validate(Component, field_name, value(field_name))
+    _validate(Category, 'name', category, label='category')
+
+    return Component(
+        serial_number=serial,
+        name=name,
+        category_id=categories.resolve(category),
+        component_type=component_type,
+        box_number=value('box_number') or None,
+        quantity=quantity,
+        reorder_level=reorder_level,
+        description=value('description'),
+        datasheet_link=value('datasheet_link'),
+        location=value('location'),
+    )
+
+
+def _write_chunk(chunk, result, user):
+    """Upsert one chunk and log the stock it adds or changes."""
+    with atomic():
+        # Locked so a checkout can't land between reading a quantity and overwriting it.
+        existing = dict(
+            Component.objects.filter(serial_number__in=list(chunk)).select_for_update()
+            .order_by('pk').values_list('serial_number', 'quantity')
+        )
+        keep_stock = {serial for serial, c in chunk.items() if c.quantity is None and serial in existing}
+        for component in chunk.values():
+            if component.quantity is None:
+                component.quantity = existing.get(component.serial_number, 0)
+        for components, fields in (
+            ([c for serial, c in chunk.items() if serial not in keep_stock], UPDATE_FIELDS),
+            ([chunk[serial] for serial in keep_stock], [field for field in UPDATE_FIELDS if field != 'quantity']),
+        ):
+            if components:
+                Component.objects.bulk_create(
+                    components,
+                    update_conflicts=True,
+                    unique_fields=['serial_number'],
+                    update_fields=fields + ['last_updated'],
+                )
+        saved = Component.objects.filter(serial_number__in=list(chunk))
+        movements = []
+        for pk, serial, quantity in saved.values_list('pk', 'serial_number', 'quantity'):
+            before = existing.get(serial, 0)
+            if quantity != before:
+                movements.append(StockMovement(
+                    component_id=pk,
+                    change=quantity - before,
+                    quantity_after=quantity,
+                    reason='ADJUSTMENT' if serial in existing else 'INITIAL',
+                    performed_by=user,
+                ))
+        StockMovement.objects.bulk_create(movements)
+        refresh_search_vectors(saved)
+        catalogue_cache.bump()
+
+    result.updated += len(existing)
+    result.created += len(chunk) - len(existing)
+
+
+def import_components(rows, user=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Upsert components from ``(line, row_dict)`` pairs; returns an ImportResult."""
+    result = ImportResult()
+    categories = _CategoryCache()
+    chunk = {}
+    for line, row in rows:
+        if not isinstance(row, dict):
+            result.add_error(line, "Row is not a JSON object.")
+            continue
+        try:
+            component = _clean_row(row, categories)
+        except ValueError as e:
+            result.add_error(line, str(e))
+            continue
+        # Later rows for the same serial win; one upsert may not touch a row twice.
+        chunk[component.serial_number] = component
+        if len(chunk) >= chunk_size:
+            _write_chunk(chunk, result, user)
+            chunk = {}
+    if chunk:
+        _write_chunk(chunk, result, user)
+
+    if result.created or result.updated:
+        stats.rebuild()
+    return result
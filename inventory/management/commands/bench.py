@@ -0,0 +1,39 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.test.utils import override_settings
+
+from inventory import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Times the main inventory views through the test client and prints p50/p95 latency and query counts as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--user', help='Username to run as (default: the first superuser).')
+        parser.add_argument('--output', '-o', help='Also write the JSON report to this file.')
+        parser.add_argument('--asgi', action='store_true', help='Send the requests through the ASGI handler instead of WSGI.')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(username=options['user']) if options['user'] else User.objects.filter(is_superuser=True)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError("No user to run the benchmark as; pass --user or create a superuser.")
+
+        # The test client talks to the 'testserver' host.
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                report = benchmark.run(user, iterations=options['iterations'], warmup=options['warmup'],
+                                       asgi=options['asgi'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                out.write(text + '\n')
+        self.stdout.write(text)
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import outbox
+
+
+class Command(BaseCommand):
+    help = 'Sends queued notification emails from the outbox over a single reused connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=outbox.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int, default=outbox.DEFAULT_MAX_ATTEMPTS,
+                            help='Failed sends before a message is dead-lettered.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, polling the outbox every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = outbox.deliver_due(options['batch_size'], options['max_attempts'])
+            except Exception as e:
+                # Typically the mail server refusing the connection; nothing was marked, try again later.
+                if not options['loop']:
+                    raise
+                self.stderr.write(f"Outbox delivery failed: {e}")
+            else:
+                if sent or failed or not options['loop']:
+                    self.stdout.write(self.style.SUCCESS(f"Sent {sent} email(s), {failed} failed."))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
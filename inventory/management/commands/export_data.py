@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import exports
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"'{value}' is not a YYYY-MM-DD date.")
+
+
+class Command(BaseCommand):
+    help = 'Streams sales, transactions or stock to a CSV file (or stdout).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(exports.EXPORTS))
+        parser.add_argument('--start', type=_date, help='First day to include (YYYY-MM-DD).')
+        parser.add_argument('--end', type=_date, help='Last day to include (YYYY-MM-DD).')
+        paid = parser.add_mutually_exclusive_group()
+        paid.add_argument('--paid', dest='is_paid', action='store_true', default=None, help='Only paid sales.')
+        paid.add_argument('--unpaid', dest='is_paid', action='store_false', help='Only unpaid sales.')
+        parser.add_argument('--output', '-o', help='File to write; defaults to stdout.')
+
+    def handle(self, *args, **options):
+        rows = exports.rows(
+            options['kind'], start=options['start'], end=options['end'], is_paid=options['is_paid'],
+        )
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as out:
+                out.writelines(exports.csv_lines(rows))
+        else:
+            for line in exports.csv_lines(rows):
+                self.stdout.write(line, ending='')
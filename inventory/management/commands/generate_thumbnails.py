@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from inventory import thumbnails
+from inventory.models import Beneficiary, Component
+
+
+class Command(BaseCommand):
+    help = 'Creates missing thumbnails and WebP variants for component and profile photos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist.')
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        sources = [
+            Component.objects.exclude(image='').exclude(image__isnull=True).only('image'),
+            Beneficiary.objects.exclude(photo='').exclude(photo__isnull=True).only('photo'),
+        ]
+        for queryset in sources:
+            field_name = 'image' if queryset.model is Component else 'photo'
+            for obj in queryset.iterator(chunk_size=500):
+                if thumbnails.generate(getattr(obj, field_name), force=options['force']):
+                    done += 1
+                else:
+                    failed += 1
+        self.stdout.write(self.style.SUCCESS(f"Thumbnails ready for {done} images."))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} images could not be read."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import importer
+
+
+class Command(BaseCommand):
+    help = 'Upserts components from a CSV, JSON array or JSON Lines file, matching on serial number.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'json', 'jsonl'],
+                            help='Defaults to a guess from the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=importer.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or importer.format_for(path)
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                result = importer.import_components(importer.read_rows(stream, fmt), chunk_size=options['chunk_size'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not import {path}: {e}")
+
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} new and {result.updated} updated components; {result.error_count} row(s) skipped."
+        ))
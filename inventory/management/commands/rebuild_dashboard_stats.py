@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from inventory import stats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the dashboard counters snapshot from the underlying tables.'
+
+    def handle(self, *args, **options):
+        snapshot = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Dashboard stats rebuilt: {snapshot.total_components} components, "
+            f"{snapshot.active_checkouts} active checkouts, {snapshot.low_stock_count} low on stock."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models import Component
+from inventory.search import is_postgres, refresh_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the full-text search vector of every component (PostgreSQL only).'
+
+    def handle(self, *args, **options):
+        if not is_postgres():
+            self.stdout.write(self.style.WARNING('Not running on PostgreSQL — search uses icontains, nothing to rebuild.'))
+            return
+        updated = refresh_search_vectors(Component.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search vectors for {updated} components."))
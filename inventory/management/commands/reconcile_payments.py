@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import payments
+
+
+class Command(BaseCommand):
+    help = 'Marks unpaid sales paid from a CSV of received payments with buyer and amount columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report the matches without marking anything paid.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                result = payments.reconcile(payments.read_payments(stream), dry_run=options['dry_run'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not reconcile {path}: {e}")
+
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        verb = "Would mark" if options['dry_run'] else "Marked"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.sales} sale(s) paid from {result.payments} payment(s) (₹{result.amount}); "
+            f"{result.error_count} payment(s) unmatched."
+        ))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import rollups
+
+
+class Command(BaseCommand):
+    help = 'Folds sales and checkouts added since the last run into the daily reporting rollups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=rollups.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Discard the rollups and recompute them from the full history.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, refreshing every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=300.0)
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            processed = rollups.rebuild(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(self._summary("Rebuilt rollups from", processed)))
+            if not options['loop']:
+                return
+        while True:
+            processed = rollups.refresh(options['batch_size'])
+            if any(processed.values()) or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(self._summary("Rolled up", processed)))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def _summary(self, prefix, processed):
+        return f"{prefix} {processed['sales']} sale(s) and {processed['usage']} checkout(s)."
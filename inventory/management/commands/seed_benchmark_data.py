@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Generates a deterministic, realistically sized data set for the bench command.'
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_COUNTS.items():
+            parser.add_argument(f'--{name}', type=int, default=default, help=f'Number of {name} (default {default}).')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--reset', action='store_true', help='Delete previously seeded benchmark rows first.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            benchmark.reset()
+        try:
+            created = benchmark.seed(
+                components=options['components'],
+                beneficiaries=options['beneficiaries'],
+                transactions=options['transactions'],
+                sales=options['sales'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded " + ", ".join(f"{count} {name}" for name, count in created.items()) + "."
+        ))
@@ -0,0 +1,36 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import outbox, reminders
+
+
+class Command(BaseCommand):
+    help = 'Queues one reminder email per borrower listing all of their overdue loans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval-hours', type=float, default=reminders.DEFAULT_INTERVAL.total_seconds() / 3600,
+                            help='Do not remind the same borrower more often than this.')
+        parser.add_argument('--dry-run', action='store_true', help='Report who would be reminded without queueing anything.')
+        parser.add_argument('--deliver', action='store_true',
+                            help='Send the queued mail now over one connection instead of leaving it to deliver_outbox.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, checking for overdue loans every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=3600.0)
+
+    def handle(self, *args, **options):
+        interval = datetime.timedelta(hours=options['interval_hours'])
+        while True:
+            borrowers, loans = reminders.queue_reminders(interval=interval, dry_run=options['dry_run'])
+            if options['dry_run']:
+                self.stdout.write(f"Would remind {borrowers} borrower(s) about {loans} overdue loan(s).")
+                return
+            if borrowers or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Queued reminders for {borrowers} borrower(s) about {loans} overdue loan(s)."))
+            if options['deliver'] and borrowers:
+                sent, failed = outbox.deliver_due()
+                self.stdout.write(self.style.SUCCESS(f"Sent {sent} email(s), {failed} failed."))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
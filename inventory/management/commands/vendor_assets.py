@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import assets
+
+
+class Command(BaseCommand):
+    help = ('Downloads the pinned Bootstrap, Font Awesome and Inter files into inventory/static '
+            'and rebuilds the Font Awesome subset from the icons the templates use.')
+
+    def handle(self, *args, **options):
+        icons = assets.used_icons()
+        try:
+            written = assets.vendor(icons=icons)
+        except OSError as exc:
+            raise CommandError(f"Could not download the assets: {exc}")
+        for path, size in written.items():
+            self.stdout.write(f"  {path} ({size // 1024} KiB)")
+        if assets.font_subset is None:
+            self.stdout.write(self.style.WARNING("fontTools is not installed; the icon font was copied in full."))
+        self.stdout.write(self.style.SUCCESS(
+            f"Vendored {len(written)} file(s) into {assets.VENDOR_DIR} with {len(icons)} icon name(s). "
+            "Commit them, then run collectstatic."
+        ))
@@ -0,0 +1,192 @@
+"""In-process request metrics in the Prometheus text format.
+
+``RequestMetricsMiddleware`` times every request, counts and times its
+database queries, and measures the response body. The numbers go into
+cumulative histograms labelled by view name and method. ``render()``
+produces the exposition text served by the staff-only ``metrics`` view.
+
+Every worker process keeps its own histograms, so a scraper sees one
+worker per request. Prometheus sums them correctly once each worker is
+scraped, or you can run a single worker when profiling. The middleware
+runs natively in both WSGI and ASGI mode.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # One slot per bucket plus +Inf, then the running sum.
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self, key):
+        """Cumulative bucket counts, total count and sum for one label set."""
+        with self._lock:
+            series = list(self._series.get(tuple(sorted(key.items())), ()))
+        if not series:
+            return None
+        counts, total = series[:-1], series[-1]
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, total
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            keys = sorted(self._series)
+        for key in keys:
+            cumulative, count, total = self.samples(dict(key))
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in key)
+            for bound, value in zip(self.buckets + ('+Inf',), cumulative):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:g}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_SECONDS = Histogram(
+    'robostock_request_duration_seconds', 'Wall time spent handling the request.',
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERY_COUNT = Histogram(
+    'robostock_request_db_queries', 'Database queries executed per request.',
+    (0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_SECONDS = Histogram(
+    'robostock_request_db_duration_seconds', 'Time spent in database queries per request.',
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+RESPONSE_BYTES = Histogram(
+    'robostock_response_size_bytes', 'Size of the response body.',
+    (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+HISTOGRAMS = (REQUEST_SECONDS, QUERY_COUNT, DB_SECONDS, RESPONSE_BYTES)
+
+
+def render():
+    return '\n\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+class _QueryTimer:
+    """``connection.execute_wrapper`` hook counting and timing queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+def _hook(queries):
+    connection.execute_wrappers.append(queries)
+
+
+def _unhook(queries):
+    connection.execute_wrappers.remove(queries)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+def _response_size(response):
+    if response.streaming:
+        # Streamed bodies are never held in memory; count what was declared, if anything.
+        return int(response.get('Content-Length') or 0)
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_seconds = getattr(settings, 'METRICS_SLOW_REQUEST_SECONDS', 0)
+        self.slow_queries = getattr(settings, 'METRICS_SLOW_REQUEST_QUERIES', 0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = _QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = _QueryTimer()
+        # Connections belong to the thread the async ORM runs its queries on,
+        # not to the event loop, so the hook is installed from that thread.
+        await sync_to_async(_hook)(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            await sync_to_async(_unhook)(queries)
+        self._record(request, response, elapsed, queries)
+        return response
+
+    def _record(self, request, response, elapsed, queries):
+        view = _view_name(request)
+        labels = {'view': view, 'method': request.method}
+        size = _response_size(response)
+        REQUEST_SECONDS.observe(labels, elapsed)
+        QUERY_COUNT.observe(labels, queries.count)
+        DB_SECONDS.observe(labels, queries.seconds)
+        RESPONSE_BYTES.observe(labels, size)
+
+        if (self.slow_seconds and elapsed >= self.slow_seconds) or (self.slow_queries and queries.count >= self.slow_queries):
+            logger.warning(
+                "Slow request %s %s (view %s): %.0f ms, %d queries in %.0f ms, %d bytes",
+                request.method, request.path, view, elapsed * 1000, queries.count, queries.seconds * 1000, size,
+            )
@@ -0,0 +1,36 @@
+"""Async-capable static file middleware.
+
+WhiteNoise's middleware only runs synchronously. Under ASGI, Django would
+then hold a thread for every request and hop back to the event loop for
+the async views below it, which is exactly the cost async views are meant
+to avoid. This subclass serves static files the same way and otherwise
+awaits the rest of the chain directly.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    def _static_file(self, request):
+        if self.autorefresh:
+            return self.find_file(request.path_info)
+        return self.files.get(request.path_info)
+
+    async def __acall__(self, request):
+        static_file = self._static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
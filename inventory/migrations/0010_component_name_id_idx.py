@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-18 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_component_component_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['name', 'id'], name='component_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.11 on 2026-10-18 03:29
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+SEARCH_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='component_search_gin'),
+    django.contrib.postgres.indexes.GinIndex(fields=['serial_number'], name='component_serial_trgm', opclasses=['gin_trgm_ops']),
+    django.contrib.postgres.indexes.GinIndex(fields=['box_number'], name='component_box_trgm', opclasses=['gin_trgm_ops']),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    # GIN/trigram indexes only exist on PostgreSQL; SQLite keeps icontains search.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Component = apps.get_model('inventory', 'Component')
+    Category = apps.get_model('inventory', 'Category')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Component, index)
+
+    category_name = Subquery(Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1])
+    Component.objects.update(search_vector=(
+        SearchVector('name', 'serial_number', weight='A', config='english')
+        + SearchVector(category_name, 'box_number', weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+    ))
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Component = apps.get_model('inventory', 'Component')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Component, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_component_name_id_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='component',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='component', index=index)
+                for index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_indexes, remove_search_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.11 on 2026-10-18 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_component_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_components', models.IntegerField(default=0)),
+                ('total_kits', models.IntegerField(default=0)),
+                ('low_stock_count', models.IntegerField(default=0)),
+                ('active_checkouts', models.IntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('unpaid_sales', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Dashboard stats',
+            },
+        ),
+        migrations.AlterField(
+            model_name='component',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='sale',
+            name='sale_time',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
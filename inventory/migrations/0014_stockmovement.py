@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-18 03:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_emailoutbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change', models.IntegerField(help_text='Signed quantity delta')),
+                ('quantity_after', models.IntegerField()),
+                ('reason', models.CharField(choices=[('INITIAL', 'Initial stock'), ('CHECKOUT', 'Checkout'), ('RETURN', 'Return'), ('SALE', 'Sale'), ('RESTOCK', 'Restock'), ('ADJUSTMENT', 'Manual adjustment')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='inventory.component')),
+                ('performed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('sale', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.sale')),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.transaction')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['component', 'created_at'], name='movement_component_idx')],
+            },
+        ),
+    ]
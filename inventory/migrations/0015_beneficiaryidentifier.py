@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-18 03:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_identifiers(apps, schema_editor):
+    Beneficiary = apps.get_model('inventory', 'Beneficiary')
+    BeneficiaryIdentifier = apps.get_model('inventory', 'BeneficiaryIdentifier')
+    rows = {}
+    # Oldest beneficiary keeps an ID that was (wrongly) shared by several.
+    for pk, employee_id, student_id in Beneficiary.objects.order_by('pk').values_list('pk', 'employee_id', 'student_id').iterator():
+        for kind, value in (('EMPLOYEE', employee_id), ('STUDENT', student_id)):
+            value = (value or '').strip().upper()
+            if value and value not in rows:
+                rows[value] = BeneficiaryIdentifier(beneficiary_id=pk, kind=kind, value=value)
+    BeneficiaryIdentifier.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_stockmovement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BeneficiaryIdentifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('EMPLOYEE', 'Employee ID'), ('STUDENT', 'Student ID')], max_length=10)),
+                ('value', models.CharField(max_length=50, unique=True)),
+                ('beneficiary', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='identifiers', to='inventory.beneficiary')),
+            ],
+        ),
+        migrations.RunPython(backfill_identifiers, migrations.RunPython.noop),
+    ]
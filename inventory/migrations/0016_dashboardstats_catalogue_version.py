@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_beneficiaryidentifier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardstats',
+            name='catalogue_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
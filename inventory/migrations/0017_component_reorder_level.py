@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-18 03:58
+
+from django.db import migrations, models
+
+
+def kit_reorder_level(apps, schema_editor):
+    # Existing rows got the GENERAL default; kits restock at a lower level.
+    Component = apps.get_model('inventory', 'Component')
+    Component.objects.filter(component_type='KIT').update(reorder_level=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_dashboardstats_catalogue_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='reorder_level',
+            field=models.PositiveIntegerField(blank=True, default=5, help_text='Restock at or below this quantity. Leave blank for the default for the type.'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(kit_reorder_level, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('reorder_level'))), fields=['quantity', 'name', 'id'], name='component_low_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:18
+
+import datetime
+
+import inventory.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def due_from_checkout(apps, schema_editor):
+    # Existing loans got "now + period"; date them from their checkout instead.
+    Transaction = apps.get_model('inventory', 'Transaction')
+    period = datetime.timedelta(days=getattr(settings, 'LOAN_PERIOD_DAYS', 14))
+    Transaction.objects.update(due_at=models.F('checkout_time') + period)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0018_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='due_at',
+            field=models.DateTimeField(blank=True, default=inventory.models.default_due_at, null=True),
+        ),
+        migrations.RunPython(due_from_checkout, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='transaction',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, help_text='When the last overdue reminder was queued', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('return_time__isnull', True)), fields=['due_at', 'id'], name='transaction_open_due_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_transaction_due_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['buyer', '-sale_time', '-id'], name='sale_buyer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['borrower', '-checkout_time', '-id'], name='transaction_borrower_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0020_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'name', 'id'], name='component_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['component_type', 'name', 'id'], name='component_type_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['box_number', 'name', 'id'], name='component_box_name_idx'),
+        ),
+    ]
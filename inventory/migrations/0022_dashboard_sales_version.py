@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0021_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardstats',
+            name='sales_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
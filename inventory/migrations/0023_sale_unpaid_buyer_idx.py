@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0022_dashboard_sales_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(condition=models.Q(('is_paid', False)), fields=['buyer', 'sale_time', 'id'], name='sale_unpaid_buyer_idx'),
+        ),
+    ]
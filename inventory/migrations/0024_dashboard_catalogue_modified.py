@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0023_sale_unpaid_buyer_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardstats',
+            name='catalogue_modified',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,4 +1,12 @@
+import datetime
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -10,6 +18,43 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+# Default reorder level per type: the quantity at or below which a component
+# counts as low on stock unless it has its own level.
+LOW_STOCK_THRESHOLDS = {
+    'GENERAL': 5,
+    'KIT': 1,
+}
+
+
+def default_reorder_level(component_type):
+    return LOW_STOCK_THRESHOLDS.get(component_type, 0)
+
+
+class ComponentQuerySet(models.QuerySet):
+    def catalogue(self):
+        """Components as shown on catalogue cards, with the category pre-joined."""
+        return self.select_related('category').order_by('name', 'id')
+
+    def search(self, query):
+        if not query:
+            return self
+        from .search import search_components
+        return search_components(self, query)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create() skips save(), which is where the per-type default is filled in.
+        objs = list(objs)
+        for obj in objs:
+            if obj.reorder_level is None:
+                obj.reorder_level = default_reorder_level(obj.component_type)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def low_stock(self):
+        # Matches the predicate of component_low_stock_idx exactly, so the
+        # database reads the (small) partial index instead of the table.
+        return self.filter(quantity__lte=F('reorder_level'))
+
+
 class Component(models.Model):
     serial_number = models.CharField(max_length=100, unique=True, help_text="Unique identifier for this component")
     name = models.CharField(max_length=200)
@@ -18,6 +63,7 @@ class Component(models.Model):
     box_number = models.CharField(max_length=50, null=True, blank=True)
     datasheet_link = models.URLField(blank=True)
     quantity = models.IntegerField(default=0)
+    reorder_level = models.PositiveIntegerField(blank=True, help_text="Restock at or below this quantity. Leave blank for the default for the type.")
     location = models.CharField(max_length=100) # Keep for general location or legacy
     image = models.ImageField(upload_to='components/', blank=True, null=True)
     TYPE_CHOICES = [
@@ -25,11 +71,69 @@ class Component(models.Model):
         ('KIT', 'General Kit'),
     ]
     component_type = models.CharField(max_length=10, choices=TYPE_CHOICES, default='GENERAL')
-    last_updated = models.DateTimeField(auto_now=True)
+    last_updated = models.DateTimeField(auto_now=True, db_index=True)
+    # Maintained by inventory.search on PostgreSQL; always NULL elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ComponentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the catalogue walks (name, id).
+            models.Index(fields=['name', 'id'], name='component_name_id_idx'),
+            # ... and the same walk within one category, type or box facet.
+            models.Index(fields=['category', 'name', 'id'], name='component_category_name_idx'),
+            models.Index(fields=['component_type', 'name', 'id'], name='component_type_name_idx'),
+            models.Index(fields=['box_number', 'name', 'id'], name='component_box_name_idx'),
+            # PostgreSQL only; migration 0011 skips them on other databases.
+            GinIndex(fields=['search_vector'], name='component_search_gin'),
+            GinIndex(fields=['serial_number'], name='component_serial_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['box_number'], name='component_box_trgm', opclasses=['gin_trgm_ops']),
+            # Only low-stock rows are indexed, in the order the low-stock list shows them.
+            models.Index(
+                fields=['quantity', 'name', 'id'],
+                condition=Q(quantity__lte=F('reorder_level')),
+                name='component_low_stock_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.reorder_level is None:
+            self.reorder_level = default_reorder_level(self.component_type)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'reorder_level'}
+        super().save(*args, **kwargs)
+
+    @property
+    def is_low_stock(self):
+        level = self.reorder_level if self.reorder_level is not None else default_reorder_level(self.component_type)
+        return self.quantity <= level
+
+def _per_beneficiary_total(queryset, link, field, output_field, **filters):
+    """Correlated ``SUM(field)`` of ``queryset`` rows pointing at the outer beneficiary, 0 when none."""
+    total = (
+        queryset.filter(**{link: OuterRef('pk')}, **filters).order_by()
+        .values(link).annotate(total=Sum(field)).values('total')
+    )
+    return Coalesce(Subquery(total, output_field=output_field), Value(0), output_field=output_field)
+
+
+class BeneficiaryQuerySet(models.QuerySet):
+    def with_history_summary(self):
+        """Annotate loan and purchase totals, all computed inside the one SELECT."""
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        return self.annotate(
+            items_out=_per_beneficiary_total(Transaction.objects, 'borrower', 'quantity_taken', models.IntegerField(),
+                                             return_time__isnull=True),
+            items_borrowed=_per_beneficiary_total(Transaction.objects, 'borrower', 'quantity_taken', models.IntegerField()),
+            total_spent=_per_beneficiary_total(Sale.objects, 'buyer', 'total_price', money),
+            unpaid_total=_per_beneficiary_total(Sale.objects, 'buyer', 'total_price', money, is_paid=False),
+        )
+
+
 class Beneficiary(models.Model):
     CATEGORY_CHOICES = [
         ('Employee', 'Employee'),
@@ -64,35 +168,228 @@ class Beneficiary(models.Model):
     role = models.CharField(max_length=50, blank=True)
     
     added_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, related_name='added_beneficiaries')
-    
+
+    objects = BeneficiaryQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "Beneficiaries"
 
     def __str__(self):
         return f"{self.name} ({self.category})"
 
+
+class BeneficiaryIdentifier(models.Model):
+    """Normalized employee/student ID, unique across both kinds, for indexed lookups."""
+    KIND_CHOICES = [
+        ('EMPLOYEE', 'Employee ID'),
+        ('STUDENT', 'Student ID'),
+    ]
+
+    beneficiary = models.ForeignKey(Beneficiary, on_delete=models.CASCADE, related_name='identifiers')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.value}"
+
+def default_due_at():
+    return timezone.now() + datetime.timedelta(days=getattr(settings, 'LOAN_PERIOD_DAYS', 14))
+
+
+class TransactionQuerySet(models.QuerySet):
+    def open(self):
+        return self.filter(return_time__isnull=True)
+
+    def overdue(self, now=None):
+        # Same predicate as transaction_open_due_idx, so this reads the
+        # (small) partial index rather than the whole loan history.
+        return self.open().filter(due_at__lt=now or timezone.now())
+
+
 class Transaction(models.Model):
     component = models.ForeignKey(Component, on_delete=models.CASCADE)
     borrower = models.ForeignKey(Beneficiary, on_delete=models.CASCADE, null=True)
     authorized_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True)
     checkout_time = models.DateTimeField(auto_now_add=True)
+    due_at = models.DateTimeField(default=default_due_at, null=True, blank=True)
     return_time = models.DateTimeField(null=True, blank=True)
+    reminded_at = models.DateTimeField(null=True, blank=True, help_text="When the last overdue reminder was queued")
     quantity_taken = models.IntegerField(default=1)
     notes = models.TextField(blank=True, null=True, help_text="Optional description or notes")
 
+    objects = TransactionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # A beneficiary's history, newest first, one index range per page.
+            models.Index(fields=['borrower', '-checkout_time', '-id'], name='transaction_borrower_idx'),
+            models.Index(
+                fields=['due_at', 'id'],
+                name='transaction_open_due_idx',
+                condition=Q(return_time__isnull=True),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.borrower.name} - {self.component.name}"
 
+    @property
+    def is_overdue(self):
+        return self.return_time is None and self.due_at is not None and self.due_at < timezone.now()
+
 class Sale(models.Model):
     component = models.ForeignKey(Component, on_delete=models.CASCADE)
     buyer = models.ForeignKey(Beneficiary, on_delete=models.CASCADE, null=True)
     authorized_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True)
-    sale_time = models.DateTimeField(auto_now_add=True)
+    sale_time = models.DateTimeField(auto_now_add=True, db_index=True)
     quantity_sold = models.IntegerField(default=1)
     price_per_unit = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     is_paid = models.BooleanField(default=False)
     notes = models.TextField(blank=True, null=True, help_text="Optional description or notes")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['buyer', '-sale_time', '-id'], name='sale_buyer_idx'),
+            # Only unpaid sales, oldest first per buyer: balances and payment reconciliation.
+            models.Index(fields=['buyer', 'sale_time', 'id'], condition=Q(is_paid=False), name='sale_unpaid_buyer_idx'),
+        ]
+
     def __str__(self):
         return f"{self.buyer.name if self.buyer else 'Unknown'} - {self.component.name}"
+
+
+class StockMovement(models.Model):
+    """Append-only ledger entry for one change to a component's quantity."""
+    REASON_CHOICES = [
+        ('INITIAL', 'Initial stock'),
+        ('CHECKOUT', 'Checkout'),
+        ('RETURN', 'Return'),
+        ('SALE', 'Sale'),
+        ('RESTOCK', 'Restock'),
+        ('ADJUSTMENT', 'Manual adjustment'),
+    ]
+
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='stock_movements')
+    change = models.IntegerField(help_text="Signed quantity delta")
+    quantity_after = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    transaction = models.ForeignKey(Transaction, on_delete=models.SET_NULL, null=True, blank=True)
+    sale = models.ForeignKey(Sale, on_delete=models.SET_NULL, null=True, blank=True)
+    performed_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['component', 'created_at'], name='movement_component_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.component.name}: {self.change:+d} ({self.reason})"
+
+    @property
+    def quantity_before(self):
+        return self.quantity_after - self.change
+
+class DashboardStats(models.Model):
+    """Single-row snapshot of the dashboard counters, kept current by inventory.stats."""
+    SINGLETON_PK = 1
+
+    total_components = models.IntegerField(default=0)
+    total_kits = models.IntegerField(default=0)
+    low_stock_count = models.IntegerField(default=0)
+    active_checkouts = models.IntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    unpaid_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Bumped with every catalogue change; keys inventory.catalogue_cache entries.
+    catalogue_version = models.PositiveBigIntegerField(default=0)
+    # Moved forward with catalogue_version; the cached catalogue pages' Last-Modified.
+    catalogue_modified = models.DateTimeField(default=timezone.now)
+    # Bumped with every sale and payment; keys the dashboard's recent-sales panel.
+    sales_version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Dashboard stats"
+
+    def __str__(self):
+        return f"Dashboard stats (updated {self.updated_at:%Y-%m-%d %H:%M})"
+
+
+class EmailOutbox(models.Model):
+    """A notification email waiting to be sent by the deliver_outbox worker."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('DEAD', 'Dead-lettered'),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Email outbox"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+
+class DailySalesRollup(models.Model):
+    """Sales of one component on one (local) day, maintained by inventory.rollups."""
+    day = models.DateField()
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    sales = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'component'], name='sales_rollup_day_component'),
+        ]
+        indexes = [
+            models.Index(fields=['category', 'day'], name='sales_rollup_category_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.component_id} x{self.units}"
+
+
+class DailyUsageRollup(models.Model):
+    """Checkouts of one component on one (local) day, maintained by inventory.rollups."""
+    day = models.DateField()
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    checkouts = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'component'], name='usage_rollup_day_component'),
+        ]
+        indexes = [
+            models.Index(fields=['category', 'day'], name='usage_rollup_category_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.component_id} x{self.units}"
+
+
+class RollupWatermark(models.Model):
+    """Highest source row id already folded into a rollup table."""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
@@ -0,0 +1,84 @@
+"""Transactional email outbox.
+
+Views call ``enqueue()`` inside the same database transaction as the change
+the email describes, so a notification exists if and only if the change was
+committed. The ``deliver_outbox`` management command sends queued mail in
+batches over one reused connection, retrying failures with exponential
+backoff and dead-lettering messages that keep failing.
+"""
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=6)
+
+
+def enqueue(subject, body, recipient):
+    return EmailOutbox.objects.create(subject=subject, body=body, recipient=recipient)
+
+
+def enqueue_many(messages):
+    """Queue ``(subject, body, recipient)`` tuples with one INSERT."""
+    return EmailOutbox.objects.bulk_create(
+        [EmailOutbox(subject=subject, body=body, recipient=recipient) for subject, body, recipient in messages]
+    )
+
+
+def retry_delay(attempts):
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def deliver_batch(connection, batch_size=DEFAULT_BATCH_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Send up to ``batch_size`` due messages; returns (sent, failed) counts.
+
+    Rows are locked with SKIP LOCKED so several workers can drain the
+    outbox side by side without sending anything twice.
+    """
+    sent = failed = 0
+    with atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        for item in batch:
+            message = EmailMessage(item.subject, item.body, None, [item.recipient], connection=connection)
+            item.attempts += 1
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                failed += 1
+                item.last_error = f"{type(e).__name__}: {e}"
+                if item.attempts >= max_attempts:
+                    item.status = 'DEAD'
+                else:
+                    item.next_attempt_at = timezone.now() + retry_delay(item.attempts)
+            else:
+                sent += 1
+                item.status = 'SENT'
+                item.sent_at = timezone.now()
+                item.last_error = ''
+            item.save(update_fields=['attempts', 'status', 'next_attempt_at', 'sent_at', 'last_error'])
+    return sent, failed
+
+
+def deliver_due(batch_size=DEFAULT_BATCH_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS, connection=None):
+    """Drain every message that is currently due, batch by batch."""
+    connection = connection or get_connection()
+    total_sent = total_failed = 0
+    # One SMTP session (TLS handshake and login) for the whole run.
+    with connection:
+        while True:
+            sent, failed = deliver_batch(connection, batch_size, max_attempts)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < batch_size:
+                break
+    return total_sent, total_failed
@@ -0,0 +1,124 @@
+import base64
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset."""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _cursor_value(value):
+    # Full-precision ISO strings: DjangoJSONEncoder drops microseconds, which
+    # would make timestamp cursors skip or repeat rows.
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor.")
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=_cursor_value, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _cursor_field_value(model, field, value):
+    """``value`` as the type of the ordering column ``field``, or InvalidCursor."""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise InvalidCursor("Malformed cursor.")
+    try:
+        model_field = model._meta.get_field(field.lstrip('-'))
+    except FieldDoesNotExist:
+        # Not a column: an annotation such as the search rank, which is a number.
+        if isinstance(value, str):
+            raise InvalidCursor("Malformed cursor.")
+        return value
+    try:
+        value = model_field.to_python(value)
+        model_field.run_validators(value)
+    except ValidationError:
+        raise InvalidCursor("Malformed cursor.")
+    return value
+
+
+def decode_cursor(cursor, ordering, model):
+    """The ordering values in ``cursor``, checked against ``model``'s fields; raises InvalidCursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor.")
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor("Malformed cursor.")
+    return [_cursor_field_value(model, field, value) for field, value in zip(ordering, values)]
+
+
+def _after(ordering, values):
+    """Build the "row comes after ``values``" predicate for an ordering.
+
+    For ``('name', 'id')`` this is ``name > n OR (name = n AND id > i)``,
+    which the database can answer straight from a composite index.
+    """
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            step &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= step
+    return condition
+
+
+def _page_queryset(queryset, ordering, cursor, page_size):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, ordering, queryset.model)))
+    return queryset[:page_size + 1]
+
+
+def _page(items, ordering, page_size):
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, f.lstrip('-')) for f in ordering])
+    return KeysetPage(items, next_cursor)
+
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=50):
+    """Return a KeysetPage of ``queryset`` ordered by ``ordering``.
+
+    ``ordering`` must end in a unique column (normally ``id``) so that the
+    ordering is total. Unlike OFFSET pagination every page costs the same
+    single query, however deep into the result set it is.
+    """
+    return _page(list(_page_queryset(queryset, ordering, cursor, page_size)), ordering, page_size)
+
+
+async def akeyset_paginate(queryset, ordering, cursor=None, page_size=50):
+    """Async version of ``keyset_paginate`` for async views."""
+    items = [item async for item in _page_queryset(queryset, ordering, cursor, page_size)]
+    return _page(items, ordering, page_size)
@@ -0,0 +1,54 @@
+"""Cached dashboard panels.
+
+The latest-kits, recent-sales and low-stock panels are rendered once per
+version and then read back from the cache. The versions are counters on
+the DashboardStats row, which the dashboard reads anyway for its headline
+numbers. ``catalogue_version`` moves with every stock movement and
+component change, and ``sales_version`` with every sale and payment, both
+in the same database transaction as the write. A cached panel therefore
+never outlives the data it shows, and checking it costs no extra query.
+Buyer and component renames reach the sales panel when it next expires.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Component, Sale
+
+PANEL_TIMEOUT = 10 * 60
+LOW_STOCK_ROWS = 8
+LOW_STOCK_ORDERING = ('quantity', 'name', 'id')
+
+# name -> (template, context variable, DashboardStats version field, queryset)
+PANELS = {
+    'kits': ('inventory/partials/panels/kits.html', 'kits', 'catalogue_version',
+             lambda: Component.objects.select_related('category').filter(component_type='KIT').order_by('-last_updated')[:4]),
+    'sales': ('inventory/partials/panels/sales.html', 'sales', 'sales_version',
+              lambda: Sale.objects.select_related('component', 'buyer').order_by('-sale_time')[:4]),
+    'low_stock': ('inventory/partials/panels/low_stock.html', 'low_stock_components', 'catalogue_version',
+                  lambda: Component.objects.low_stock().order_by(*LOW_STOCK_ORDERING)[:LOW_STOCK_ROWS]),
+}
+
+
+def panel_key(name, snapshot):
+    return f"dashboard-panel:{name}:{getattr(snapshot, PANELS[name][2])}"
+
+
+async def _render(name):
+    template, variable, _, queryset = PANELS[name]
+    rows = [obj async for obj in queryset()]
+    return (await sync_to_async(render_to_string)(template, {variable: rows})).strip()
+
+
+async def render(snapshot):
+    """{panel name: HTML} for the dashboard, rendering only the panels whose version moved."""
+    keys = {name: panel_key(name, snapshot) for name in PANELS}
+    cached = await cache.aget_many(keys.values())
+    missing = [name for name, key in keys.items() if key not in cached]
+    rendered = dict(zip(missing, await asyncio.gather(*(_render(name) for name in missing))))
+    if rendered:
+        await cache.aset_many({keys[name]: html for name, html in rendered.items()}, PANEL_TIMEOUT)
+    return {name: mark_safe(rendered[name] if name in rendered else cached[key]) for name, key in keys.items()}
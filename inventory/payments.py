@@ -0,0 +1,174 @@
+"""Sale payments and bulk reconciliation.
+
+``mark_paid()`` settles any number of sales with one UPDATE and moves
+their total from the dashboard's unpaid figure to revenue in the same
+transaction. The unpaid rows are locked first, so a sale marked paid
+concurrently (e.g. from its own page) is never counted twice.
+
+``reconcile()`` matches a batch of received payments, each a buyer and an
+amount, against the buyers' unpaid sales. A payment settles a single sale
+of exactly that amount if there is one, otherwise the buyer's oldest sales
+when their totals add up to it exactly (a buyer clearing their whole
+balance is the common case). Payments that match nothing are reported and
+never settle anything partially. The whole batch costs a constant number
+of queries: one lookup per kind of buyer reference, one locked read of
+the buyers' unpaid sales, one UPDATE and the counter bump.
+
+``outstanding_balances()`` is the per-buyer view of what is still owed,
+from one grouped aggregate over the unpaid-sales index.
+"""
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Sum
+from django.db.transaction import atomic
+
+from . import identifiers, stats
+from .models import BeneficiaryIdentifier, Beneficiary, Sale
+
+MAX_REPORTED_ERRORS = 1000
+COLUMNS = ('buyer', 'amount')
+
+
+def _settle(ids, amount):
+    """Mark the locked, unpaid sales ``ids`` paid and move ``amount`` to revenue."""
+    count = Sale.objects.filter(pk__in=ids, is_paid=False).update(is_paid=True)
+    stats.record_payment(amount)
+    return count
+
+
+def mark_paid(sales):
+    """Mark the unpaid sales in ``sales`` paid; returns (number marked, amount)."""
+    with atomic():
+        # Lock through a subquery so joins in ``sales`` (e.g. admin filters) aren't locked too.
+        locked = Sale.objects.filter(pk__in=sales.values('pk'), is_paid=False).select_for_update()
+        rows = list(locked.values_list('pk', 'total_price'))
+        if not rows:
+            return 0, 0
+        amount = sum(price for _, price in rows)
+        return _settle([pk for pk, _ in rows], amount), amount
+
+
+class ReconcileResult:
+    def __init__(self):
+        self.payments = 0
+        self.sales = 0
+        self.amount = Decimal('0')
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def read_payments(stream):
+    """``(line, buyer, amount)`` rows from a CSV with ``buyer`` and ``amount`` columns.
+
+    Malformed CSV raises ValueError like a missing column does, so callers
+    report both the same way.
+    """
+    reader = csv.DictReader(stream)
+    try:
+        missing = [column for column in COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}.")
+        for row in reader:
+            yield reader.line_num, (row['buyer'] or '').strip(), (row['amount'] or '').strip()
+    except csv.Error as e:
+        raise ValueError(f"Line {reader.line_num}: {e}.")
+
+
+def _parse_amount(raw):
+    try:
+        amount = Decimal(raw.replace(',', '').lstrip('₹'))
+    except InvalidOperation:
+        return None
+    if not amount.is_finite() or amount <= 0 or amount != amount.quantize(Decimal('0.01')):
+        return None
+    return amount
+
+
+def _resolve_buyers(references):
+    """Buyer reference -> beneficiary id: a student/employee ID, or ``#<id>`` as shown on the balances screen."""
+    numbers = {ref: ref[1:] for ref in references if ref.startswith('#') and ref[1:].isdigit()}
+    cards = {ref: identifiers.normalize(ref) for ref in references if ref not in numbers}
+    resolved = {}
+    if cards:
+        owners = dict(BeneficiaryIdentifier.objects.filter(value__in=set(cards.values())).values_list('value', 'beneficiary_id'))
+        resolved.update((ref, owners[value]) for ref, value in cards.items() if value in owners)
+    if numbers:
+        existing = set(Beneficiary.objects.filter(pk__in={int(n) for n in numbers.values()}).values_list('pk', flat=True))
+        resolved.update((ref, int(n)) for ref, n in numbers.items() if int(n) in existing)
+    return resolved
+
+
+def _match(open_sales, amount):
+    """Indexes into ``open_sales`` (oldest first) settled by ``amount``, or None."""
+    for index, (_, price) in enumerate(open_sales):
+        if price == amount:
+            return [index]
+    total = Decimal('0')
+    for index, (_, price) in enumerate(open_sales):
+        total += price
+        if total == amount:
+            return list(range(index + 1))
+        if total > amount:
+            break
+    return None
+
+
+def reconcile(rows, dry_run=False):
+    """Match ``(line, buyer, amount)`` payments to unpaid sales and settle them in one UPDATE."""
+    result = ReconcileResult()
+    payments = []
+    for line, buyer, raw_amount in rows:
+        amount = _parse_amount(raw_amount)
+        if not buyer:
+            result.add_error(line, "Missing buyer.")
+        elif amount is None:
+            result.add_error(line, f"Invalid amount '{raw_amount}'.")
+        else:
+            payments.append((line, buyer, amount))
+
+    buyers = _resolve_buyers({buyer for _, buyer, _ in payments})
+    with atomic():
+        open_sales = {}
+        for pk, buyer_id, price in (
+            Sale.objects.filter(buyer_id__in=set(buyers.values()), is_paid=False)
+            .select_for_update().order_by('buyer_id', 'sale_time', 'id').values_list('pk', 'buyer_id', 'total_price')
+        ):
+            open_sales.setdefault(buyer_id, []).append((pk, price))
+
+        settled = []
+        for line, buyer, amount in payments:
+            if buyer not in buyers:
+                result.add_error(line, f"No beneficiary with ID '{buyer}'.")
+                continue
+            remaining = open_sales.get(buyers[buyer], [])
+            matched = _match(remaining, amount)
+            if matched is None:
+                outstanding = sum((price for _, price in remaining), Decimal('0'))
+                result.add_error(line, f"No unpaid sales of '{buyer}' add up to ₹{amount} (₹{outstanding} outstanding).")
+                continue
+            settled.extend(remaining[index][0] for index in matched)
+            open_sales[buyers[buyer]] = [sale for index, sale in enumerate(remaining) if index not in matched]
+            result.payments += 1
+            result.amount += amount
+
+        result.sales = len(settled)
+        if settled and not dry_run:
+            _settle(settled, result.amount)
+    return result
+
+
+def outstanding_balances(limit=None):
+    """Buyers with unpaid sales, largest balance first: buyer_id, buyer__name, balance, sales."""
+    balances = (
+        Sale.objects.filter(is_paid=False, buyer__isnull=False)
+        .values('buyer_id', 'buyer__name')
+        .annotate(balance=Sum('total_price'), sales=Count('id'))
+        .order_by('-balance', 'buyer_id')
+    )
+    return balances[:limit] if limit else balances
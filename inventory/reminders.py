@@ -0,0 +1,70 @@
+"""Overdue-loan reminders.
+
+``queue_reminders()`` reads every overdue open loan in one query, served by
+the partial ``transaction_open_due_idx`` index. It groups the loans per
+borrower and queues one message per borrower that lists all of their
+overdue items. In the same transaction it stamps ``reminded_at`` on those
+loans with a single UPDATE, so a borrower hears from us at most once per
+``interval`` however often the command runs. ``deliver_outbox`` then sends
+the whole run over one SMTP connection.
+"""
+import datetime
+from itertools import groupby
+
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from . import outbox
+from .models import Transaction
+
+DEFAULT_INTERVAL = datetime.timedelta(days=1)
+
+
+def overdue_by_borrower(now=None):
+    """``[(beneficiary, [loan, ...]), ...]`` for borrowers with an email address."""
+    loans = (
+        Transaction.objects.overdue(now)
+        .filter(borrower__email__gt='')
+        .select_related('borrower', 'component')
+        .only('id', 'due_at', 'reminded_at', 'quantity_taken', 'borrower__name', 'borrower__email', 'component__name')
+        .order_by('borrower_id', 'due_at', 'id')
+    )
+    return [(group[0].borrower, group) for group in (list(g) for _, g in groupby(loans, key=lambda t: t.borrower_id))]
+
+
+def reminder_message(beneficiary, loans):
+    items = '\n'.join(f"- {t.component.name} x {t.quantity_taken} (due {timezone.localtime(t.due_at):%Y-%m-%d})" for t in loans)
+    subject = f"RoboStock: Overdue Items Reminder - {len(loans)} item(s)"
+    message = f"""
+Hello {beneficiary.name},
+
+The following items you borrowed from the RoboStock Laboratory Inventory are past their due date.
+
+Items:
+{items}
+
+Please return them to the lab as soon as possible.
+
+Best regards,
+RoboStock Lab Management
+    """
+    return subject, message, beneficiary.email
+
+
+def queue_reminders(now=None, interval=DEFAULT_INTERVAL, dry_run=False):
+    """Queue one reminder per borrower with overdue loans; returns (borrowers, loans) reminded.
+
+    Borrowers reminded within ``interval`` are skipped unless one of their
+    loans has become overdue since.
+    """
+    now = now or timezone.now()
+    with atomic():
+        due = [
+            (beneficiary, loans) for beneficiary, loans in overdue_by_borrower(now)
+            if any(t.reminded_at is None or t.reminded_at <= now - interval for t in loans)
+        ]
+        loan_ids = [t.pk for _, loans in due for t in loans]
+        if due and not dry_run:
+            outbox.enqueue_many([reminder_message(beneficiary, loans) for beneficiary, loans in due])
+            Transaction.objects.filter(pk__in=loan_ids).update(reminded_at=now)
+    return len(due), len(loan_ids)
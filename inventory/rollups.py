@@ -0,0 +1,176 @@
+"""Daily sales and usage rollups for reporting.
+
+``refresh()`` folds Sale and Transaction rows into per-day, per-component
+totals (DailySalesRollup, DailyUsageRollup). It only reads rows whose id is
+above the stored RollupWatermark, so each run costs in proportion to what
+changed since the last one. The reports view then aggregates the small
+rollup tables instead of the raw history.
+
+Rows younger than ``SETTLE_DELAY`` are left for the next run, so a
+transaction that took an id before the watermark moved but committed after
+it is still counted. Sales are rolled up at their sale value whether or
+not they have been paid. Deleting a beneficiary cascades to their
+history, and after that ``rebuild()`` brings the rollups back in line.
+"""
+import datetime
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from .models import DailySalesRollup, DailyUsageRollup, RollupWatermark, Sale, Transaction
+
+DEFAULT_BATCH_SIZE = 5000
+SETTLE_DELAY = datetime.timedelta(minutes=2)
+
+# name -> (source model, timestamp field, rollup model, {measure: aggregate})
+SOURCES = {
+    'sales': (Sale, 'sale_time', DailySalesRollup,
+              {'sales': Count('id'), 'units': Sum('quantity_sold'), 'revenue': Sum('total_price')}),
+    'usage': (Transaction, 'checkout_time', DailyUsageRollup,
+              {'checkouts': Count('id'), 'units': Sum('quantity_taken')}),
+}
+
+
+def _merge(rollup, groups, measures):
+    """Add grouped totals onto the matching rollup rows, creating missing ones."""
+    groups = list(groups)
+    if not groups:
+        return
+    existing = {
+        (row.day, row.component_id): row
+        for row in rollup.objects.select_for_update().filter(
+            day__in={g['day'] for g in groups}, component_id__in={g['component_id'] for g in groups},
+        )
+    }
+    new, changed = [], []
+    for group in groups:
+        row = existing.get((group['day'], group['component_id']))
+        if row is None:
+            new.append(rollup(day=group['day'], component_id=group['component_id'],
+                              category_id=group['component__category_id'],
+                              **{measure: group[measure] for measure in measures}))
+        else:
+            for measure in measures:
+                setattr(row, measure, getattr(row, measure) + group[measure])
+            row.category_id = group['component__category_id']
+            changed.append(row)
+    rollup.objects.bulk_create(new)
+    rollup.objects.bulk_update(changed, [*measures, 'category'])
+
+
+def _refresh_one(name, batch_size, settle_delay):
+    model, time_field, rollup, measures = SOURCES[name]
+    cutoff = timezone.now() - settle_delay
+    processed = 0
+    while True:
+        with atomic():
+            # Holding the watermark lock keeps concurrent runs from double counting.
+            RollupWatermark.objects.get_or_create(name=name)
+            mark = RollupWatermark.objects.select_for_update().get(name=name)
+            pending = model.objects.filter(pk__gt=mark.last_id)
+            unsettled = pending.filter(**{f'{time_field}__gte': cutoff}).order_by('pk').values_list('pk', flat=True).first()
+            if unsettled is not None:
+                pending = pending.filter(pk__lt=unsettled)
+            ids = list(pending.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return processed
+
+            groups = (
+                model.objects.filter(pk__gt=mark.last_id, pk__lte=ids[-1])
+                .annotate(day=TruncDate(time_field))
+                .values('day', 'component_id', 'component__category_id')
+                .annotate(**measures)
+                .order_by()
+            )
+            _merge(rollup, groups, measures)
+            mark.last_id = ids[-1]
+            mark.save(update_fields=['last_id', 'updated_at'])
+        processed += len(ids)
+        if len(ids) < batch_size:
+            return processed
+
+
+def refresh(batch_size=DEFAULT_BATCH_SIZE, settle_delay=SETTLE_DELAY):
+    """Fold rows added since the last run into the rollups; returns rows processed per source."""
+    return {name: _refresh_one(name, batch_size, settle_delay) for name in SOURCES}
+
+
+def rebuild(batch_size=DEFAULT_BATCH_SIZE, settle_delay=SETTLE_DELAY):
+    """Recompute every rollup from the full history."""
+    with atomic():
+        DailySalesRollup.objects.all().delete()
+        DailyUsageRollup.objects.all().delete()
+        RollupWatermark.objects.filter(name__in=SOURCES).update(last_id=0)
+    return refresh(batch_size, settle_delay)
+
+
+PERIODS = {
+    'day': F('day'),
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+}
+DEFAULT_SPANS = {
+    'day': datetime.timedelta(days=29),
+    'week': datetime.timedelta(weeks=11),
+    'month': datetime.timedelta(days=364),
+}
+
+
+def _bucket_start(day, period):
+    if period == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day, period):
+    if period == 'week':
+        return day + datetime.timedelta(weeks=1)
+    if period == 'month':
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return day + datetime.timedelta(days=1)
+
+
+def series(period, start, end, category=None):
+    """Revenue and usage per ``period`` bucket between two dates, gaps filled with zeros."""
+    sales = DailySalesRollup.objects.filter(day__range=(start, end))
+    usage = DailyUsageRollup.objects.filter(day__range=(start, end))
+    if category is not None:
+        sales = sales.filter(category=category)
+        usage = usage.filter(category=category)
+    bucket = PERIODS[period]
+
+    points = {}
+    day = _bucket_start(start, period)
+    while day <= end:
+        points[day] = {'bucket': day, 'revenue': 0, 'sales': 0, 'units_sold': 0, 'checkouts': 0, 'units_used': 0}
+        day = _next_bucket(day, period)
+
+    for row in sales.annotate(bucket=bucket).values('bucket').annotate(
+            revenue=Sum('revenue'), count=Sum('sales'), units=Sum('units')).order_by():
+        point = points[_bucket_start(row['bucket'], period)]
+        point.update(revenue=row['revenue'], sales=row['count'], units_sold=row['units'])
+    for row in usage.annotate(bucket=bucket).values('bucket').annotate(
+            count=Sum('checkouts'), units=Sum('units')).order_by():
+        point = points[_bucket_start(row['bucket'], period)]
+        point.update(checkouts=row['count'], units_used=row['units'])
+    return list(points.values())
+
+
+def top_categories(start, end, limit=10):
+    """Categories by revenue and checkouts over the range, from the rollups only."""
+    revenue = dict(
+        DailySalesRollup.objects.filter(day__range=(start, end)).values('category__name')
+        .annotate(total=Sum('revenue')).order_by().values_list('category__name', 'total')
+    )
+    checkouts = dict(
+        DailyUsageRollup.objects.filter(day__range=(start, end)).values('category__name')
+        .annotate(total=Sum('checkouts')).order_by().values_list('category__name', 'total')
+    )
+    rows = [{'category': name, 'revenue': revenue.get(name, 0), 'checkouts': checkouts.get(name, 0)}
+            for name in revenue.keys() | checkouts.keys()]
+    rows.sort(key=lambda row: (-row['revenue'], -row['checkouts'], row['category']))
+    return rows[:limit]
@@ -0,0 +1,81 @@
+"""Component search.
+
+On PostgreSQL components carry a stored, weighted ``search_vector`` (GIN
+indexed) and the serial/box columns have trigram indexes, so a search is a
+couple of index scans plus a ranking step. Other databases (SQLite in
+development) keep the original ``icontains`` behaviour.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connections
+from django.db.models import F, FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = 'english'
+
+
+def is_postgres(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def component_search_vector():
+    """Expression computing a component's search_vector inside an UPDATE."""
+    from .models import Category
+
+    category_name = Subquery(Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1])
+    return (
+        SearchVector('name', 'serial_number', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(category_name, 'box_number', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(queryset):
+    """Recompute search_vector for every component in ``queryset`` with one UPDATE."""
+    if not is_postgres(queryset.db):
+        return 0
+    return queryset.update(search_vector=component_search_vector())
+
+
+def _prefix_query(query):
+    # Match on word prefixes so results narrow as the user types.
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_components(queryset, query):
+    """Filter ``queryset`` by ``query``.
+
+    On PostgreSQL the result is annotated with a ``rank`` (text rank plus
+    serial-number similarity) for ordering; elsewhere it is unranked.
+    """
+    if not is_postgres(queryset.db):
+        return queryset.filter(
+            Q(name__icontains=query) |
+            Q(description__icontains=query) |
+            Q(category__name__icontains=query) |
+            Q(serial_number__icontains=query) |
+            Q(box_number__icontains=query)
+        )
+
+    # Typo-tolerant lookups on the short identifier columns; both use the
+    # gin_trgm_ops indexes.
+    matches = (
+        Q(serial_number__icontains=query) |
+        Q(serial_number__trigram_similar=query) |
+        Q(box_number__trigram_similar=query)
+    )
+    text_query = _prefix_query(query)
+    if text_query is not None:
+        matches |= Q(search_vector=text_query)
+        text_rank = SearchRank(F('search_vector'), text_query)
+    else:
+        text_rank = 0.0
+
+    # Cast to double precision so the rank round-trips exactly through
+    # keyset cursors.
+    rank = Cast(text_rank + TrigramSimilarity('serial_number', query), FloatField())
+    return queryset.annotate(rank=rank).filter(matches)
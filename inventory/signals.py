@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalogue_cache, identifiers, thumbnails
+from .models import Beneficiary, Category, Component
+from .search import refresh_search_vectors
+
+
+@receiver(post_save, sender=Component)
+def update_component_search_vector(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_search_vectors(Component.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def update_category_search_vectors(sender, instance, raw=False, **kwargs):
+    # The category name is part of every member component's vector.
+    if not raw:
+        refresh_search_vectors(Component.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Component)
+def make_component_thumbnails(sender, instance, raw=False, **kwargs):
+    if not raw and instance.image:
+        thumbnails.generate(instance.image)
+
+
+@receiver(post_save, sender=Beneficiary)
+def make_profile_thumbnails(sender, instance, raw=False, **kwargs):
+    if not raw and instance.photo:
+        thumbnails.generate(instance.photo)
+
+
+@receiver(post_save, sender=Beneficiary)
+def sync_beneficiary_identifiers(sender, instance, raw=False, **kwargs):
+    if not raw:
+        identifiers.sync(instance)
+
+
+@receiver(post_delete, sender=Beneficiary)
+def forget_beneficiary_identifiers(sender, instance, **kwargs):
+    # The identifier rows cascade; only the cached lookups need clearing.
+    identifiers.invalidate(identifiers.normalize(value) for value in (instance.employee_id, instance.student_id) if value)
+
+
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_public_catalogue(sender, **kwargs):
+    catalogue_cache.bump()
@@ -0,0 +1,122 @@
+"""Incrementally maintained dashboard counters.
+
+Every write path that changes a dashboard number calls one of the
+``record_*`` helpers inside its own database transaction, so the single
+DashboardStats row moves together with the rows it summarises. Rare,
+cascading operations (deleting a component, category or beneficiary) and
+edits made through the Django admin just call ``rebuild()``.
+"""
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Component, DashboardStats, Sale, Transaction
+
+
+def compute():
+    """Counter values computed from scratch with aggregate queries."""
+    components = Component.objects.all()
+    return {
+        'total_components': components.count(),
+        'total_kits': components.filter(component_type='KIT').count(),
+        'low_stock_count': components.low_stock().count(),
+        'active_checkouts': Transaction.objects.filter(return_time__isnull=True).count(),
+        'total_revenue': Sale.objects.filter(is_paid=True).aggregate(total=Sum('total_price'))['total'] or Decimal('0'),
+        'unpaid_sales': Sale.objects.filter(is_paid=False).aggregate(total=Sum('total_price'))['total'] or Decimal('0'),
+    }
+
+
+def rebuild():
+    stats, created = DashboardStats.objects.update_or_create(pk=DashboardStats.SINGLETON_PK, defaults=compute())
+    if not created:
+        # Rebuilds follow cascading deletes, which can take sales with them.
+        DashboardStats.objects.filter(pk=stats.pk).update(sales_version=F('sales_version') + 1)
+        stats.sales_version += 1
+    return stats
+
+
+def current():
+    """The dashboard snapshot, built on first use."""
+    stats = DashboardStats.objects.filter(pk=DashboardStats.SINGLETON_PK).first()
+    return stats or rebuild()
+
+
+async def acurrent():
+    """``current()`` for async views."""
+    stats = await DashboardStats.objects.filter(pk=DashboardStats.SINGLETON_PK).afirst()
+    return stats or await sync_to_async(rebuild)()
+
+
+def bump(**deltas):
+    """Atomically add ``deltas`` to the snapshot's counters."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = DashboardStats.objects.filter(pk=DashboardStats.SINGLETON_PK).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # No snapshot yet: computing one now already includes this change.
+        rebuild()
+
+
+def _kit(component_type):
+    return 1 if component_type == 'KIT' else 0
+
+
+def record_component_added(component):
+    bump(total_components=1, total_kits=_kit(component.component_type), low_stock_count=int(component.is_low_stock))
+
+
+def _stock_deltas(component, old_type, old_quantity, old_reorder_level=None):
+    if old_reorder_level is None:
+        old_reorder_level = component.reorder_level
+    was_low = Component(component_type=old_type, quantity=old_quantity, reorder_level=old_reorder_level).is_low_stock
+    return {
+        'total_kits': _kit(component.component_type) - _kit(old_type),
+        'low_stock_count': int(component.is_low_stock) - int(was_low),
+    }
+
+
+def record_component_changed(component, old_type, old_quantity, old_reorder_level=None):
+    """Adjust counters after a component's type, quantity or reorder level changed."""
+    bump(**_stock_deltas(component, old_type, old_quantity, old_reorder_level))
+
+
+def record_checkout(component, old_quantity):
+    bump(active_checkouts=1, **_stock_deltas(component, component.component_type, old_quantity))
+
+
+def record_movements(movements, active_checkouts=0):
+    """Counters for a batch of stock movements, in one UPDATE."""
+    # A component may move several times; compare its first "before" with where it ended up.
+    first = {}
+    for movement in movements:
+        first.setdefault(movement.component_id, movement)
+    low_stock = sum(
+        _stock_deltas(movement.component, movement.component.component_type, movement.quantity_before)['low_stock_count']
+        for movement in first.values()
+    )
+    bump(active_checkouts=active_checkouts, low_stock_count=low_stock)
+
+
+def record_checkouts(movements):
+    """Counters for a batch of checkout movements, in one UPDATE."""
+    record_movements(movements, active_checkouts=len(movements))
+
+
+def record_return(component, old_quantity):
+    bump(active_checkouts=-1, **_stock_deltas(component, component.component_type, old_quantity))
+
+
+def record_sale(sale, old_quantity):
+    total = 'total_revenue' if sale.is_paid else 'unpaid_sales'
+    bump(**{total: sale.total_price}, sales_version=1,
+         **_stock_deltas(sale.component, sale.component.component_type, old_quantity))
+
+
+def record_payment(amount):
+    bump(total_revenue=amount, unpaid_sales=-amount, sales_version=1)
@@ -0,0 +1,127 @@
+"""Stock mutations.
+
+Every change to ``Component.quantity`` goes through ``apply_movement``,
+which performs a single conditional ``UPDATE ... SET quantity = quantity + n``
+(guarded by ``quantity >= -n`` for withdrawals) and appends a StockMovement
+row. Concurrent checkouts of the same part therefore can neither lose an
+update nor drive the quantity negative.
+"""
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from . import catalogue_cache
+from .models import Component, StockMovement
+
+
+class InsufficientStock(Exception):
+    def __init__(self, component, available):
+        self.component = component
+        self.available = available
+        super().__init__(f"Only {available} items available.")
+
+
+def apply_movement(component, change, reason, user=None, transaction=None, sale=None):
+    """Atomically add ``change`` to ``component``'s quantity and log it.
+
+    Raises InsufficientStock if a withdrawal exceeds the stock actually in
+    the database. On success ``component.quantity`` is refreshed and the new
+    StockMovement is returned.
+    """
+    with atomic():
+        rows = Component.objects.filter(pk=component.pk)
+        if change < 0:
+            rows = rows.filter(quantity__gte=-change)
+        updated = rows.update(quantity=F('quantity') + change, last_updated=timezone.now())
+        # Our UPDATE holds the row lock, so this read sees exactly our result.
+        current = Component.objects.filter(pk=component.pk).values_list('quantity', flat=True).first()
+        if not updated:
+            raise InsufficientStock(component, current or 0)
+
+        catalogue_cache.bump()
+        component.quantity = current
+        return StockMovement.objects.create(
+            component=component,
+            change=change,
+            quantity_after=current,
+            reason=reason,
+            transaction=transaction,
+            sale=sale,
+            performed_by=user,
+        )
+
+
+class _ShortStock(Exception):
+    pass
+
+
+def apply_movements(lines, reason, user=None):
+    """Apply several movements with one guarded UPDATE.
+
+    ``lines`` is a list of ``(component, change, transaction)`` tuples.
+    Lines for the same component (a bulk return of several loans of one
+    part) are summed in the UPDATE and still get a ledger row each, in
+    order. Either every line is applied or, if any withdrawal exceeds the
+    stock in the database, none is and InsufficientStock names the first
+    short component. Query count is constant in the number of lines.
+    """
+    if len(lines) == 1:
+        component, change, transaction = lines[0]
+        return [apply_movement(component, change, reason, user=user, transaction=transaction)]
+
+    totals = {}
+    for component, change, _ in lines:
+        totals[component.pk] = totals.get(component.pk, 0) + change
+
+    with atomic():
+        delta = Case(
+            *[When(pk=pk, then=Value(change)) for pk, change in totals.items()],
+            output_field=IntegerField(),
+        )
+        guard = Q()
+        for pk, change in totals.items():
+            guard |= Q(pk=pk, quantity__gte=max(-change, 0))
+        try:
+            with atomic():
+                updated = Component.objects.filter(guard).update(
+                    quantity=F('quantity') + delta, last_updated=timezone.now()
+                )
+                if updated != len(totals):
+                    raise _ShortStock()
+        except _ShortStock:
+            # The savepoint is rolled back, so these are the untouched quantities.
+            available = dict(Component.objects.filter(pk__in=totals).values_list('pk', 'quantity'))
+            for component, _, _ in lines:
+                if available.get(component.pk, 0) + totals[component.pk] < 0:
+                    raise InsufficientStock(component, available.get(component.pk, 0))
+            raise InsufficientStock(lines[0][0], available.get(lines[0][0].pk, 0))
+
+        catalogue_cache.bump()
+        current = dict(Component.objects.filter(pk__in=totals).values_list('pk', 'quantity'))
+        # Walk each component forward from its quantity before the UPDATE.
+        running = {pk: current[pk] - change for pk, change in totals.items()}
+        movements = []
+        for component, change, transaction in lines:
+            running[component.pk] += change
+            component.quantity = current[component.pk]
+            movements.append(StockMovement(
+                component=component,
+                change=change,
+                quantity_after=running[component.pk],
+                reason=reason,
+                transaction=transaction,
+                performed_by=user,
+            ))
+        return StockMovement.objects.bulk_create(movements)
+
+
+def record_initial_stock(component, user=None):
+    """Log the opening quantity of a newly created component."""
+    if component.quantity:
+        return StockMovement.objects.create(
+            component=component,
+            change=component.quantity,
+            quantity_after=component.quantity,
+            reason='INITIAL',
+            performed_by=user,
+        )
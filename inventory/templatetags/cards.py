@@ -0,0 +1,50 @@
+import hashlib
+
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CARD_TEMPLATES = {
+    'catalogue': 'inventory/cards/catalogue.html',
+    'public': 'inventory/cards/public.html',
+    'recent': 'inventory/cards/recent.html',
+    'kit': 'inventory/cards/kit.html',
+}
+CARD_TIMEOUT = 24 * 60 * 60
+
+
+def card_key(component, variant, show_restock=False):
+    """Cache key for one rendered card.
+
+    Every stock movement and edit moves ``last_updated``, so a new key
+    replaces the old one without explicit invalidation. The category name
+    is hashed in because renaming a category leaves its components untouched.
+    """
+    category = hashlib.md5(component.category.name.encode()).hexdigest()[:8]
+    staff = ':staff' if show_restock else ''
+    return f"component-card:{variant}{staff}:{component.pk}:{component.last_updated.timestamp()}:{category}"
+
+
+@register.simple_tag(takes_context=True)
+def component_cards(context, components, variant):
+    """Cards for ``components``, each rendered once per change and read back in one cache round trip.
+
+        {% component_cards components 'catalogue' %}
+    """
+    user = context.get('user')
+    show_restock = variant == 'catalogue' and bool(user and user.is_staff)
+    keys = [card_key(component, variant, show_restock) for component in components]
+    cached = cache.get_many(keys)
+    missing = {}
+    html = []
+    for key, component in zip(keys, components):
+        card = cached.get(key)
+        if card is None:
+            card = missing[key] = render_to_string(CARD_TEMPLATES[variant], {'component': component, 'show_restock': show_restock})
+        html.append(card)
+    if missing:
+        cache.set_many(missing, CARD_TIMEOUT)
+    return mark_safe(''.join(html))
@@ -0,0 +1,34 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from inventory import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field, width, alt='', **attrs):
+    """``<picture>`` for a photo shown ``width`` CSS pixels wide.
+
+    Browsers pick from the WebP (or JPEG) variants up to 2x ``width``.
+    Images without generated variants fall back to the original upload.
+
+        {% responsive_image component.image 180 alt=component.name class="card-img-top" %}
+    """
+    if not field:
+        return ''
+    extra = format_html_join('', ' {}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items()))
+    if not thumbnails.has_variants(field):
+        return format_html('<img src="{}" alt="{}" loading="lazy" decoding="async"{}>', field.url, alt, extra)
+
+    max_size = thumbnails.best_size(width * 2)
+    sizes = f"{width}px"
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy" decoding="async"{}>'
+        '</picture>',
+        thumbnails.srcset(field, 'webp', max_size), sizes,
+        field.storage.url(thumbnails.variant_name(field.name, thumbnails.best_size(width), 'jpg')),
+        thumbnails.srcset(field, 'jpg', max_size), sizes, alt, extra,
+    )
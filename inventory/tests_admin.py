@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+from django.contrib.admin import helpers
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import stats
+from .models import Beneficiary, Category, Component, DashboardStats, Sale, StockMovement, Transaction
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(username='admin', password='password')
+        self.client.login(username='admin', password='password')
+        category = Category.objects.create(name="Sensors")
+        self.parts = [Component.objects.create(serial_number=f"SN-{i}", name=f"Part {i}", category=category,
+                                               quantity=i, reorder_level=2) for i in range(4)]
+        self.person = Beneficiary.objects.create(name="Asha", phone_number="1")
+
+    def changelist(self, model):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'admin:inventory_{model}_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def act(self, model, action, objects, **extra):
+        return self.client.post(reverse(f'admin:inventory_{model}_changelist'), {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [obj.pk for obj in objects],
+            **extra,
+        })
+
+    def test_changelists_do_not_query_per_row(self):
+        Transaction.objects.create(component=self.parts[1], borrower=self.person, authorized_by=self.user)
+        Sale.objects.create(component=self.parts[1], buyer=self.person, authorized_by=self.user, total_price=5)
+        few = {model: self.changelist(model) for model in ('transaction', 'sale', 'component', 'beneficiary')}
+        for i in range(10):
+            person = Beneficiary.objects.create(name=f"P{i}", phone_number=str(i), added_by=self.user)
+            Transaction.objects.create(component=self.parts[i % 4], borrower=person, authorized_by=self.user)
+            Sale.objects.create(component=self.parts[i % 4], buyer=person, authorized_by=self.user, total_price=5)
+        many = {model: self.changelist(model) for model in few}
+        self.assertEqual(few, many)
+
+    def test_change_forms_use_autocomplete(self):
+        loan = Transaction.objects.create(component=self.parts[1], borrower=self.person, authorized_by=self.user)
+        response = self.client.get(reverse('admin:inventory_transaction_change', args=[loan.pk]))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, f'>{self.parts[2]}</option>')
+
+    def test_quantity_is_not_editable_on_the_change_form(self):
+        part = self.parts[1]
+        url = reverse('admin:inventory_component_change', args=[part.pk])
+        self.assertNotIn('quantity', self.client.get(url).context['adminform'].form.fields)
+        self.client.post(url, {
+            'serial_number': part.serial_number, 'name': "Renamed", 'category': part.category_id,
+            'component_type': part.component_type, 'location': "Lab", 'reorder_level': 2, 'quantity': 99,
+        })
+        part.refresh_from_db()
+        self.assertEqual((part.name, part.quantity), ("Renamed", 1))
+
+    def test_bulk_restock(self):
+        stats.rebuild()
+        response = self.act('component', 'restock', self.parts[:3])
+        self.assertContains(response, 'Restock components')
+        with CaptureQueriesContext(connection) as queries:
+            self.act('component', 'restock', self.parts[:3], apply='1', quantity=5)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "inventory_component"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual([c.quantity for c in Component.objects.order_by('pk')], [5, 6, 7, 3])
+        self.assertEqual(StockMovement.objects.filter(reason='RESTOCK').count(), 3)
+        self.assertEqual(DashboardStats.objects.get().low_stock_count, stats.compute()['low_stock_count'])
+
+    def test_bulk_mark_paid(self):
+        sales = [Sale.objects.create(component=self.parts[1], buyer=self.person, total_price=price, is_paid=paid)
+                 for price, paid in ((10, False), (15, False), (20, True))]
+        stats.rebuild()
+        self.act('sale', 'mark_paid', sales)
+        self.assertFalse(Sale.objects.filter(is_paid=False).exists())
+        snapshot = DashboardStats.objects.get()
+        self.assertEqual((snapshot.unpaid_sales, snapshot.total_revenue), (Decimal('0'), Decimal('45')))
+
+    def test_bulk_return(self):
+        loans = [Transaction.objects.create(component=self.parts[3], borrower=self.person, quantity_taken=n)
+                 for n in (1, 2)]
+        done = Transaction.objects.create(component=self.parts[2], borrower=self.person, quantity_taken=1)
+        done.return_time = done.checkout_time
+        done.save()
+        stats.rebuild()
+        self.act('transaction', 'mark_returned', [*loans, done])
+        self.assertFalse(Transaction.objects.open().exists())
+        self.assertEqual(Component.objects.get(pk=self.parts[3].pk).quantity, 6)
+        self.assertEqual(Component.objects.get(pk=self.parts[2].pk).quantity, 2)
+        ledger = list(StockMovement.objects.filter(reason='RETURN').order_by('pk').values_list('change', 'quantity_after'))
+        self.assertEqual(ledger, [(1, 4), (2, 6)])
+        self.assertEqual(DashboardStats.objects.get().active_checkouts, 0)
+
+    def test_admin_edits_and_deletes_keep_dashboard_counters(self):
+        stats.rebuild()
+        self.client.post(reverse('admin:inventory_sale_add'), {
+            'component': self.parts[1].pk, 'buyer': self.person.pk, 'quantity_sold': 1,
+            'price_per_unit': 12, 'total_price': 12, 'authorized_by': self.user.pk,
+        })
+        self.assertTrue(Sale.objects.exists())
+        self.assertEqual(DashboardStats.objects.get().unpaid_sales, Decimal('12'))
+
+        self.act('component', 'delete_selected', self.parts[:2], post='yes')
+        self.assertEqual(Component.objects.count(), 2)
+        snapshot = DashboardStats.objects.get()
+        self.assertEqual({field: getattr(snapshot, field) for field in stats.compute()}, stats.compute())
+        self.assertEqual(snapshot.unpaid_sales, Decimal('0'))
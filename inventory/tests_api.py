@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import catalogue_cache, stats
+from .models import Beneficiary, Category, Component, Sale, Transaction
+from .pagination import encode_cursor
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+        User.objects.create_user(username='member', password='password')
+        self.category = Category.objects.create(name="Sensors")
+        self.components = [
+            Component.objects.create(serial_number=f"S-{i}", name=f"Sensor {i}", category=self.category, quantity=i)
+            for i in range(5)
+        ]
+        self.person = Beneficiary.objects.create(name="Asha", phone_number="1")
+        stats.rebuild()
+        self.client.login(username='staff', password='password')
+
+    def url(self, resource):
+        return reverse('api_list', args=[resource])
+
+    def test_cursor_pages_cover_every_component_once(self):
+        seen, url, params = [], self.url('components'), {'limit': 2, 'fields': 'id,name'}
+        while url:
+            data = self.client.get(url, params).json()
+            self.assertTrue(all(set(row) == {'id', 'name'} for row in data['results']))
+            seen.extend(row['id'] for row in data['results'])
+            url, params = data['next'], None
+        self.assertEqual(seen, [c.pk for c in self.components])
+
+    def test_sparse_fields_select_only_their_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url('components'), {'fields': 'serial_number,category_name'})
+        self.assertEqual(response.json()['results'][0], {'serial_number': 'S-0', 'category_name': 'Sensors'})
+        page_query = [q['sql'] for q in queries if 'FROM "inventory_component"' in q['sql']][-1]
+        self.assertIn('JOIN "inventory_category"', page_query)
+        self.assertNotIn('"description"', page_query)
+        self.assertNotIn(b': ', response.content)
+
+    def test_bad_parameters_are_rejected(self):
+        self.assertEqual(self.client.get(self.url('components'), {'fields': 'name,secret'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url('components'), {'limit': '0'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url('components'), {'cursor': 'junk'}).status_code, 400)
+        for values in ([{"a": 1}], ["abc"], [None], [10 ** 30]):
+            with self.subTest(values=values):
+                response = self.client.get(self.url('components'), {'cursor': encode_cursor(values)})
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url('widgets')).status_code, 404)
+        self.assertEqual(self.client.get(reverse('api_detail', args=['components', 0])).status_code, 404)
+
+    def test_catalogue_etag_skips_the_query_until_the_catalogue_changes(self):
+        first = self.client.get(self.url('components'))
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(self.url('components'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertFalse([q for q in queries if 'FROM "inventory_component"' in q['sql']])
+
+        catalogue_cache.bump()
+        self.assertEqual(self.client.get(self.url('components'), HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_transactions_and_sales_are_staff_only_and_hashed(self):
+        Transaction.objects.create(component=self.components[1], borrower=self.person)
+        Sale.objects.create(component=self.components[2], buyer=None, total_price=12)
+        loans = self.client.get(self.url('transactions'))
+        self.assertEqual(loans.json()['results'][0]['borrower_name'], 'Asha')
+        self.assertEqual(self.client.get(self.url('transactions'), HTTP_IF_NONE_MATCH=loans['ETag']).status_code, 304)
+        sale = self.client.get(self.url('sales')).json()['results'][0]
+        self.assertEqual((sale['buyer_name'], sale['total_price']), (None, '12.00'))
+        detail = self.client.get(reverse('api_detail', args=['components', self.components[3].pk]), {'fields': 'quantity'})
+        self.assertEqual(detail.json(), {'quantity': 3})
+
+        self.client.login(username='member', password='password')
+        self.assertEqual(self.client.get(self.url('sales')).status_code, 403)
+        self.assertEqual(self.client.get(self.url('categories')).json()['results'], [{'id': self.category.pk, 'name': 'Sensors', 'description': ''}])
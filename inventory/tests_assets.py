@@ -0,0 +1,123 @@
+import re
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import assets
+
+STATIC_TAG = re.compile(r"{% static '([^']+)' %}")
+
+FONTAWESOME_CSS = (
+    '/*!\n * Font Awesome Free 6.4.0\n */'
+    '.fa{font-family:var(--fa-style-family,"Font Awesome 6 Free")}'
+    '.fa-spin{animation-name:fa-spin}'
+    '@keyframes fa-spin{0%{transform:rotate(0deg)}to{transform:rotate(1turn)}}'
+    '.fa-check::before{content:"\\f00c"}'
+    '.fa-edit::before,.fa-pen-to-square::before{content:"\\f044"}'
+    '.fa-rocket::before{content:"\\f135"}'
+    '@font-face{font-family:"Font Awesome 6 Brands";font-display:block;'
+    'src:url(../webfonts/fa-brands-400.woff2) format("woff2"),url(../webfonts/fa-brands-400.ttf) format("truetype")}'
+    '@font-face{font-family:"Font Awesome 6 Free";font-weight:900;'
+    'src:url(../webfonts/fa-solid-900.woff2) format("woff2"),url(../webfonts/fa-solid-900.ttf) format("truetype")}'
+    '\n/*# sourceMappingURL=all.min.css.map */'
+)
+
+
+class FontAwesomeSubsetTests(SimpleTestCase):
+    def test_keeps_only_used_icons(self):
+        css, codepoints = assets.subset_fontawesome(FONTAWESOME_CSS, {'check', 'edit', 'spin'})
+        self.assertIn('.fa-check::before{content:"\\f00c"}', css)
+        self.assertIn('.fa-edit::before{content:"\\f044"}', css)
+        self.assertNotIn('pen-to-square', css)
+        self.assertNotIn('rocket', css)
+        # Framework rules and animations are not icons and always stay.
+        self.assertIn('.fa-spin{', css)
+        self.assertIn('@keyframes fa-spin{0%{transform:rotate(0deg)}to{transform:rotate(1turn)}}', css)
+        self.assertEqual(codepoints, {0xf00c, 0xf044})
+
+    def test_font_faces_point_at_vendored_woff2_only(self):
+        css, _ = assets.subset_fontawesome(FONTAWESOME_CSS, set())
+        self.assertIn('src:url(../webfonts/fa-solid-900.woff2) format("woff2")}', css)
+        self.assertNotIn('.ttf', css)
+        self.assertNotIn('fa-brands-400', css)
+        self.assertNotIn('sourceMappingURL', css)
+
+    def test_templates_icons_are_found(self):
+        icons = assets.used_icons()
+        self.assertTrue({'boxes', 'barcode', 'check-circle', 'spinner'} <= icons)
+
+    # The fetched "fonts" are placeholders, so leave them untouched whether or not fontTools is installed.
+    @mock.patch.object(assets, 'font_subset', None)
+    def test_vendor_writes_every_file(self):
+        def fetch(url):
+            if url == assets.FONTAWESOME_CSS_URL:
+                return FONTAWESOME_CSS.encode()
+            if url.endswith('.css'):
+                return b'body{}\n/*# sourceMappingURL=bootstrap.min.css.map */'
+            return b'data'
+
+        with tempfile.TemporaryDirectory() as tmp:
+            written = assets.vendor(Path(tmp), fetch=fetch, icons={'check'})
+            self.assertEqual(set(written), {*assets.DOWNLOADS, assets.FONTAWESOME_SUBSET, assets.INTER_CSS,
+                                            'fontawesome/webfonts/fa-solid-900.woff2'})
+            self.assertEqual((Path(tmp) / 'bootstrap/bootstrap.min.css').read_text(), 'body{}\n')
+            self.assertIn('.fa-check::before', (Path(tmp) / assets.FONTAWESOME_SUBSET).read_text())
+            inter = (Path(tmp) / assets.INTER_CSS).read_text()
+            for name in assets.DOWNLOADS:
+                if name.startswith('inter/'):
+                    self.assertIn(f"url({name.removeprefix('inter/')})", inter)
+
+
+class SelfHostedAssetTests(TestCase):
+    def setUp(self):
+        # The anonymous dashboard is the cached public catalogue page.
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_pages_load_nothing_from_other_origins(self):
+        content = self.client.get(reverse('dashboard')).content.decode()
+        for origin in ('cdn.jsdelivr.net', 'cdnjs.cloudflare.com', 'fonts.googleapis.com'):
+            self.assertNotIn(origin, content)
+        self.assertIn('inventory/vendor/bootstrap/bootstrap.min.css', content)
+        self.assertIn('inventory/vendor/inter/inter-latin-400-normal.woff2', content)
+        self.assertIn('inventory/css/public_inventory.css', content)
+        self.assertNotIn('<style>', content)
+
+    def test_vendored_files_are_committed(self):
+        expected = [*assets.DOWNLOADS, assets.INTER_CSS, assets.FONTAWESOME_SUBSET,
+                    *(f'fontawesome/webfonts/{name}' for name in assets.FONTAWESOME_FONTS)]
+        for name in expected:
+            self.assertTrue((assets.VENDOR_DIR / name).is_file(), name)
+        subset = (assets.VENDOR_DIR / assets.FONTAWESOME_SUBSET).read_text()
+        self.assertIn('.fa-users:before', subset)
+
+
+class ManifestStorageTests(TestCase):
+    """collectstatic and page rendering as deployed, with DEBUG off."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_collectstatic_and_every_static_reference(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root,
+            STORAGES={**settings.STORAGES,
+                      'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'}},
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            referenced = set()
+            for path in (assets.APP_DIR / 'templates').rglob('*.html'):
+                referenced.update(STATIC_TAG.findall(path.read_text(encoding='utf-8')))
+            self.assertIn('inventory/images/logo.svg', referenced)
+            for name in referenced:
+                staticfiles_storage.url(name)
+            for name in ('dashboard', 'login'):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
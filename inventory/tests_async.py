@@ -0,0 +1,60 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.test import TestCase
+from django.urls import reverse
+
+from . import metrics, stats, views
+from .models import Beneficiary, Category, Component, Sale, Transaction
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        category = Category.objects.create(name="Sensors")
+        self.component = Component.objects.create(serial_number="SN-1", name="Sonar", category=category, quantity=2)
+        self.person = Beneficiary.objects.create(name="Asha Nair", category="Student", student_id="S100", phone_number="1")
+        Transaction.objects.create(component=self.component, borrower=self.person, authorized_by=self.user)
+        Sale.objects.create(component=self.component, buyer=self.person, authorized_by=self.user, total_price=40)
+        stats.rebuild()
+
+    def test_read_views_are_native_coroutines(self):
+        for view in (views.dashboard, views.component_detail, views.get_beneficiary_data, views.component_list,
+                     views.sale_list, views.low_stock_list, views.low_stock_feed, views.beneficiary_list):
+            self.assertTrue(iscoroutinefunction(view), view)
+
+    def test_middleware_chain_stays_async(self):
+        handler = ASGIHandler()
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+
+    async def test_views_render_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        for url, text in [
+            (reverse('dashboard'), 'Sonar'),
+            (reverse('component_detail', args=[self.component.pk]), 'Asha Nair'),
+            (reverse('component_list'), 'Sonar'),
+            (reverse('sale_list'), 'Asha Nair'),
+            (reverse('low_stock_list'), 'Sonar'),
+            (reverse('beneficiary_list'), 'Asha Nair'),
+        ]:
+            response = await self.async_client.get(url)
+            self.assertContains(response, text)
+        data = (await self.async_client.get(reverse('get_beneficiary_data', args=['s100']))).json()
+        self.assertEqual(data['name'], 'Asha Nair')
+        self.assertEqual((await self.async_client.get(reverse('low_stock_feed'))).json()['count'], 1)
+
+        # Queries made by the async ORM are still counted per view.
+        cumulative, count, total = metrics.QUERY_COUNT.samples({'view': 'component_detail', 'method': 'GET'})
+        self.assertEqual(count, 1)
+        self.assertGreaterEqual(total, 2)
+
+    async def test_anonymous_dashboard_is_the_cached_catalogue(self):
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual((await self.async_client.get(reverse('sale_list'))).status_code, 302)
@@ -0,0 +1,70 @@
+import datetime
+import io
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from . import benchmark
+from .models import Beneficiary, Component, Sale, Transaction
+
+
+class BenchmarkTests(TestCase):
+    counts = {'components': 30, 'beneficiaries': 10, 'transactions': 40, 'sales': 20}
+
+    def setUp(self):
+        User.objects.create_superuser(username='admin', password='password', email='admin@example.com')
+
+    def test_seed_is_deterministic(self):
+        benchmark.seed(**self.counts, seed=7)
+        first = list(Component.objects.order_by('serial_number').values_list('name', 'quantity', 'category__name'))
+        first_sales = list(Sale.objects.order_by('sale_time', 'total_price').values_list('sale_time', 'total_price'))
+        benchmark.reset()
+        self.assertFalse(Component.objects.filter(serial_number__startswith=benchmark.SERIAL_PREFIX).exists())
+        benchmark.seed(**self.counts, seed=7)
+        self.assertEqual(first, list(Component.objects.order_by('serial_number').values_list('name', 'quantity', 'category__name')))
+        self.assertEqual(first_sales, list(Sale.objects.order_by('sale_time', 'total_price').values_list('sale_time', 'total_price')))
+        self.assertEqual(Transaction.objects.count(), 40)
+        self.assertFalse(Transaction.objects.exclude(
+            due_at=F('checkout_time') + datetime.timedelta(days=settings.LOAN_PERIOD_DAYS)).exists())
+        self.assertEqual(Beneficiary.objects.filter(role=benchmark.BENEFICIARY_ROLE).count(), 10)
+
+    def test_reseeding_requires_reset(self):
+        call_command('seed_benchmark_data', stdout=io.StringIO(), **self.counts)
+        with self.assertRaisesMessage(CommandError, '--reset'):
+            call_command('seed_benchmark_data', stdout=io.StringIO(), **self.counts)
+        call_command('seed_benchmark_data', stdout=io.StringIO(), reset=True, **self.counts)
+        self.assertEqual(Component.objects.filter(serial_number__startswith=benchmark.SERIAL_PREFIX).count(), 30)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 0.5), 50)
+        self.assertEqual(benchmark.percentile(values, 0.95), 95)
+        self.assertEqual(benchmark.percentile([3], 0.95), 3)
+
+    def test_bench_reports_every_view_without_writing(self):
+        call_command('seed_benchmark_data', stdout=io.StringIO(), **self.counts)
+        loans = Transaction.objects.count()
+        out = io.StringIO()
+        call_command('bench', iterations=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['views']), {
+            'dashboard', 'component_detail', 'component_list', 'component_list_search', 'sale_list', 'beneficiary_detail',
+            'checkout_component', 'checkout_component_post', 'get_beneficiary_data',
+        })
+        for name, result in report['views'].items():
+            self.assertTrue(set(result['status']) <= {200, 302}, (name, result))
+            self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+        self.assertEqual(report['views']['checkout_component_post']['status'], [302])
+        self.assertEqual(Transaction.objects.count(), loans)
+
+        out = io.StringIO()
+        call_command('bench', iterations=1, warmup=0, asgi=True, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['handler'], 'asgi')
+        self.assertEqual(report['views']['dashboard']['status'], [200])
+        self.assertEqual(report['views']['checkout_component_post']['status'], [302])
+        self.assertEqual(Transaction.objects.count(), loans)
@@ -0,0 +1,99 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import panels, stats, stock
+from .models import Beneficiary, Category, Component, DashboardStats, Sale
+from .templatetags.cards import card_key
+
+
+class ComponentCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.category = Category.objects.create(name="Sensors")
+        self.component = Component.objects.create(serial_number="SN-1", name="Sonar", category=self.category, quantity=9)
+
+    def test_cards_are_cached_per_component_version(self):
+        self.client.get(reverse('component_list'))
+        self.assertIsNotNone(cache.get(card_key(self.component, 'catalogue', show_restock=True)))
+
+        stock.apply_movement(self.component, -4, 'CHECKOUT')
+        self.component.refresh_from_db()
+        response = self.client.get(reverse('component_list'))
+        self.assertContains(response, 'Qty: 5')
+
+    def test_category_rename_reaches_the_card(self):
+        self.client.get(reverse('component_list'))
+        self.category.name = "Rangefinders"
+        self.category.save()
+        self.assertContains(self.client.get(reverse('component_list')), 'Rangefinders')
+
+    def test_restock_button_is_cached_separately_for_staff(self):
+        self.assertContains(self.client.get(reverse('component_list')), 'Quick Restock')
+        User.objects.create_user(username='viewer', password='password')
+        self.client.login(username='viewer', password='password')
+        self.assertNotContains(self.client.get(reverse('component_list')), 'Quick Restock')
+
+    def test_public_low_stock_badge_follows_reorder_level(self):
+        self.client.logout()
+        Component.objects.create(serial_number="SN-2", name="Relay", category=self.category, quantity=8, reorder_level=10)
+        Component.objects.create(serial_number="SN-3", name="Motor", category=self.category, quantity=3, reorder_level=1)
+        content = self.client.get(reverse('component_cards')).content.decode()
+        self.assertEqual(content.count('qty--low'), 1)
+        self.assertEqual(content.count('qty--ok'), 2)
+
+    def test_public_cards_come_from_the_cache(self):
+        self.client.logout()
+        self.client.get(reverse('component_cards'))
+        self.assertIsNotNone(cache.get(card_key(self.component, 'public')))
+
+
+class DashboardPanelCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        category = Category.objects.create(name="Kits")
+        self.kit = Component.objects.create(serial_number="KIT-1", name="Rover Kit", category=category,
+                                            component_type='KIT', quantity=1)
+        self.buyer = Beneficiary.objects.create(name="Asha Nair", phone_number="1")
+        stats.rebuild()
+
+    def get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        return response, len(queries)
+
+    def test_unchanged_panels_cost_no_queries(self):
+        first, cold = self.get()
+        self.assertContains(first, 'Rover Kit')
+        _, warm = self.get()
+        self.assertEqual(cold - warm, len(panels.PANELS))
+
+    def test_sale_and_payment_refresh_the_sales_panel(self):
+        self.get()
+        sale = Sale.objects.create(component=self.kit, buyer=self.buyer, authorized_by=self.user, total_price=25)
+        stats.record_sale(sale, old_quantity=1)
+        response, _ = self.get()
+        self.assertContains(response, 'sale-unpaid')
+
+        self.client.post(reverse('mark_sale_paid', args=[sale.pk]))
+        response, _ = self.get()
+        self.assertContains(response, 'sale-paid')
+        self.assertNotContains(response, 'sale-unpaid')
+
+    def test_stock_movements_refresh_the_stock_panels(self):
+        self.get()
+        before = DashboardStats.objects.get().catalogue_version
+        stock.apply_movement(self.kit, 5, 'RESTOCK')
+        self.assertGreater(DashboardStats.objects.get().catalogue_version, before)
+        response, _ = self.get()
+        self.assertContains(response, '6 available')
+        self.assertNotContains(response, 'low-stock-row')
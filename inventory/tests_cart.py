@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import stats
+from .models import Beneficiary, Category, Component, EmailOutbox, StockMovement, Transaction
+
+
+class CartCheckoutTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.category = Category.objects.create(name="Sensors")
+        self.components = [
+            Component.objects.create(serial_number=f"SN-{i}", name=f"Part {i}", category=self.category, quantity=10)
+            for i in range(8)
+        ]
+        self.student = Beneficiary.objects.create(name="Asha", category="Student", student_id="S100", email="asha@example.com")
+        stats.rebuild()
+
+    def post_cart(self, lines):
+        data = {
+            'borrower_id': 'S100',
+            'lines-TOTAL_FORMS': len(lines),
+            'lines-INITIAL_FORMS': 0,
+        }
+        for i, (serial, quantity) in enumerate(lines):
+            data[f'lines-{i}-serial_number'] = serial
+            data[f'lines-{i}-quantity'] = quantity
+        return self.client.post(reverse('cart_checkout'), data)
+
+    def test_cart_checks_out_every_line(self):
+        response = self.post_cart([("SN-0", 2), ("SN-1", 1), ("SN-0", 3)])
+        self.assertRedirects(response, reverse('beneficiary_detail', args=[self.student.pk]))
+        quantities = dict(Component.objects.values_list('serial_number', 'quantity'))
+        self.assertEqual((quantities["SN-0"], quantities["SN-1"]), (5, 9))
+        self.assertEqual(Transaction.objects.filter(borrower=self.student).count(), 2)
+        self.assertEqual(StockMovement.objects.count(), 2)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_short_line_rejects_whole_cart(self):
+        response = self.post_cart([("SN-0", 2), ("SN-1", 11)])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "only 10 items available")
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(Component.objects.get(serial_number="SN-0").quantity, 10)
+
+    def test_query_count_independent_of_line_count(self):
+        with CaptureQueriesContext(connection) as two:
+            self.post_cart([("SN-0", 1), ("SN-1", 1)])
+        with CaptureQueriesContext(connection) as eight:
+            self.post_cart([(f"SN-{i}", 1) for i in range(8)])
+        self.assertEqual(len(two), len(eight))
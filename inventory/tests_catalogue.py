@@ -0,0 +1,169 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import parse_http_date
+
+from . import catalogue_cache, stats, views
+from .models import Category, Component
+from .pagination import encode_cursor, keyset_paginate
+
+
+class CataloguePaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.category = Category.objects.create(name="Sensors")
+        stats.rebuild()
+
+    def make_components(self, count, start=0):
+        Component.objects.bulk_create([
+            Component(serial_number=f"SN-{i:05d}", name=f"Part {i % 7}", category=self.category, quantity=i)
+            for i in range(start, start + count)
+        ])
+        # bulk_create sends no post_save signals.
+        catalogue_cache.bump()
+
+    def test_keyset_walks_every_row_once(self):
+        self.make_components(25)
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_paginate(Component.objects.all(), ('name', 'id'), cursor, page_size=4)
+            seen.extend(c.pk for c in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = list(Component.objects.order_by('name', 'id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_public_catalogue_query_count_is_flat(self):
+        self.make_components(5)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('dashboard'))
+        self.make_components(views.CATALOGUE_PAGE_SIZE * 2, start=5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.context['components']), views.CATALOGUE_PAGE_SIZE)
+        self.assertContains(response, 'data-next-page')
+
+    def test_cards_fragment_returns_next_page(self):
+        self.make_components(views.CATALOGUE_PAGE_SIZE + 3)
+        self.client.login(username='staff', password='password')
+        first = self.client.get(reverse('component_list'))
+        response = self.client.get(reverse('component_cards') + '?' + first.context['next_query'])
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'inventory/partials/component_cards.html')
+        self.assertTemplateNotUsed(response, 'inventory/base.html')
+        self.assertEqual(len(response.context['components']), 3)
+        self.assertFalse(response.context['next_query'])
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        self.make_components(3)
+        response = self.client.get(reverse('component_cards') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['components']), 3)
+
+    def test_cursor_values_of_the_wrong_type_fall_back_to_first_page(self):
+        self.make_components(3)
+        bad = [["x", "abc"], ["x", None], ["x", [1]], ["x", 10 ** 30], [{"a": 1}, 1]]
+        for values in bad:
+            cursor = encode_cursor(values)
+            for url, params in [(reverse('dashboard'), {}), (reverse('component_cards'), {}),
+                                (reverse('dashboard'), {'q': 'Part'})]:
+                with self.subTest(values=values, url=url, params=params):
+                    response = self.client.get(url, {**params, 'cursor': cursor})
+                    self.assertEqual(response.status_code, 200)
+        self.client.login(username='staff', password='password')
+        for values in bad:
+            with self.subTest(values=values):
+                response = self.client.get(reverse('component_list'), {'cursor': encode_cursor(values)})
+                self.assertEqual(len(response.context['components']), 3)
+
+    def test_search_matches_category_and_serial(self):
+        self.make_components(3)
+        other = Category.objects.create(name="Motors")
+        Component.objects.create(serial_number="MTR-77", name="Servo", category=other, box_number="B7")
+        self.assertEqual(list(Component.objects.search('motors').values_list('name', flat=True)), ['Servo'])
+        self.assertEqual(Component.objects.search('mtr-7').count(), 1)
+        self.assertEqual(Component.objects.search('sn-0').count(), 3)
+
+
+class PublicCatalogueCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.category = Category.objects.create(name="Sensors")
+        self.component = Component.objects.create(serial_number="SN-1", name="Sonar", category=self.category, quantity=4)
+
+    def test_repeat_visits_are_served_from_cache(self):
+        first = self.client.get(reverse('dashboard'))
+        self.assertContains(first, 'Sonar')
+        with CaptureQueriesContext(connection) as queries:
+            again = self.client.get(reverse('dashboard'))
+        # Just the catalogue version.
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(again.content, first.content)
+        searched = self.client.get(reverse('dashboard'), {'q': 'nothing-matches'})
+        self.assertNotContains(searched, 'Sonar')
+
+    def test_query_values_cannot_forge_other_parameters(self):
+        Component.objects.create(serial_number="SN-2", name="Servo", category=self.category, quantity=4)
+        # Joined without encoding, both of these read "q=Servo&cursor=&cursor=&...".
+        forged = self.client.get(reverse('dashboard'), {'q': 'Servo&cursor='})
+        self.assertContains(forged, 'No components match')
+        genuine = self.client.get(reverse('dashboard'), {'q': 'Servo', 'cursor': '&cursor='})
+        self.assertNotEqual(forged['ETag'], genuine['ETag'])
+        self.assertNotContains(genuine, 'No components match')
+
+    def test_changes_invalidate_the_page(self):
+        self.client.get(reverse('dashboard'))
+        self.component.name = "Lidar"
+        self.component.save()
+        self.assertContains(self.client.get(reverse('dashboard')), 'Lidar')
+        self.category.name = "Optics"
+        self.category.save()
+        self.assertContains(self.client.get(reverse('dashboard')), 'Optics')
+
+    def test_conditional_get(self):
+        first = self.client.get(reverse('dashboard'))
+        self.assertTrue(first.has_header('ETag'))
+        self.assertTrue(first.has_header('Last-Modified'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+        response = self.client.get(reverse('dashboard'), HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        self.component.quantity = 9
+        self.component.save()
+        response = self.client.get(reverse('dashboard'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_category_changes_move_last_modified(self):
+        first = self.client.get(reverse('dashboard'))
+        # Within the same second as the first response, and no component's last_updated moves.
+        self.category.name = "Rangefinders"
+        self.category.save()
+        response = self.client.get(reverse('dashboard'), HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Rangefinders')
+        self.assertGreater(parse_http_date(response['Last-Modified']), parse_http_date(first['Last-Modified']))
+
+        self.category.delete()
+        again = self.client.get(reverse('dashboard'), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, 200)
+        self.assertNotContains(again, 'Sonar')
+
+    def test_logged_in_dashboard_is_not_cached(self):
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.get(reverse('dashboard'))
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('dashboard'))
+        self.assertTemplateUsed(response, 'inventory/dashboard.html')
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,94 @@
+import csv
+import datetime
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import views
+from .models import Beneficiary, Category, Component, Sale, Transaction
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        category = Category.objects.create(name="Sensors")
+        self.component = Component.objects.create(serial_number="SN-1", name="Sonar", category=category, quantity=10)
+        self.buyer = Beneficiary.objects.create(name="Asha", student_id="S1")
+
+    def make_sale(self, is_paid=False, days_ago=0):
+        sale = Sale.objects.create(component=self.component, buyer=self.buyer, authorized_by=self.user,
+                                   total_price=5, is_paid=is_paid)
+        if days_ago:
+            Sale.objects.filter(pk=sale.pk).update(sale_time=timezone.now() - datetime.timedelta(days=days_ago))
+        return sale
+
+    def read(self, response):
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_sales_export_filters_by_payment_and_date(self):
+        paid = self.make_sale(is_paid=True)
+        self.make_sale(is_paid=False)
+        self.make_sale(is_paid=True, days_ago=10)
+        today = timezone.localdate().isoformat()
+        response = self.client.get(reverse('export_data', args=['sales']), {'paid': 'paid', 'start': today, 'end': today})
+        rows = self.read(response)
+        self.assertEqual(rows[0][0], 'Sale ID')
+        self.assertEqual([row[0] for row in rows[1:]], [str(paid.pk)])
+        self.assertIn('attachment', response['Content-Disposition'])
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        paid = await Sale.objects.acreate(component=self.component, buyer=self.buyer, authorized_by=self.user,
+                                          total_price=5, is_paid=True)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('export_data', args=['sales']))
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual([row[0] for row in rows], ['Sale ID', str(paid.pk)])
+
+    def test_transactions_and_stock_exports(self):
+        Transaction.objects.create(component=self.component, borrower=self.buyer, authorized_by=self.user)
+        transactions = self.read(self.client.get(reverse('export_data', args=['transactions'])))
+        self.assertEqual(transactions[1][3:6], ['SN-1', 'Sonar', 'Asha'])
+        stock = self.read(self.client.get(reverse('export_data', args=['stock'])))
+        self.assertEqual(stock[1][:3], ['SN-1', 'Sonar', 'Sensors'])
+
+    def test_unknown_export_and_bad_filters(self):
+        self.assertEqual(self.client.get(reverse('export_data', args=['users'])).status_code, 404)
+        response = self.client.get(reverse('export_data', args=['sales']), {'start': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_requires_staff(self):
+        User.objects.create_user(username='member', password='password')
+        self.client.login(username='member', password='password')
+        self.assertEqual(self.client.get(reverse('export_data', args=['sales'])).status_code, 302)
+
+    def test_management_command_writes_csv(self):
+        self.make_sale(is_paid=False)
+        self.make_sale(is_paid=True)
+        out = io.StringIO()
+        call_command('export_data', 'sales', '--unpaid', stdout=out)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][9], 'No')
+
+    def test_sale_list_is_paginated_with_flat_query_count(self):
+        self.make_sale()
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('sale_list'))
+        for _ in range(views.SALE_PAGE_SIZE + 5):
+            self.make_sale()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('sale_list'))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.context['sales']), views.SALE_PAGE_SIZE)
+        older = self.client.get(reverse('sale_list') + '?' + response.context['next_query'])
+        self.assertEqual(len(older.context['sales']), 6)
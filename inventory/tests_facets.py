@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Category, Component
+from .search import refresh_search_vectors
+
+
+class FacetedCatalogueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_superuser(username='admin', password='password')
+        self.client.login(username='admin', password='password')
+        self.sensors = Category.objects.create(name="Sensors")
+        self.motors = Category.objects.create(name="Motors")
+
+    def add_parts(self, count, start=0):
+        Component.objects.bulk_create([
+            Component(serial_number=f"SN-{start + i}", name=f"Part {start + i}",
+                      category=self.sensors if i % 2 else self.motors,
+                      component_type='KIT' if i % 5 == 0 else 'GENERAL',
+                      box_number=f"B{i % 3}", quantity=i % 4, reorder_level=1, location="Lab")
+            for i in range(count)
+        ])
+
+    def get(self, url_name='component_list', **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name), params)
+        return response, len(queries)
+
+    def options(self, response, name):
+        group = next(group for group in response.context['facet_groups'] if group['name'] == name)
+        return {option['value']: option['count'] for option in group['options']}
+
+    def test_filters_combine(self):
+        self.add_parts(20)
+        response, _ = self.get(category=self.sensors.pk, stock='low')
+        names = {c.name for c in response.context['components']}
+        expected = set(Component.objects.filter(category=self.sensors, quantity__lte=1).values_list('name', flat=True))
+        self.assertEqual(names, expected)
+
+        response, _ = self.get(type='KIT', box='B0')
+        self.assertEqual({c.name for c in response.context['components']}, {'Part 0', 'Part 15'})
+
+    def test_counts_ignore_their_own_facet(self):
+        self.add_parts(20)
+        response, _ = self.get(category=self.sensors.pk)
+        # Picking a category narrows the other facets but not the category list itself.
+        self.assertEqual(self.options(response, 'category'), {self.sensors.pk: 10, self.motors.pk: 10})
+        self.assertEqual(self.options(response, 'type'), {'GENERAL': 8, 'KIT': 2})
+        self.assertEqual(self.options(response, 'stock'), {'in': 10, 'low': 5, 'out': 0})
+        self.assertEqual(sum(self.options(response, 'box').values()), 10)
+
+    def test_invalid_facets_are_ignored(self):
+        self.add_parts(4)
+        response, _ = self.get(category='abc', stock='plenty', type='NOPE')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['components']), 4)
+
+    def test_filter_cost_is_flat(self):
+        self.add_parts(6)
+        _, small = self.get(category=self.sensors.pk, stock='in')
+        self.add_parts(300, start=6)
+        Category.objects.bulk_create([Category(name=f"Extra {i}") for i in range(20)])
+        response, large = self.get(category=self.sensors.pk, stock='in')
+        self.assertEqual(small, large)
+        self.assertTrue(response.context['next_query'])
+
+    def test_next_page_keeps_the_filters(self):
+        self.add_parts(120)
+        refresh_search_vectors(Component.objects.all())
+        response, _ = self.get(category=self.sensors.pk, q='Part')
+        self.assertIn(f'category={self.sensors.pk}', response.context['next_query'])
+        page = self.client.get(f"{reverse('component_cards')}?{response.context['next_query']}")
+        self.assertTrue(all(c.category_id == self.sensors.pk for c in page.context['components']))
+
+    def test_anonymous_cache_keys_on_the_facets(self):
+        self.client.logout()
+        self.add_parts(4)
+        motors = self.client.get(reverse('component_cards'), {'category': self.motors.pk})
+        sensors = self.client.get(reverse('component_cards'), {'category': self.sensors.pk})
+        self.assertNotEqual(motors['ETag'], sensors['ETag'])
+        self.assertContains(sensors, 'Part 1')
+        self.assertNotContains(sensors, 'Part 0')
+
+    def test_category_list_counts_in_one_query(self):
+        self.add_parts(10)
+        _, few = self.get('category_list')
+        Category.objects.bulk_create([Category(name=f"Extra {i}") for i in range(20)])
+        response, many = self.get('category_list')
+        self.assertEqual(few, many)
+        counts = {cat.name: cat.component_count for cat in response.context['categories']}
+        self.assertEqual((counts['Sensors'], counts['Extra 0']), (5, 0))
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import views
+from .models import Beneficiary, Category, Component, Sale, Transaction
+
+
+class BeneficiaryHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        category = Category.objects.create(name="Sensors")
+        self.parts = [Component.objects.create(serial_number=f"SN-{i}", name=f"Part {i}", category=category, quantity=99)
+                      for i in range(5)]
+        self.person = Beneficiary.objects.create(name="Asha", phone_number="1", added_by=self.user)
+
+    def add_history(self, loans, sales):
+        Transaction.objects.bulk_create([
+            Transaction(component=self.parts[i % 5], borrower=self.person, authorized_by=self.user, quantity_taken=2,
+                        return_time=timezone.now() if i % 2 else None)
+            for i in range(loans)
+        ])
+        Sale.objects.bulk_create([
+            Sale(component=self.parts[i % 5], buyer=self.person, authorized_by=self.user, total_price=10, is_paid=bool(i % 2))
+            for i in range(sales)
+        ])
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('beneficiary_detail', args=[self.person.pk]), params)
+        return response, len(queries)
+
+    def test_summary_comes_from_one_query(self):
+        self.add_history(loans=5, sales=4)
+        Sale.objects.create(component=self.parts[0], buyer=None, total_price=99)
+        person = Beneficiary.objects.with_history_summary().get(pk=self.person.pk)
+        self.assertEqual((person.items_out, person.items_borrowed), (6, 10))
+        self.assertEqual((person.total_spent, person.unpaid_total), (Decimal('40'), Decimal('20')))
+
+        empty = Beneficiary.objects.create(name="New", phone_number="2")
+        empty = Beneficiary.objects.with_history_summary().get(pk=empty.pk)
+        self.assertEqual((empty.items_out, empty.total_spent), (0, 0))
+
+    def test_page_cost_is_flat(self):
+        self.add_history(loans=3, sales=3)
+        _, small = self.get()
+        self.add_history(loans=200, sales=120)
+        response, large = self.get()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.context['transactions']), views.HISTORY_PAGE_SIZE)
+        self.assertContains(response, '₹1230.00')
+
+    def test_each_table_pages_on_its_own_cursor(self):
+        self.add_history(loans=30, sales=30)
+        first = self.get()[0].context
+        seen = [t.pk for t in first['transactions']]
+        params = dict(p.split('=') for p in first['next_loans_query'].split('&'))
+        second = self.get(**params)[0].context
+        seen += [t.pk for t in second['transactions']]
+        self.assertEqual(sorted(seen, reverse=True), list(Transaction.objects.order_by('-pk').values_list('pk', flat=True)))
+        self.assertEqual([s.pk for s in second['sales']], [s.pk for s in first['sales']])
+        self.assertFalse(second['is_first_page'])
+        self.assertEqual(self.get(loans='garbage')[0].status_code, 200)
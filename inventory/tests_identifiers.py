@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import identifiers
+from .forms import BeneficiaryForm
+from .models import Beneficiary, BeneficiaryIdentifier
+
+
+class IdentifierLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.student = Beneficiary.objects.create(name="Asha Rao", category='Student', student_id=" s-101 ", phone_number="1")
+
+    def url(self, identifier):
+        return reverse('get_beneficiary_data', args=[identifier])
+
+    def test_identifiers_are_normalized_and_synced(self):
+        self.assertEqual(identifiers.find('S-101'), self.student)
+        self.assertEqual(identifiers.find('s-101 '), self.student)
+        self.student.student_id = 'S-202'
+        self.student.save()
+        self.assertIsNone(identifiers.find('S-101'))
+        self.assertEqual(list(BeneficiaryIdentifier.objects.values_list('value', flat=True)), ['S-202'])
+
+    def test_form_rejects_duplicate_id(self):
+        form = BeneficiaryForm(data={'category': 'Employee', 'employee_id': 'S-101', 'name': 'Bo', 'phone_number': '2'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('employee_id', form.errors)
+
+    def test_lookup_is_cached_and_invalidated(self):
+        self.assertEqual(self.client.get(self.url('s-101')).json()['first_name'], 'Asha')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url('S-101'))
+        self.assertFalse([q for q in queries if 'inventory_beneficiary' in q['sql']])
+
+        self.student.name = "Asha Menon"
+        self.student.save()
+        self.assertEqual(self.client.get(self.url('S-101')).json()['last_name'], 'Menon')
+
+        self.assertFalse(self.client.get(self.url('E-1')).json()['exists'])
+        Beneficiary.objects.create(name="Ravi", category='Employee', employee_id="e-1", phone_number="3")
+        self.assertTrue(self.client.get(self.url('E-1')).json()['exists'])
+
+        self.student.delete()
+        self.assertFalse(self.client.get(self.url('S-101')).json()['exists'])
+
+    def test_etag_revalidation(self):
+        first = self.client.get(self.url('S-101'))
+        self.assertTrue(first.has_header('ETag'))
+        again = self.client.get(self.url('S-101'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.student.email = 'asha@example.com'
+        self.student.save()
+        changed = self.client.get(self.url('S-101'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
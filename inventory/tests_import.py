@@ -0,0 +1,79 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from . import importer
+from .models import Category, Component, StockMovement
+
+CSV = """serial_number,name,category,quantity,component_type,box_number
+SN-1,Ultrasonic Sensor,Sensors,10,,B1
+SN-2,Servo Motor,Motors,4,general,
+SN-3,Broken Row,Sensors,lots,,
+,No Serial,Sensors,1,,
+SN-4,Starter Kit,Kits,2,KIT,
+"""
+
+
+class ComponentImportTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Sensors")
+        Component.objects.create(serial_number="SN-1", name="Old name", category=self.category, quantity=3)
+
+    def test_csv_upserts_and_reports_bad_rows(self):
+        result = importer.import_components(importer.read_rows(io.StringIO(CSV), 'csv'), chunk_size=2)
+        self.assertEqual((result.created, result.updated), (2, 1))
+        self.assertEqual([line for line, _ in result.errors], [4, 5])
+
+        updated = Component.objects.get(serial_number="SN-1")
+        self.assertEqual((updated.name, updated.quantity, updated.box_number), ("Ultrasonic Sensor", 10, "B1"))
+        self.assertEqual(Component.objects.get(serial_number="SN-4").component_type, 'KIT')
+        self.assertEqual(set(Category.objects.values_list('name', flat=True)), {"Sensors", "Motors", "Kits"})
+        self.assertEqual(
+            sorted(StockMovement.objects.values_list('component__serial_number', 'reason', 'change')),
+            [("SN-1", 'ADJUSTMENT', 7), ("SN-2", 'INITIAL', 4), ("SN-4", 'INITIAL', 2)],
+        )
+
+    def test_blank_quantity_keeps_existing_stock(self):
+        csv_text = "serial_number,name,category,quantity\nSN-1,Renamed,Sensors,\nSN-9,New Part,Sensors,\n"
+        importer.import_components(importer.read_rows(io.StringIO(csv_text), 'csv'))
+        renamed = Component.objects.get(serial_number="SN-1")
+        self.assertEqual((renamed.name, renamed.quantity), ("Renamed", 3))
+        self.assertEqual(Component.objects.get(serial_number="SN-9").quantity, 0)
+        self.assertFalse(StockMovement.objects.exists())
+
+        importer.import_components([(1, {"serial_number": "SN-1", "name": "Renamed", "category": "Sensors", "quantity": 0})])
+        self.assertEqual(Component.objects.get(serial_number="SN-1").quantity, 0)
+
+    def test_values_that_do_not_fit_the_model_are_row_errors(self):
+        rows = [
+            (2, {"serial_number": "SN-5", "name": "Long Box", "category": "Sensors", "box_number": "B" * 51}),
+            (3, {"serial_number": "SN-6", "name": "Bad Link", "category": "Sensors", "datasheet_link": "not a url"}),
+            (4, {"serial_number": "SN-7", "name": "Long Category", "category": "C" * 101}),
+            (5, {"serial_number": "SN-8", "name": "Fine", "category": "Sensors", "datasheet_link": "https://example.com/ds.pdf"}),
+        ]
+        result = importer.import_components(rows)
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [2, 3, 4])
+        self.assertIn("box_number", result.errors[0][1])
+        self.assertIn("datasheet_link", result.errors[1][1])
+        self.assertIn("category", result.errors[2][1])
+        self.assertFalse(Component.objects.filter(serial_number__in=["SN-5", "SN-6", "SN-7"]).exists())
+        self.assertFalse(Category.objects.filter(name="C" * 101).exists())
+
+    def test_json_array_is_streamed(self):
+        stream = io.StringIO('[{"serial_number": "J-1", "name": "A", "category": "Sensors", "quantity": 1},\n'
+                             ' {"serial_number": "J-2", "name": "B", "category": "Sensors"}]')
+        rows = list(importer._iter_json_array(stream, chunk_size=7))
+        self.assertEqual([row['serial_number'] for row in rows], ["J-1", "J-2"])
+
+    def test_upload_view(self):
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        upload = SimpleUploadedFile('vendor.csv', CSV.encode('utf-8-sig'), content_type='text/csv')
+        response = self.client.post(reverse('import_components'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 2)
+        self.assertContains(response, "is not a whole number")
@@ -0,0 +1,67 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import stats, views
+from .models import Category, Component
+
+
+class LowStockTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.category = Category.objects.create(name="Boards")
+
+    def make(self, serial, quantity, component_type='GENERAL', reorder_level=None):
+        return Component.objects.create(serial_number=serial, name=serial, category=self.category,
+                                        quantity=quantity, component_type=component_type, reorder_level=reorder_level)
+
+    def test_reorder_level_defaults_per_type(self):
+        self.assertEqual(self.make('G', 10).reorder_level, 5)
+        self.assertEqual(self.make('K', 10, component_type='KIT').reorder_level, 1)
+        self.assertEqual(self.make('J', 10, reorder_level=20).reorder_level, 20)
+        bulk = Component.objects.bulk_create([Component(serial_number='B', name='B', category=self.category, component_type='KIT')])
+        self.assertEqual(bulk[0].reorder_level, 1)
+
+    def test_low_stock_uses_each_components_level(self):
+        self.make('resistor', 40, reorder_level=50)
+        self.make('jetson', 1, reorder_level=0)
+        self.make('kit', 1, component_type='KIT')
+        self.make('sensor', 6)
+        self.assertEqual(set(Component.objects.low_stock().values_list('serial_number', flat=True)), {'resistor', 'kit'})
+        self.assertEqual(stats.compute()['low_stock_count'], 2)
+
+    def test_editing_reorder_level_updates_counter(self):
+        component = self.make('servo', 8)
+        stats.rebuild()
+        response = self.client.post(reverse('edit_component', args=[component.pk]), {
+            'serial_number': 'servo', 'name': 'Servo', 'category': self.category.pk, 'component_type': 'GENERAL',
+            'quantity': 8, 'reorder_level': 10, 'description': '',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(stats.current().low_stock_count, 1)
+        self.assertEqual(stats.current().low_stock_count, stats.compute()['low_stock_count'])
+
+    def test_feed_pages_most_urgent_first(self):
+        for i in range(views.LOW_STOCK_PAGE_SIZE + 2):
+            self.make(f"P{i:03d}", i % 4)
+        self.make('plenty', 100)
+        stats.rebuild()
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('low_stock_feed')).json()
+        self.assertLessEqual(len(queries), 5)
+        self.assertEqual(data['count'], views.LOW_STOCK_PAGE_SIZE + 2)
+        self.assertEqual(len(data['results']), views.LOW_STOCK_PAGE_SIZE)
+        quantities = [row['quantity'] for row in data['results']]
+        self.assertEqual(quantities, sorted(quantities))
+        rest = self.client.get(data['next']).json()
+        self.assertEqual(len(rest['results']), 2)
+        self.assertIsNone(rest['next'])
+
+    def test_low_stock_page(self):
+        self.make('empty', 0)
+        response = self.client.get(reverse('low_stock_list'))
+        self.assertContains(response, 'empty')
+        self.assertContains(response, 'Out')
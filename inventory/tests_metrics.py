@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import metrics
+from .models import Category, Component
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+        category = Category.objects.create(name="Sensors")
+        Component.objects.create(serial_number="SN-1", name="Sonar", category=category)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('demo', 'Demo.', (1, 5))
+        for value in (0.5, 1, 3, 9):
+            histogram.observe({'view': 'x'}, value)
+        self.assertEqual(histogram.samples({'view': 'x'}), ([2, 3, 4], 4, 13.5))
+        text = histogram.render()
+        self.assertIn('demo_bucket{view="x",le="5"} 3', text)
+        self.assertIn('demo_bucket{view="x",le="+Inf"} 4', text)
+        self.assertIn('demo_count{view="x"} 4', text)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('component_list'))
+        labels = {'view': 'component_list', 'method': 'GET'}
+        _, count, _ = metrics.REQUEST_SECONDS.samples(labels)
+        self.assertEqual(count, 1)
+        _, _, queries = metrics.QUERY_COUNT.samples(labels)
+        self.assertGreater(queries, 0)
+        _, _, size = metrics.RESPONSE_BYTES.samples(labels)
+        self.assertEqual(size, len(response.content))
+
+    def test_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 302)
+        self.client.login(username='staff', password='password')
+        self.client.get(reverse('dashboard'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('robostock_request_db_queries_count{method="GET",view="dashboard"} 1', response.content.decode())
+
+    @override_settings(METRICS_SLOW_REQUEST_QUERIES=1)
+    def test_slow_request_is_logged(self):
+        self.client.login(username='staff', password='password')
+        with self.assertLogs('inventory.metrics', 'WARNING') as logs:
+            self.client.get(reverse('component_list'))
+        self.assertIn('view component_list', logs.output[0])
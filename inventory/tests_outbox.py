@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import outbox
+from .models import Beneficiary, Category, Component, EmailOutbox
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("SMTP unavailable")
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.category = Category.objects.create(name="Sensors")
+        self.component = Component.objects.create(serial_number="SN-1", name="Sensor A", category=self.category, quantity=10)
+        self.beneficiary = Beneficiary.objects.create(name="Jane Roe", category="Other", email="jane@example.com")
+
+    def test_checkout_queues_instead_of_sending(self):
+        self.client.post(reverse('checkout_component', args=[self.component.pk]), {
+            'borrower': self.beneficiary.pk, 'quantity_taken': 1,
+        })
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.recipient, "jane@example.com")
+
+        call_command('deliver_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Sensor A", mail.outbox[0].subject)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'SENT')
+
+    def test_batches_share_one_connection(self):
+        for i in range(5):
+            outbox.enqueue(f"Subject {i}", "Body", "jane@example.com")
+        sent, failed = outbox.deliver_due(batch_size=2)
+        self.assertEqual((sent, failed), (5, 0))
+        self.assertFalse(EmailOutbox.objects.filter(status='PENDING').exists())
+
+    @override_settings(EMAIL_BACKEND='inventory.tests_outbox.FailingBackend')
+    def test_failures_back_off_then_dead_letter(self):
+        item = outbox.enqueue("Subject", "Body", "jane@example.com")
+        outbox.deliver_due(max_attempts=2)
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.attempts), ('PENDING', 1))
+        self.assertGreater(item.next_attempt_at, timezone.now())
+        self.assertIn("SMTP unavailable", item.last_error)
+
+        # Not due yet, so a second run leaves it alone.
+        self.assertEqual(outbox.deliver_due(max_attempts=2), (0, 0))
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        outbox.deliver_due(max_attempts=2)
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.attempts), ('DEAD', 2))
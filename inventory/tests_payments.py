@@ -0,0 +1,155 @@
+import io
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import payments, stats
+from .models import Beneficiary, Category, Component, DashboardStats, Sale
+
+
+class ReconcileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.part = Component.objects.create(serial_number="SN-1", name="Servo",
+                                             category=Category.objects.create(name="Motors"), quantity=50)
+        self.asha = Beneficiary.objects.create(name="Asha", phone_number="1", category='Student', student_id="cs21b001")
+        self.ravi = Beneficiary.objects.create(name="Ravi", phone_number="2", category='Staff', employee_id="E-7")
+
+    def sell(self, buyer, *prices, paid=False):
+        return [Sale.objects.create(component=self.part, buyer=buyer, authorized_by=self.user,
+                                    total_price=price, is_paid=paid) for price in prices]
+
+    def reconcile(self, text, **kwargs):
+        return payments.reconcile(payments.read_payments(io.StringIO('buyer,amount\n' + text)), **kwargs)
+
+    def unpaid(self):
+        return set(Sale.objects.filter(is_paid=False).values_list('total_price', flat=True))
+
+    def test_exact_sale_is_settled_before_older_ones(self):
+        self.sell(self.asha, 10, 25, 40)
+        stats.rebuild()
+        result = self.reconcile('CS21B001,25\n')
+        self.assertEqual((result.payments, result.sales, result.amount), (1, 1, Decimal('25')))
+        self.assertEqual(self.unpaid(), {Decimal('10'), Decimal('40')})
+
+    def test_payment_clears_oldest_sales_that_add_up(self):
+        self.sell(self.asha, 10, 25, 40)
+        self.sell(self.ravi, 5)
+        self.reconcile(' cs21b001 ,"₹35.00"\n#%d,5\n' % self.ravi.pk)
+        self.assertEqual(self.unpaid(), {Decimal('40')})
+
+    def test_unmatched_payments_are_reported_and_settle_nothing(self):
+        self.sell(self.asha, 10, 25)
+        result = self.reconcile('CS21B001,20\nNOBODY,10\nE-7,abc\n,5\n')
+        self.assertEqual(result.payments, 0)
+        self.assertEqual([line for line, _ in result.errors], [4, 5, 2, 3])
+        self.assertIn('₹35', result.errors[2][1])
+        self.assertEqual(Sale.objects.filter(is_paid=False).count(), 2)
+
+    def test_repeated_payments_use_up_the_balance(self):
+        self.sell(self.asha, 10, 10)
+        result = self.reconcile('CS21B001,10\nCS21B001,10\nCS21B001,10\n')
+        self.assertEqual((result.payments, result.error_count), (2, 1))
+        self.assertFalse(Sale.objects.filter(is_paid=False).exists())
+
+    def test_batch_costs_a_constant_number_of_queries(self):
+        def run(count):
+            buyers = [Beneficiary.objects.create(name=f"B{i}", phone_number=str(i), student_id=f"S{count}-{i}")
+                      for i in range(count)]
+            for buyer in buyers:
+                self.sell(buyer, 3, 4)
+            text = ''.join(f'S{count}-{i},7\n' for i in range(count))
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.reconcile(text).sales, 2 * count)
+            return len(queries)
+        stats.rebuild()
+        self.assertEqual(run(2), run(12))
+
+    def test_dashboard_totals_move_in_the_same_transaction(self):
+        self.sell(self.asha, 10, 25)
+        self.sell(self.ravi, 8, paid=True)
+        stats.rebuild()
+        before = DashboardStats.objects.get().sales_version
+        self.reconcile('CS21B001,35\n')
+        snapshot = DashboardStats.objects.get()
+        fresh = stats.compute()
+        self.assertEqual((snapshot.unpaid_sales, snapshot.total_revenue), (fresh['unpaid_sales'], fresh['total_revenue']))
+        self.assertEqual(snapshot.unpaid_sales, Decimal('0'))
+        self.assertGreater(snapshot.sales_version, before)
+
+    def test_dry_run_changes_nothing(self):
+        self.sell(self.asha, 10)
+        stats.rebuild()
+        result = self.reconcile('CS21B001,10\n', dry_run=True)
+        self.assertEqual(result.sales, 1)
+        self.assertTrue(Sale.objects.filter(is_paid=False).exists())
+        self.assertEqual(DashboardStats.objects.get().unpaid_sales, Decimal('10'))
+
+    def test_missing_column_is_rejected(self):
+        with self.assertRaises(ValueError):
+            list(payments.read_payments(io.StringIO('buyer,paid\nE-7,10\n')))
+
+    def test_malformed_csv_is_rejected(self):
+        self.sell(self.asha, 10)
+        oversized = 'CS21B001,' + '1' * 200000 + '\n'
+        with self.assertRaises(ValueError):
+            self.reconcile('CS21B001,10\n' + oversized)
+        self.assertEqual(self.unpaid(), {Decimal('10')})
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as f:
+            f.write('buyer,amount\n' + oversized)
+        with self.assertRaisesMessage(CommandError, 'Could not reconcile'):
+            call_command('reconcile_payments', f.name, stdout=io.StringIO())
+
+        response = self.client.post(reverse('reconcile_payments'), {'lines': oversized})
+        self.assertContains(response, 'Could not read the payments')
+        self.assertEqual(self.unpaid(), {Decimal('10')})
+
+    def test_outstanding_balances_are_one_grouped_query(self):
+        self.sell(self.asha, 10, 25)
+        self.sell(self.ravi, 50)
+        self.sell(self.ravi, 99, paid=True)
+        with CaptureQueriesContext(connection) as queries:
+            balances = list(payments.outstanding_balances())
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([(row['buyer__name'], row['balance'], row['sales']) for row in balances],
+                         [("Ravi", Decimal('50'), 1), ("Asha", Decimal('35'), 2)])
+
+    def test_command(self):
+        self.sell(self.asha, 10)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8-sig', delete=False) as f:
+            f.write('buyer,amount\nCS21B001,10\nE-7,3\n')
+        out, err = io.StringIO(), io.StringIO()
+        call_command('reconcile_payments', f.name, stdout=out, stderr=err)
+        self.assertIn('Marked 1 sale(s) paid', out.getvalue())
+        self.assertIn('Line 3:', err.getvalue())
+        self.assertFalse(Sale.objects.filter(is_paid=False).exists())
+
+    def test_view_lists_balances_and_settles_pasted_payments(self):
+        self.sell(self.asha, 10, 25)
+        stats.rebuild()
+        response = self.client.get(reverse('reconcile_payments'))
+        self.assertContains(response, f'value="#{self.asha.pk},35.00"')
+
+        response = self.client.post(reverse('reconcile_payments'), {'lines': f'#{self.asha.pk},35.00'})
+        self.assertRedirects(response, reverse('reconcile_payments'))
+        self.assertFalse(Sale.objects.filter(is_paid=False).exists())
+        self.assertContains(self.client.get(reverse('reconcile_payments')), 'Every sale has been paid')
+
+    def test_view_shows_unmatched_rows(self):
+        self.sell(self.asha, 10)
+        response = self.client.post(reverse('reconcile_payments'), {'lines': 'CS21B001,11'})
+        self.assertContains(response, 'No unpaid sales')
+        self.assertContains(self.client.post(reverse('reconcile_payments'), {}), 'Upload a CSV')
+
+    def test_view_requires_staff(self):
+        User.objects.create_user(username='viewer', password='password')
+        self.client.login(username='viewer', password='password')
+        self.assertEqual(self.client.get(reverse('reconcile_payments')).status_code, 302)
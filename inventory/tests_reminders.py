@@ -0,0 +1,92 @@
+import datetime
+import io
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import reminders, stats
+from .models import Beneficiary, Category, Component, EmailOutbox, Transaction
+
+
+class OverdueReminderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        category = Category.objects.create(name="Sensors")
+        self.parts = [
+            Component.objects.create(serial_number=f"SN-{i}", name=f"Part {i}", category=category, quantity=10)
+            for i in range(3)
+        ]
+        self.asha = Beneficiary.objects.create(name="Asha", email="asha@example.com", phone_number="1")
+        self.ravi = Beneficiary.objects.create(name="Ravi", email="ravi@example.com", phone_number="2")
+        self.no_email = Beneficiary.objects.create(name="Meera", phone_number="3")
+        stats.rebuild()
+
+    def lend(self, borrower, part, days_overdue, returned=False):
+        return Transaction.objects.create(
+            component=part, borrower=borrower, authorized_by=self.user,
+            due_at=timezone.now() - datetime.timedelta(days=days_overdue),
+            return_time=timezone.now() if returned else None,
+        )
+
+    def test_new_loans_get_a_due_date(self):
+        loan = Transaction.objects.create(component=self.parts[0], borrower=self.asha)
+        self.assertAlmostEqual(loan.due_at - timezone.now(), datetime.timedelta(days=14), delta=datetime.timedelta(minutes=1))
+        bulk = Transaction.objects.bulk_create([Transaction(component=self.parts[1], borrower=self.asha)])
+        self.assertIsNotNone(bulk[0].due_at)
+        self.assertFalse(loan.is_overdue)
+
+    def test_one_reminder_per_borrower(self):
+        self.lend(self.asha, self.parts[0], 3)
+        self.lend(self.asha, self.parts[1], 1)
+        self.lend(self.ravi, self.parts[2], 2)
+        self.lend(self.ravi, self.parts[0], 5, returned=True)
+        self.lend(self.ravi, self.parts[1], -2)
+        self.lend(self.no_email, self.parts[0], 4)
+
+        self.assertEqual(reminders.queue_reminders(), (2, 3))
+        asha = EmailOutbox.objects.get(recipient='asha@example.com')
+        self.assertIn('Part 0 x 1', asha.body)
+        self.assertIn('Part 1 x 1', asha.body)
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+
+        # Reminded loans wait out the interval; a newly overdue loan does not.
+        self.assertEqual(reminders.queue_reminders(), (0, 0))
+        self.lend(self.ravi, self.parts[1], 1)
+        self.assertEqual(reminders.queue_reminders(), (1, 2))
+        self.assertEqual(reminders.queue_reminders(now=timezone.now() + datetime.timedelta(days=3)), (2, 5))
+
+    def test_reminder_run_is_constant_in_queries(self):
+        for i in range(30):
+            person = Beneficiary.objects.create(name=f"P{i}", email=f"p{i}@example.com", phone_number=str(i))
+            self.lend(person, self.parts[i % 3], 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(reminders.queue_reminders(), (30, 30))
+        self.assertLessEqual(len(queries), 5)
+
+    def test_command_sends_over_one_connection(self):
+        self.lend(self.asha, self.parts[0], 3)
+        self.lend(self.ravi, self.parts[1], 3)
+        out = io.StringIO()
+        call_command('send_overdue_reminders', dry_run=True, stdout=out)
+        self.assertIn('Would remind 2 borrower(s)', out.getvalue())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+        call_command('send_overdue_reminders', deliver=True, stdout=out)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['asha@example.com', 'ravi@example.com'])
+        self.assertFalse(Transaction.objects.filter(reminded_at__isnull=True).exists())
+
+    def test_overdue_list_and_dashboard(self):
+        self.lend(self.asha, self.parts[0], 3)
+        self.lend(self.ravi, self.parts[1], -3)
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('overdue_list'))
+        self.assertContains(response, 'Asha')
+        self.assertNotContains(response, 'Ravi')
+        self.assertEqual(response.context['overdue_count'], 1)
+        self.assertContains(self.client.get(reverse('dashboard')), '1 overdue')
@@ -0,0 +1,101 @@
+import datetime
+import io
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import rollups
+from .models import Beneficiary, Category, Component, DailySalesRollup, DailyUsageRollup, RollupWatermark, Sale, Transaction
+
+NOW = datetime.timedelta(0)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.sensors = Category.objects.create(name="Sensors")
+        self.motors = Category.objects.create(name="Motors")
+        self.sonar = Component.objects.create(serial_number="S-1", name="Sonar", category=self.sensors, quantity=50)
+        self.servo = Component.objects.create(serial_number="M-1", name="Servo", category=self.motors, quantity=50)
+        self.buyer = Beneficiary.objects.create(name="Asha", phone_number="1")
+
+    def at(self, model, obj, field, days_ago):
+        model.objects.filter(pk=obj.pk).update(**{field: timezone.now() - datetime.timedelta(days=days_ago)})
+
+    def sell(self, component, total, days_ago=0, quantity=1):
+        sale = Sale.objects.create(component=component, buyer=self.buyer, quantity_sold=quantity, total_price=total)
+        self.at(Sale, sale, 'sale_time', days_ago)
+        return sale
+
+    def lend(self, component, days_ago=0, quantity=1):
+        loan = Transaction.objects.create(component=component, borrower=self.buyer, quantity_taken=quantity)
+        self.at(Transaction, loan, 'checkout_time', days_ago)
+        return loan
+
+    def test_refresh_is_incremental(self):
+        self.sell(self.sonar, 10, days_ago=1)
+        self.sell(self.sonar, 5, days_ago=1, quantity=2)
+        self.lend(self.servo, days_ago=1)
+        self.assertEqual(rollups.refresh(settle_delay=NOW), {'sales': 2, 'usage': 1})
+        row = DailySalesRollup.objects.get()
+        self.assertEqual((row.sales, row.units, row.revenue, row.category), (2, 3, Decimal('15'), self.sensors))
+
+        self.assertEqual(rollups.refresh(settle_delay=NOW), {'sales': 0, 'usage': 0})
+        self.sell(self.sonar, 7, days_ago=1)
+        self.lend(self.servo, days_ago=1, quantity=3)
+        with CaptureQueriesContext(connection) as queries:
+            rollups.refresh(settle_delay=NOW)
+        self.assertFalse([q for q in queries if 'FROM "inventory_sale"' in q['sql'] and '"id" > 0' in q['sql']])
+        self.assertEqual(DailySalesRollup.objects.get().revenue, Decimal('22'))
+        usage = DailyUsageRollup.objects.get()
+        self.assertEqual((usage.checkouts, usage.units), (2, 4))
+        self.assertEqual(RollupWatermark.objects.get(name='sales').last_id, Sale.objects.latest('pk').pk)
+
+    def test_recent_rows_wait_for_the_settle_delay(self):
+        self.sell(self.sonar, 10)
+        self.assertEqual(rollups.refresh()['sales'], 0)
+        self.assertEqual(rollups.refresh(settle_delay=NOW)['sales'], 1)
+
+    def test_small_batches_and_rebuild(self):
+        for days_ago in range(5):
+            self.sell(self.servo, 2, days_ago=days_ago + 1)
+        self.assertEqual(rollups.refresh(batch_size=2, settle_delay=NOW)['sales'], 5)
+        self.assertEqual(DailySalesRollup.objects.count(), 5)
+        Sale.objects.filter(pk=Sale.objects.earliest('pk').pk).delete()
+        rollups.rebuild(settle_delay=NOW)
+        self.assertEqual(DailySalesRollup.objects.count(), 4)
+
+    def test_series_buckets_and_fills_gaps(self):
+        today = timezone.localdate()
+        self.sell(self.sonar, 10, days_ago=1)
+        self.sell(self.servo, 20, days_ago=3)
+        self.lend(self.servo, days_ago=3)
+        rollups.refresh(settle_delay=NOW)
+
+        daily = rollups.series('day', today - datetime.timedelta(days=6), today)
+        self.assertEqual(len(daily), 7)
+        self.assertEqual(sum(p['revenue'] for p in daily), Decimal('30'))
+        self.assertEqual(sum(p['checkouts'] for p in daily), 1)
+        monthly = rollups.series('month', today - datetime.timedelta(days=6), today)
+        self.assertEqual(sum(p['revenue'] for p in monthly), Decimal('30'))
+        motors = rollups.series('week', today - datetime.timedelta(days=6), today, category=self.motors)
+        self.assertEqual(sum(p['revenue'] for p in motors), Decimal('20'))
+        self.assertEqual(rollups.top_categories(today - datetime.timedelta(days=6), today)[0]['category'], 'Motors')
+
+    def test_report_view_reads_only_rollups(self):
+        self.sell(self.sonar, 10, days_ago=1)
+        call_command('refresh_rollups', stdout=io.StringIO())
+        rollups.refresh(settle_delay=NOW)
+        self.client.login(username='staff', password='password')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('reports'), {'period': 'week'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries if 'FROM "inventory_sale"' in q['sql'] or 'FROM "inventory_transaction"' in q['sql']])
+        self.assertContains(response, 'Sensors')
+        self.assertEqual(self.client.get(reverse('reports'), {'start': '2025-02-01', 'end': '2025-01-01'}).status_code, 200)
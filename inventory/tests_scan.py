@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import stats
+from .models import Beneficiary, Category, Component, EmailOutbox, StockMovement, Transaction
+
+
+class ScanTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.category = Category.objects.create(name="Sensors")
+        self.sonar = Component.objects.create(serial_number="SN-1", name="Sonar", category=self.category, quantity=3)
+        self.student = Beneficiary.objects.create(name="Asha", category="Student", student_id="S100", email="asha@example.com")
+        self.intern = Beneficiary.objects.create(name="Ravi", category="Intern", employee_id="E200")
+        stats.rebuild()
+
+    def scan(self, **data):
+        return self.client.post(reverse('scan'), data)
+
+    def test_checkout_then_return(self):
+        response = self.scan(action='checkout', serial_number=' SN-1 ', borrower_id='s100', quantity=2)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['component']['quantity'], data['borrower']['name']), (1, 'Asha'))
+        self.sonar.refresh_from_db()
+        self.assertEqual(self.sonar.quantity, 1)
+        self.assertEqual(StockMovement.objects.filter(reason='CHECKOUT').count(), 1)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+        self.assertEqual(stats.current().active_checkouts, 1)
+
+        response = self.scan(action='return', serial_number='SN-1')
+        self.assertEqual(response.json()['message'], "Returned 2 of Sonar from Asha")
+        self.sonar.refresh_from_db()
+        self.assertEqual(self.sonar.quantity, 3)
+        self.assertEqual(stats.current().active_checkouts, 0)
+        self.assertEqual(self.scan(action='return', serial_number='SN-1').status_code, 400)
+
+    def test_return_picks_the_scanned_borrowers_loan(self):
+        self.scan(action='checkout', serial_number='SN-1', borrower_id='S100')
+        self.scan(action='checkout', serial_number='SN-1', borrower_id='E200')
+        self.scan(action='return', serial_number='SN-1', borrower_id='E200')
+        self.assertEqual(list(Transaction.objects.filter(return_time__isnull=True).values_list('borrower__name', flat=True)), ['Asha'])
+
+    def test_errors_come_back_per_field(self):
+        errors = self.scan(action='checkout', serial_number='NOPE', borrower_id='S100').json()['errors']
+        self.assertIn('serial_number', errors)
+        self.assertIn('borrower_id', self.scan(action='checkout', serial_number='SN-1').json()['errors'])
+        self.assertIn('borrower_id', self.scan(action='checkout', serial_number='SN-1', borrower_id='X9').json()['errors'])
+        self.assertIn('quantity', self.scan(action='checkout', serial_number='SN-1', borrower_id='S100', quantity=4).json()['errors'])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_scan_is_a_handful_of_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.scan(action='checkout', serial_number='SN-1', borrower_id='E200')
+        self.assertLessEqual(len(queries), 14)
+        self.assertContains(self.client.get(reverse('scan_desk')), 'Scan Desk')
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from . import stats
+from .models import Beneficiary, Category, Component, DashboardStats, Sale, Transaction
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.category = Category.objects.create(name="Sensors")
+        self.component = Component.objects.create(serial_number="SN-1", name="Sensor A", category=self.category, quantity=7)
+        self.beneficiary = Beneficiary.objects.create(name="John Doe", category="Other", added_by=self.user)
+        stats.rebuild()
+
+    def assertSnapshotMatchesTables(self):
+        snapshot = DashboardStats.objects.get()
+        for field, value in stats.compute().items():
+            self.assertEqual(getattr(snapshot, field), value, field)
+
+    def test_write_paths_keep_snapshot_in_sync(self):
+        self.client.post(reverse('checkout_component', args=[self.component.pk]), {
+            'borrower': self.beneficiary.pk, 'quantity_taken': 3,
+        })
+        self.assertSnapshotMatchesTables()
+        self.assertEqual(DashboardStats.objects.get().low_stock_count, 1)
+
+        self.client.post(reverse('sell_component', args=[self.component.pk]), {
+            'buyer': self.beneficiary.pk, 'quantity_sold': 1, 'price_per_unit': '12.50',
+        })
+        self.assertSnapshotMatchesTables()
+        self.assertEqual(DashboardStats.objects.get().unpaid_sales, Decimal('12.50'))
+
+        sale = Sale.objects.get()
+        self.client.post(reverse('mark_sale_paid', args=[sale.pk]))
+        self.client.post(reverse('mark_sale_paid', args=[sale.pk]))
+        self.assertSnapshotMatchesTables()
+        self.assertEqual(DashboardStats.objects.get().total_revenue, Decimal('12.50'))
+
+        transaction = Transaction.objects.get()
+        self.client.post(reverse('return_component', args=[transaction.pk]))
+        self.client.post(reverse('restock_component', args=[self.component.pk]), {'quantity': 10})
+        self.assertSnapshotMatchesTables()
+
+        self.client.post(reverse('delete_component', args=[self.component.pk]))
+        self.assertSnapshotMatchesTables()
+
+    def test_dashboard_reads_snapshot(self):
+        DashboardStats.objects.update(total_components=42)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_components'], 42)
+
+    def test_management_command_rebuilds(self):
+        DashboardStats.objects.all().delete()
+        call_command('rebuild_dashboard_stats', stdout=StringIO())
+        self.assertSnapshotMatchesTables()
@@ -0,0 +1,89 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+
+from . import stock
+from .models import Beneficiary, Category, Component, StockMovement, Transaction
+
+
+class StockMovementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.category = Category.objects.create(name="Sensors")
+        self.component = Component.objects.create(serial_number="SN-1", name="Sensor A", category=self.category, quantity=5)
+        self.beneficiary = Beneficiary.objects.create(name="John Doe", category="Other")
+
+    def test_withdrawal_beyond_stock_is_rejected(self):
+        with self.assertRaises(stock.InsufficientStock) as ctx:
+            stock.apply_movement(self.component, -6, 'CHECKOUT')
+        self.assertEqual(ctx.exception.available, 5)
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.quantity, 5)
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_stale_form_checkout_rolls_back(self):
+        # Another desk takes the stock after this form was validated against 5.
+        Component.objects.filter(pk=self.component.pk).update(quantity=1)
+        response = self.client.post(reverse('checkout_component', args=[self.component.pk]), {
+            'borrower': self.beneficiary.pk, 'quantity_taken': 3,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Only 1 items available.")
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_views_write_ledger(self):
+        self.client.post(reverse('checkout_component', args=[self.component.pk]), {
+            'borrower': self.beneficiary.pk, 'quantity_taken': 2,
+        })
+        transaction = Transaction.objects.get()
+        self.client.post(reverse('return_component', args=[transaction.pk]))
+        self.client.post(reverse('return_component', args=[transaction.pk]))
+        self.client.post(reverse('restock_component', args=[self.component.pk]), {'quantity': 4})
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.quantity, 9)
+        self.assertEqual(
+            list(StockMovement.objects.order_by('id').values_list('reason', 'change', 'quantity_after')),
+            [('CHECKOUT', -2, 3), ('RETURN', 2, 5), ('RESTOCK', 4, 9)],
+        )
+
+
+# Needs a database with row-level locking (PostgreSQL); SQLite locks whole tables.
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentStockTests(TransactionTestCase):
+    def test_parallel_checkouts_never_oversell(self):
+        category = Category.objects.create(name="Sensors")
+        component = Component.objects.create(serial_number="SN-1", name="Sensor A", category=category, quantity=20)
+        results = []
+        lock = threading.Lock()
+        start = threading.Barrier(8)
+
+        def worker():
+            try:
+                start.wait()
+                for _ in range(5):
+                    try:
+                        stock.apply_movement(Component.objects.get(pk=component.pk), -1, 'CHECKOUT')
+                        outcome = 'ok'
+                    except stock.InsufficientStock:
+                        outcome = 'short'
+                    with lock:
+                        results.append(outcome)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        component.refresh_from_db()
+        self.assertEqual(results.count('ok'), 20)
+        self.assertEqual(results.count('short'), 20)
+        self.assertEqual(component.quantity, 0)
+        self.assertEqual(StockMovement.objects.aggregate(total=Sum('change'))['total'], -20)
@@ -0,0 +1,82 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from . import thumbnails
+from .models import Category, Component
+
+
+def photo(name='board.png', size=(1600, 1200), mode='RGBA'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 40, 40, 128) if mode == 'RGBA' else (200, 40, 40)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.category = Category.objects.create(name="Boards")
+
+    def test_variants_created_on_upload(self):
+        component = Component.objects.create(serial_number="B-1", name="Arduino", category=self.category, image=photo())
+        for size in thumbnails.SIZES:
+            for ext in thumbnails.FORMATS:
+                name = thumbnails.variant_name(component.image.name, size, ext)
+                self.assertTrue(default_storage.exists(name), name)
+        with default_storage.open(thumbnails.variant_name(component.image.name, 180, 'webp')) as f:
+            image = Image.open(f)
+            self.assertEqual((image.format, image.size), ('WEBP', (180, 135)))
+
+    def test_backfill_command(self):
+        component = Component.objects.create(serial_number="B-2", name="Pi", category=self.category, image=photo())
+        shutil.rmtree(f"{self.media}/{thumbnails.THUMB_DIR}")
+        self.assertFalse(thumbnails.has_variants(component.image))
+        call_command('generate_thumbnails', stdout=io.StringIO())
+        self.assertTrue(thumbnails.has_variants(component.image))
+
+    def test_unreadable_image_is_skipped(self):
+        bogus = SimpleUploadedFile('broken.png', b'not an image', content_type='image/png')
+        component = Component(serial_number="B-3", name="Broken", category=self.category)
+        component.image.save('broken.png', bogus, save=False)
+        with self.assertLogs('inventory.thumbnails', 'WARNING'):
+            self.assertFalse(thumbnails.generate(component.image))
+
+    def test_oversized_upload_keeps_the_original(self):
+        # 1600x1200 is past the warning limit at 1M pixels and past the hard limit at 0.5M.
+        for limit in (1_000_000, 500_000):
+            with self.subTest(limit=limit), mock.patch.object(Image, 'MAX_IMAGE_PIXELS', limit), \
+                    self.assertLogs('inventory.thumbnails', 'WARNING'):
+                component = Component.objects.create(serial_number=f"B-{limit}", name="Huge",
+                                                     category=self.category, image=photo())
+            self.assertTrue(default_storage.exists(component.image.name))
+            self.assertFalse(thumbnails.has_variants(component.image))
+
+    def test_tag_emits_srcset(self):
+        component = Component.objects.create(serial_number="B-4", name="ESP32", category=self.category, image=photo())
+        html = Template('{% load thumbnails %}{% responsive_image c.image 64 alt=c.name class="x" %}').render(
+            Context({'c': component}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('-64.webp 64w, ', html)
+        self.assertIn('-128.jpg 128w"', html)
+        self.assertNotIn('-180.', html)
+        self.assertIn('alt="ESP32"', html)
+        self.assertIn('class="x"', html)
+
+    def test_tag_falls_back_to_original(self):
+        component = Component.objects.create(serial_number="B-5", name="Nano", category=self.category, image=photo())
+        shutil.rmtree(f"{self.media}/{thumbnails.THUMB_DIR}")
+        html = Template('{% load thumbnails %}{% responsive_image c.image 64 %}').render(Context({'c': component}))
+        self.assertIn(f'src="{component.image.url}"', html)
+        self.assertNotIn('<picture>', html)
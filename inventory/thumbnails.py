@@ -0,0 +1,86 @@
+"""Fixed-size thumbnails and WebP variants for uploaded photos.
+
+Every size in ``SIZES`` is written twice next to the original's storage
+path: a JPEG for browsers without WebP and a WebP for the rest. Variant
+names are derived from the original's name, so templates can build
+``srcset`` URLs without a database lookup. Variants are created when a
+component or profile photo is saved and by the ``generate_thumbnails``
+command for images uploaded before this existed.
+"""
+import io
+import logging
+import posixpath
+import warnings
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Dashboard tiles (64px), catalogue cards (~320px) and the detail photo,
+# plus their 2x versions.
+SIZES = (64, 128, 180, 360, 720)
+FORMATS = {'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+           'webp': ('WEBP', {'quality': 78, 'method': 6})}
+THUMB_DIR = 'thumbs'
+
+
+def variant_name(name, size, ext):
+    """``components/x.jpeg`` -> ``thumbs/components/x-180.webp``."""
+    root, _ = posixpath.splitext(name)
+    return posixpath.join(THUMB_DIR, f"{root}-{size}.{ext}")
+
+
+def has_variants(field):
+    # The largest WebP is written last, so it only exists once a run finished.
+    return field.storage.exists(variant_name(field.name, SIZES[-1], 'webp'))
+
+
+def _flatten(image):
+    """EXIF-rotated RGB copy; transparency is composited onto white for JPEG."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate(field, force=False):
+    """Write every variant of ``field``'s image; returns False if it can't be read."""
+    if not field or (not force and has_variants(field)):
+        return bool(field)
+    try:
+        with field.storage.open(field.name, 'rb') as original, warnings.catch_warnings():
+            # Refuse oversized uploads outright instead of decoding them.
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            source = _flatten(Image.open(original))
+    except (OSError, ValueError, Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+        logger.warning("Cannot make thumbnails for %s: %s", field.name, e)
+        return False
+
+    for size in SIZES:
+        image = source.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for ext, (fmt, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            image.save(buffer, fmt, **options)
+            name = variant_name(field.name, size, ext)
+            if field.storage.exists(name):
+                field.storage.delete(name)
+            field.storage.save(name, ContentFile(buffer.getvalue()))
+    return True
+
+
+def srcset(field, ext, max_size=None):
+    """``url 64w, url 128w, ...`` for the variants up to ``max_size``."""
+    return ', '.join(
+        f"{field.storage.url(variant_name(field.name, size, ext))} {size}w"
+        for size in SIZES if max_size is None or size <= max_size
+    )
+
+
+def best_size(width):
+    """Smallest variant that still covers ``width`` CSS pixels."""
+    return next((size for size in SIZES if size >= width), SIZES[-1])
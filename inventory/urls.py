@@ -5,8 +5,12 @@ urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('component/<int:pk>/', views.component_detail, name='component_detail'),
     path('checkout/<int:pk>/', views.checkout_component, name='checkout_component'),
+    path('checkout/cart/', views.cart_checkout, name='cart_checkout'),
+    path('scan/', views.scan_desk, name='scan_desk'),
+    path('api/scan/', views.scan, name='scan'),
     path('return/<int:transaction_id>/', views.return_component, name='return_component'),
     path('component/add/', views.add_component, name='add_component'),
+    path('components/import/', views.import_components, name='import_components'),
     path('component/<int:pk>/edit/', views.edit_component, name='edit_component'),
     path('component/<int:pk>/delete/', views.delete_component, name='delete_component'),
     path('accounts/', include('django.contrib.auth.urls')),
@@ -27,6 +31,16 @@ urlpatterns = [
     path('component/<int:pk>/sell/', views.sell_component, name='sell_component'),
     path('sale/<int:pk>/mark_paid/', views.mark_sale_paid, name='mark_sale_paid'),
     path('components/', views.component_list, name='component_list'),
+    path('components/cards/', views.component_cards, name='component_cards'),
+    path('components/low-stock/', views.low_stock_list, name='low_stock_list'),
+    path('api/low-stock/', views.low_stock_feed, name='low_stock_feed'),
+    path('api/v1/<slug:resource>/', views.api_list, name='api_list'),
+    path('api/v1/<slug:resource>/<int:pk>/', views.api_detail, name='api_detail'),
+    path('loans/overdue/', views.overdue_list, name='overdue_list'),
     path('sales/', views.sale_list, name='sale_list'),
+    path('sales/reconcile/', views.reconcile_payments, name='reconcile_payments'),
+    path('export/<slug:kind>/', views.export_data, name='export_data'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('reports/', views.reports, name='reports'),
     path('component/<int:pk>/restock/', views.restock_component, name='restock_component'),
 ]
@@ -1,81 +1,134 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, redirect, aget_object_or_404
 from .models import Component, Transaction, Beneficiary, Category, Sale
 from .forms import CheckoutForm, ComponentForm, BeneficiaryForm
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from .forms import UserForm, BeneficiaryProfileForm
-from django.db.models import Q
+from django.db.models import Count
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils import timezone
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse, HttpResponseBadRequest, Http404, HttpResponse
 from .forms import CheckoutForm, ComponentForm, BeneficiaryForm, EnhancedUserCreationForm, SellForm
-from django.core.mail import send_mail
+from .forms import CartCheckoutForm, CartLineFormSet, ComponentImportForm, ExportFilterForm, ReportFilterForm, ScanForm
+from .forms import ComponentFilterForm, PaymentReconcileForm
+from . import importer, exports, facets, payments
 from django.views.decorators.http import require_POST
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.http import urlencode
+from django.urls import reverse
+from django.db.transaction import atomic
+from .pagination import keyset_paginate, akeyset_paginate, InvalidCursor
+from . import stats, outbox, stock, identifiers, metrics, catalogue_cache, rollups, api, panels
+from django.views.decorators.gzip import gzip_page
+from django.utils.cache import get_conditional_response, patch_cache_control
+from asgiref.sync import sync_to_async
+import asyncio
+import hashlib
+import json
+
+CATALOGUE_PAGE_SIZE = 48
+
+# Templates read request.user, the session and flash messages lazily through
+# the sync ORM, so async views fetch their data first and render in a thread.
+arender = sync_to_async(render)
 
 def is_admin(user):
     return user.is_superuser
 
-def dashboard(request):
+def catalogue_queryset(request):
+    """The (optionally searched and faceted) catalogue and the keyset ordering to page it by."""
+    components = Component.objects.catalogue().search(request.GET.get('q'))
+    components = facets.apply(components, ComponentFilterForm(request.GET).selected())
+    # Full-text searches come back ranked; browse in name order otherwise.
+    ordering = ('-rank', 'id') if 'rank' in components.query.annotations else ('name', 'id')
+    return components, ordering
+
+def catalogue_page(request):
+    """Keyset page of the (optionally searched) catalogue plus the query string for the next one."""
+    components, ordering = catalogue_queryset(request)
+    try:
+        page = keyset_paginate(components, ordering, request.GET.get('cursor'), CATALOGUE_PAGE_SIZE)
+    except InvalidCursor:
+        page = keyset_paginate(components, ordering, None, CATALOGUE_PAGE_SIZE)
+    return catalogue_context(request, page)
+
+async def acatalogue_page(request):
+    components, ordering = catalogue_queryset(request)
+    try:
+        page = await akeyset_paginate(components, ordering, request.GET.get('cursor'), CATALOGUE_PAGE_SIZE)
+    except InvalidCursor:
+        page = await akeyset_paginate(components, ordering, None, CATALOGUE_PAGE_SIZE)
+    return catalogue_context(request, page)
+
+def catalogue_context(request, page):
+    query = request.GET.get('q')
+    next_query = ''
+    if page.has_next:
+        params = {'cursor': page.next_cursor}
+        if query:
+            params['q'] = query
+        params.update(ComponentFilterForm(request.GET).selected())
+        next_query = urlencode(params)
+    return {
+        'components': page,
+        'query': query,
+        'next_query': next_query,
+        'is_first_page': not request.GET.get('cursor'),
+    }
+
+def public_catalogue_page(request):
+    context = catalogue_page(request)
+    context['total_components'] = Component.objects.search(request.GET.get('q')).count()
+    return context
+
+async def fetch(queryset):
+    """Evaluate ``queryset`` with the async ORM."""
+    return [obj async for obj in queryset]
+
+async def dashboard(request):
     query = request.GET.get('q')
-    if query:
-        components = Component.objects.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query) | 
-            Q(category__name__icontains=query) |
-            Q(serial_number__icontains=query) |
-            Q(box_number__icontains=query)
-        )
-    else:
-        components = Component.objects.all()
 
     # Public view for logged-out users: just lab stock + search
-    if not request.user.is_authenticated:
-        return render(request, 'inventory/public_inventory.html', {
-            'components': components.order_by('name'),
-            'query': query,
-            'total_components': components.count(),
-        })
-
-    low_stock_components = Component.objects.filter(
-        Q(component_type='GENERAL', quantity__lte=5) | 
-        Q(component_type='KIT', quantity__lte=1)
-    ).order_by('quantity', 'name')
-
-    # Limit to latest 4 items for dashboard summary
-    latest_components = components.order_by('-last_updated')[:4]
-    latest_sales = Sale.objects.all().order_by('-sale_time')[:4]
-
-    from django.db.models import Sum, Count
-    total_components = Component.objects.count()
-    total_revenue = Sale.objects.filter(is_paid=True).aggregate(total=Sum('total_price'))['total'] or 0
-    active_checkouts = Transaction.objects.filter(return_time__isnull=True).count()
-    low_stock_count = low_stock_components.count()
-    unpaid_sales = Sale.objects.filter(is_paid=False).aggregate(total=Sum('total_price'))['total'] or 0
-
-    total_kits = Component.objects.filter(component_type='KIT').count()
-    recent_kits = Component.objects.filter(component_type='KIT').order_by('-last_updated')[:4]
+    user = await request.auser()
+    if not user.is_authenticated:
+        return await sync_to_async(catalogue_cache.cached_page)(request, 'inventory/public_inventory.html', public_catalogue_page)
+
+    components = Component.objects.select_related('category').search(query)
+
+    # All headline counters, and the versions keying the cached panels, come
+    # from the single maintained snapshot row. It is read before the panels,
+    # so no panel is cached under a version newer than its data.
+    snapshot = await stats.acurrent()
+    # The rest is independent, so it is awaited together rather than one by one.
+    latest_components, panel_html, overdue_count = await asyncio.gather(
+        # Limit to latest 4 items for dashboard summary
+        fetch(components.order_by('-last_updated')[:4]),
+        panels.render(snapshot),
+        Transaction.objects.overdue().acount(),
+    )
 
     context = {
         'components': latest_components,
-        'kits': recent_kits,
+        'panels': panel_html,
         'query': query,
-        'low_stock_components': low_stock_components,
-        'sales': latest_sales,
-        'total_components': total_components,
-        'total_kits': total_kits,
-        'total_revenue': total_revenue,
-        'active_checkouts': active_checkouts,
-        'low_stock_count': low_stock_count,
-        'unpaid_sales': unpaid_sales,
+        'total_components': snapshot.total_components,
+        'total_kits': snapshot.total_kits,
+        'total_revenue': snapshot.total_revenue,
+        'active_checkouts': snapshot.active_checkouts,
+        'overdue_count': overdue_count,
+        'low_stock_count': snapshot.low_stock_count,
+        'unpaid_sales': snapshot.unpaid_sales,
     }
-    return render(request, 'inventory/dashboard.html', context)
+    return await arender(request, 'inventory/dashboard.html', context)
 
-def component_detail(request, pk):
-    component = get_object_or_404(Component, pk=pk)
+async def component_detail(request, pk):
+    component = await aget_object_or_404(Component.objects.select_related('category'), pk=pk)
     # Get active transactions (not returned yet)
-    active_transactions = Transaction.objects.filter(component=component, return_time__isnull=True)
-    return render(request, 'inventory/component_detail.html', {
+    active_transactions = await fetch(
+        Transaction.objects.open().filter(component=component).select_related('borrower', 'authorized_by')
+    )
+    return await arender(request, 'inventory/component_detail.html', {
         'component': component,
         'active_transactions': active_transactions
     })
@@ -88,7 +141,10 @@ def add_component(request):
     if request.method == 'POST':
         form = ComponentForm(request.POST, request.FILES)
         if form.is_valid():
-            component = form.save()
+            with atomic():
+                component = form.save()
+                stock.record_initial_stock(component, request.user)
+                stats.record_component_added(component)
             messages.success(request, f"Component '{component.name}' created successfully.")
             return redirect('component_detail', pk=component.pk)
         else:
@@ -107,47 +163,85 @@ def add_component(request):
 def edit_component(request, pk):
     component = get_object_or_404(Component, pk=pk)
     if request.method == 'POST':
+        old_type, old_quantity, old_reorder_level = component.component_type, component.quantity, component.reorder_level
         form = ComponentForm(request.POST, request.FILES, instance=component)
         if form.is_valid():
-            form.save()
-            messages.success(request, f"Component '{component.name}' updated successfully.")
-            return redirect('component_detail', pk=component.pk)
+            try:
+                with atomic():
+                    # Save everything but the quantity, then apply the edit as a
+                    # relative movement so concurrent checkouts are not overwritten.
+                    component = form.save(commit=False)
+                    new_quantity = component.quantity
+                    component.quantity = old_quantity
+                    component.save(update_fields=[f for f in form._meta.fields if f != 'quantity'] + ['last_updated'])
+                    if new_quantity != old_quantity:
+                        stock.apply_movement(component, new_quantity - old_quantity, 'ADJUSTMENT', user=request.user)
+                    stats.record_component_changed(component, old_type, old_quantity, old_reorder_level)
+            except stock.InsufficientStock as e:
+                form.add_error('quantity', f"Stock changed while you were editing; {e.available} items are available now.")
+            else:
+                messages.success(request, f"Component '{component.name}' updated successfully.")
+                return redirect('component_detail', pk=component.pk)
     else:
         form = ComponentForm(instance=component)
     return render(request, 'inventory/component_form.html', {'form': form, 'title': 'Edit Component', 'component': component})
 
 
+@login_required
+@user_passes_test(is_admin_or_staff)
+def import_components(request):
+    result = None
+    if request.method == 'POST':
+        form = ComponentImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                rows = importer.read_rows(importer.open_text(upload.file), importer.format_for(upload.name))
+                result = importer.import_components(rows, user=request.user)
+            except (ValueError, UnicodeDecodeError) as e:
+                form.add_error('file', f"Could not read the file: {e}")
+            else:
+                messages.success(request, f"Imported {result.created} new and {result.updated} updated components.")
+                if result.error_count:
+                    messages.warning(request, f"{result.error_count} row(s) were skipped because of errors.")
+    else:
+        form = ComponentImportForm()
+    return render(request, 'inventory/component_import.html', {'form': form, 'result': result})
+
+
 @login_required
 @user_passes_test(is_admin_or_staff)
 def delete_component(request, pk):
     component = get_object_or_404(Component, pk=pk)
     if request.method == 'POST':
         name = component.name
-        component.delete()
+        with atomic():
+            # Cascades to transactions and sales, so recount everything.
+            component.delete()
+            stats.rebuild()
         messages.success(request, f"Component '{name}' deleted successfully.")
         return redirect('dashboard')
     return render(request, 'inventory/component_confirm_delete.html', {'component': component})
 
-@login_required
-def checkout_component(request, pk):
-    component = get_object_or_404(Component, pk=pk)
-    if request.method == 'POST':
-        form = CheckoutForm(request.POST, component=component)
-        if form.is_valid():
-            transaction = form.save(commit=False)
-            transaction.component = component
-            transaction.authorized_by = request.user
-            transaction.save()
-            
-            # Decrease quantity
-            component.quantity -= transaction.quantity_taken
-            component.save()
-            
-            # Send email notification if borrower has email
-            if transaction.borrower.email:
-                try:
-                    subject = f"RoboStock: Component Checkout Notification - {component.name}"
-                    message = f"""
+def complete_checkout(transaction, user):
+    """Save a new loan, take its quantity out of stock and queue the borrower's notification.
+
+    Raises stock.InsufficientStock; call inside ``atomic()`` so the loan is
+    rolled back with it.
+    """
+    component = transaction.component
+    transaction.authorized_by = user
+    transaction.save()
+
+    # Decrease quantity
+    movement = stock.apply_movement(component, -transaction.quantity_taken, 'CHECKOUT',
+                                    user=user, transaction=transaction)
+    stats.record_checkout(component, movement.quantity_before)
+
+    # Queue email notification if borrower has email
+    if transaction.borrower.email:
+        subject = f"RoboStock: Component Checkout Notification - {component.name}"
+        message = f"""
 Hello {transaction.borrower.name},
 
 You have successfully checked out an item from the RoboStock Laboratory Inventory.
@@ -156,25 +250,70 @@ Details:
 - Component: {component.name}
 - Quantity: {transaction.quantity_taken}
 - Checkout Time: {transaction.checkout_time.strftime('%Y-%m-%d %H:%M:%S')}
-- Authorized By: {request.user.get_full_name() or request.user.username}
+- Authorized By: {user.get_full_name() or user.username}
 
 Please ensure the items are returned in good condition.
 
 Best regards,
 RoboStock Lab Management
-                    """
-                    send_mail(
-                        subject,
-                        message,
-                        None, # Uses DEFAULT_FROM_EMAIL
-                        [transaction.borrower.email],
-                        fail_silently=True,
-                    )
-                except Exception as e:
-                    print(f"Error sending email: {e}")
+        """
+        outbox.enqueue(subject, message, transaction.borrower.email)
+
+def complete_return(transaction, user):
+    """Mark a loan returned and restock it; returns False if it was already returned.
+
+    Call inside ``atomic()`` so the claim and the restock commit together.
+    """
+    # Claim the return with a conditional UPDATE so a double submit cannot restock twice.
+    returned_at = timezone.now()
+    claimed = Transaction.objects.filter(pk=transaction.pk, return_time__isnull=True).update(return_time=returned_at)
+    if claimed:
+        transaction.return_time = returned_at
+
+        # Increase quantity back
+        component = transaction.component
+        movement = stock.apply_movement(component, transaction.quantity_taken, 'RETURN',
+                                        user=user, transaction=transaction)
+        stats.record_return(component, movement.quantity_before)
 
-            messages.success(request, f"Checked out {transaction.quantity_taken} of {component.name} to {transaction.borrower.name}")
-            return redirect('component_detail', pk=pk)
+        # Queue email notification if borrower has email
+        if transaction.borrower.email:
+            subject = f"RoboStock: Component Return Confirmation - {component.name}"
+            message = f"""
+Hello {transaction.borrower.name},
+
+This email confirms that you have successfully returned the following item to the RoboStock Laboratory Inventory.
+
+Details:
+- Component: {component.name}
+- Quantity Returned: {transaction.quantity_taken}
+- Return Time: {transaction.return_time.strftime('%Y-%m-%d %H:%M:%S')}
+- Processed By: {user.get_full_name() or user.username}
+
+Thank you for returning the items on time.
+
+Best regards,
+RoboStock Lab Management
+            """
+            outbox.enqueue(subject, message, transaction.borrower.email)
+    return bool(claimed)
+
+@login_required
+def checkout_component(request, pk):
+    component = get_object_or_404(Component, pk=pk)
+    if request.method == 'POST':
+        form = CheckoutForm(request.POST, component=component)
+        if form.is_valid():
+            try:
+                with atomic():
+                    transaction = form.save(commit=False)
+                    transaction.component = component
+                    complete_checkout(transaction, request.user)
+            except stock.InsufficientStock as e:
+                form.add_error('quantity_taken', str(e))
+            else:
+                messages.success(request, f"Checked out {transaction.quantity_taken} of {component.name} to {transaction.borrower.name}")
+                return redirect('component_detail', pk=pk)
     else:
         form = CheckoutForm(component=component)
     
@@ -185,6 +324,64 @@ RoboStock Lab Management
     }
     return render(request, 'inventory/checkout_form.html', context)
 
+@login_required
+def cart_checkout(request):
+    """Check out many components to one borrower in a single request and transaction."""
+    if request.method == 'POST':
+        form = CartCheckoutForm(request.POST)
+        formset = CartLineFormSet(request.POST, prefix='lines')
+        if form.is_valid() and formset.is_valid():
+            borrower = form.cleaned_data['borrower']
+            notes = form.cleaned_data['notes']
+            try:
+                with atomic():
+                    transactions = Transaction.objects.bulk_create([
+                        Transaction(component=component, borrower=borrower, authorized_by=request.user,
+                                    quantity_taken=quantity, notes=notes)
+                        for component, quantity in formset.lines
+                    ])
+                    movements = stock.apply_movements(
+                        [(t.component, -t.quantity_taken, t) for t in transactions], 'CHECKOUT', user=request.user
+                    )
+                    stats.record_checkouts(movements)
+
+                    # One combined notification for the whole cart
+                    if borrower.email:
+                        items = '\n'.join(f"- {t.component.name} x {t.quantity_taken}" for t in transactions)
+                        subject = f"RoboStock: Component Checkout Notification - {len(transactions)} item(s)"
+                        message = f"""
+Hello {borrower.name},
+
+You have successfully checked out the following items from the RoboStock Laboratory Inventory.
+
+Items:
+{items}
+
+- Checkout Time: {transactions[0].checkout_time.strftime('%Y-%m-%d %H:%M:%S')}
+- Authorized By: {request.user.get_full_name() or request.user.username}
+
+Please ensure the items are returned in good condition.
+
+Best regards,
+RoboStock Lab Management
+                        """
+                        outbox.enqueue(subject, message, borrower.email)
+            except stock.InsufficientStock as e:
+                form.add_error(None, f"{e.component.name}: only {e.available} items available.")
+            else:
+                total = sum(t.quantity_taken for t in transactions)
+                messages.success(request, f"Checked out {total} item(s) across {len(transactions)} component(s) to {borrower.name}")
+                return redirect('beneficiary_detail', pk=borrower.pk)
+    else:
+        form = CartCheckoutForm()
+        formset = CartLineFormSet(prefix='lines')
+
+    return render(request, 'inventory/cart_checkout_form.html', {
+        'form': form,
+        'formset': formset,
+        'current_date': timezone.now(),
+    })
+
 @login_required
 def return_component(request, transaction_id):
     transaction = get_object_or_404(Transaction, pk=transaction_id)
@@ -193,43 +390,13 @@ def return_component(request, transaction_id):
         return redirect('component_detail', pk=transaction.component.pk)
         
     if request.method == 'POST':
-        transaction.return_time = timezone.now()
-        transaction.save()
-        
-        # Increase quantity back
+        with atomic():
+            claimed = complete_return(transaction, request.user)
         component = transaction.component
-        component.quantity += transaction.quantity_taken
-        component.save()
-        
-        # Send email notification if borrower has email
-        if transaction.borrower.email:
-            try:
-                subject = f"RoboStock: Component Return Confirmation - {component.name}"
-                message = f"""
-Hello {transaction.borrower.name},
 
-This email confirms that you have successfully returned the following item to the RoboStock Laboratory Inventory.
-
-Details:
-- Component: {component.name}
-- Quantity Returned: {transaction.quantity_taken}
-- Return Time: {transaction.return_time.strftime('%Y-%m-%d %H:%M:%S')}
-- Processed By: {request.user.get_full_name() or request.user.username}
-
-Thank you for returning the items on time.
-
-Best regards,
-RoboStock Lab Management
-                """
-                send_mail(
-                    subject,
-                    message,
-                    None, # Uses DEFAULT_FROM_EMAIL
-                    [transaction.borrower.email],
-                    fail_silently=True,
-                )
-            except Exception as e:
-                print(f"Error sending return email: {e}")
+        if not claimed:
+            messages.warning(request, "This item has already been returned.")
+            return redirect('component_detail', pk=transaction.component_id)
 
         messages.success(request, f"Returned {transaction.quantity_taken} of {component.name} from {transaction.borrower.name}")
         return redirect('component_detail', pk=component.pk)
@@ -237,9 +404,49 @@ RoboStock Lab Management
     return render(request, 'inventory/return_confirm.html', {'transaction': transaction})
 
 @login_required
-def beneficiary_list(request):
-    beneficiaries = Beneficiary.objects.all()
-    return render(request, 'inventory/beneficiary_list.html', {'beneficiaries': beneficiaries})
+def scan_desk(request):
+    """Single-screen issue desk: scan an ID card and serial numbers, each scan posts to ``scan``."""
+    return render(request, 'inventory/scan.html')
+
+@login_required
+@require_POST
+def scan(request):
+    """JSON endpoint that checks out or returns the scanned serial number in one request."""
+    form = ScanForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'ok': False, 'errors': {field: list(errors) for field, errors in form.errors.items()}}, status=400)
+
+    component = form.cleaned_data['component']
+    try:
+        with atomic():
+            if form.cleaned_data['action'] == 'checkout':
+                transaction = Transaction(component=component, borrower=form.cleaned_data['borrower'],
+                                          quantity_taken=form.cleaned_data['quantity'], notes=form.cleaned_data['notes'])
+                complete_checkout(transaction, request.user)
+                message = f"Checked out {transaction.quantity_taken} of {component.name} to {transaction.borrower.name}"
+            else:
+                transaction = form.cleaned_data['loan']
+                transaction.component = component
+                if not complete_return(transaction, request.user):
+                    return JsonResponse({'ok': False, 'errors': {'__all__': ["This item has already been returned."]}}, status=409)
+                message = f"Returned {transaction.quantity_taken} of {component.name} from {transaction.borrower.name}"
+    except stock.InsufficientStock as e:
+        return JsonResponse({'ok': False, 'errors': {'quantity': [str(e)]}}, status=409)
+
+    return JsonResponse({
+        'ok': True,
+        'action': form.cleaned_data['action'],
+        'message': message,
+        'transaction': transaction.pk,
+        'component': {'id': component.pk, 'serial_number': component.serial_number, 'name': component.name,
+                      'quantity': component.quantity},
+        'borrower': {'id': transaction.borrower.pk, 'name': transaction.borrower.name},
+    })
+
+@login_required
+async def beneficiary_list(request):
+    beneficiaries = await fetch(Beneficiary.objects.select_related('added_by'))
+    return await arender(request, 'inventory/beneficiary_list.html', {'beneficiaries': beneficiaries})
 
 @login_required
 def add_beneficiary(request):
@@ -277,7 +484,9 @@ def delete_beneficiary(request, pk):
     beneficiary = get_object_or_404(Beneficiary, pk=pk)
     if request.method == 'POST':
         name = beneficiary.name
-        beneficiary.delete()
+        with atomic():
+            beneficiary.delete()
+            stats.rebuild()
         messages.success(request, f"Beneficiary '{name}' deleted successfully.")
         return redirect('beneficiary_list')
     return render(request, 'inventory/beneficiary_confirm_delete.html', {'beneficiary': beneficiary})
@@ -337,14 +546,20 @@ def checkout_self(request, pk):
         # restrict borrower choices
         form.fields['borrower'].queryset = Beneficiary.objects.filter(pk=beneficiary.pk)
         if form.is_valid():
-            transaction = form.save(commit=False)
-            transaction.component = component
-            transaction.authorized_by = user
-            transaction.save()
-            component.quantity -= transaction.quantity_taken
-            component.save()
-            messages.success(request, f"Checked out {transaction.quantity_taken} of {component.name} to {transaction.borrower.name}")
-            return redirect('component_detail', pk=pk)
+            try:
+                with atomic():
+                    transaction = form.save(commit=False)
+                    transaction.component = component
+                    transaction.authorized_by = user
+                    transaction.save()
+                    movement = stock.apply_movement(component, -transaction.quantity_taken, 'CHECKOUT',
+                                                    user=user, transaction=transaction)
+                    stats.record_checkout(component, movement.quantity_before)
+            except stock.InsufficientStock as e:
+                form.add_error('quantity_taken', str(e))
+            else:
+                messages.success(request, f"Checked out {transaction.quantity_taken} of {component.name} to {transaction.borrower.name}")
+                return redirect('component_detail', pk=pk)
     else:
         form = CheckoutForm(component=component, initial={'borrower': beneficiary.pk})
         form.fields['borrower'].queryset = Beneficiary.objects.filter(pk=beneficiary.pk)
@@ -352,43 +567,55 @@ def checkout_self(request, pk):
 
     return render(request, 'inventory/checkout_form.html', {'form': form, 'component': component, 'current_date': timezone.now()})
 
+HISTORY_PAGE_SIZE = 25
+LOAN_HISTORY_ORDERING = ('-checkout_time', '-id')
+SALE_HISTORY_ORDERING = ('-sale_time', '-id')
+
+def history_page(queryset, ordering, cursor):
+    try:
+        return keyset_paginate(queryset, ordering, cursor, HISTORY_PAGE_SIZE)
+    except InvalidCursor:
+        return keyset_paginate(queryset, ordering, None, HISTORY_PAGE_SIZE)
+
 @login_required
 def beneficiary_detail(request, pk):
-    beneficiary = get_object_or_404(Beneficiary, pk=pk)
-    transactions = Transaction.objects.filter(borrower=beneficiary).order_by('-checkout_time')
-    sales = Sale.objects.filter(buyer=beneficiary).order_by('-sale_time')
-    return render(request, 'inventory/beneficiary_detail.html', {'beneficiary': beneficiary, 'transactions': transactions, 'sales': sales})
+    """Profile with summary totals and keyset-paged loan and purchase history."""
+    beneficiary = get_object_or_404(Beneficiary.objects.select_related('added_by').with_history_summary(), pk=pk)
+    loans_cursor = request.GET.get('loans')
+    sales_cursor = request.GET.get('sales')
+    transactions = history_page(
+        Transaction.objects.filter(borrower=beneficiary).select_related('component', 'authorized_by'),
+        LOAN_HISTORY_ORDERING, loans_cursor,
+    )
+    sales = history_page(
+        Sale.objects.filter(buyer=beneficiary).select_related('component', 'authorized_by'),
+        SALE_HISTORY_ORDERING, sales_cursor,
+    )
+    # Paging one table keeps the other where it was.
+    def page_query(**cursors):
+        params = {'loans': loans_cursor, 'sales': sales_cursor, **cursors}
+        return urlencode({name: value for name, value in params.items() if value})
+    return render(request, 'inventory/beneficiary_detail.html', {
+        'beneficiary': beneficiary,
+        'transactions': transactions,
+        'sales': sales,
+        'next_loans_query': page_query(loans=transactions.next_cursor) if transactions.has_next else '',
+        'next_sales_query': page_query(sales=sales.next_cursor) if sales.has_next else '',
+        'is_first_page': not (loans_cursor or sales_cursor),
+    })
 
 
 @login_required
-def get_beneficiary_data(request, employee_id):
+async def get_beneficiary_data(request, employee_id):
     """AJAX endpoint to fetch beneficiary data by employee_id or student_id."""
     # Note: employee_id is the URL parameter name, but we use it as a generic search_id
-    search_id = employee_id
-    try:
-        beneficiary = Beneficiary.objects.filter(
-            Q(employee_id=search_id) | Q(student_id=search_id)
-        ).first()
-        
-        if not beneficiary:
-            return JsonResponse({'exists': False})
-
-        # Try to parse name into first and last
-        name_parts = beneficiary.name.split(' ')
-        first_name = name_parts[0]
-        last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else ''
-        
-        return JsonResponse({
-            'exists': True,
-            'name': beneficiary.name,
-            'first_name': first_name,
-            'last_name': last_name,
-            'email': beneficiary.email,
-            'designation': beneficiary.designation,
-            'category': beneficiary.category,
-        })
-    except Exception as e:
-        return JsonResponse({'exists': False, 'error': str(e)})
+    data = await identifiers.alookup(employee_id)
+    etag = '"%s"' % hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    # Repeat scans of the same ID revalidate and get a bodyless 304.
+    response = get_conditional_response(request, etag=etag) or JsonResponse(data)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 @login_required
 @user_passes_test(is_admin)
@@ -456,7 +683,7 @@ def add_category(request):
 @login_required
 @user_passes_test(is_admin)
 def category_list(request):
-    categories = Category.objects.all().order_by('name')
+    categories = Category.objects.annotate(component_count=Count('components')).order_by('name')
     return render(request, 'inventory/category_list.html', {'categories': categories})
 
 
@@ -466,7 +693,9 @@ def delete_category(request, pk):
     category = get_object_or_404(Category, pk=pk)
     if request.method == 'POST':
         name = category.name
-        category.delete()
+        with atomic():
+            category.delete()
+            stats.rebuild()
         messages.success(request, f"Category '{name}' deleted.")
         return redirect('category_list')
     return render(request, 'inventory/category_confirm_delete.html', {'category': category})
@@ -480,7 +709,10 @@ def delete_user(request, pk):
         if user.username == request.user.username:
             messages.error(request, "You cannot delete your own account while logged in.")
             return redirect('user_list')
-        user.delete()
+        with atomic():
+            # Cascades through the linked beneficiary's loans and purchases.
+            user.delete()
+            stats.rebuild()
         messages.success(request, f"User '{user.username}' deleted.")
         return redirect('user_list')
     return render(request, 'inventory/user_confirm_delete.html', {'user_obj': user})
@@ -494,22 +726,24 @@ def sell_component(request, pk):
     if request.method == 'POST':
         form = SellForm(request.POST, component=component)
         if form.is_valid():
-            sale = form.save(commit=False)
-            sale.component = component
-            sale.authorized_by = request.user
-            # Calculate total price
-            sale.total_price = sale.quantity_sold * sale.price_per_unit
-            sale.save()
-            
-            # Decrease quantity permanently
-            component.quantity -= sale.quantity_sold
-            component.save()
-            
-            # Send email notification if buyer has email
-            if sale.buyer and sale.buyer.email:
-                try:
-                    subject = f"RoboStock: Component Purchase Receipt - {component.name}"
-                    message = f"""
+            try:
+                with atomic():
+                    sale = form.save(commit=False)
+                    sale.component = component
+                    sale.authorized_by = request.user
+                    # Calculate total price
+                    sale.total_price = sale.quantity_sold * sale.price_per_unit
+                    sale.save()
+
+                    # Decrease quantity permanently
+                    movement = stock.apply_movement(component, -sale.quantity_sold, 'SALE',
+                                                    user=request.user, sale=sale)
+                    stats.record_sale(sale, movement.quantity_before)
+
+                    # Queue email notification if buyer has email
+                    if sale.buyer and sale.buyer.email:
+                        subject = f"RoboStock: Component Purchase Receipt - {component.name}"
+                        message = f"""
 Hello {sale.buyer.name},
 
 You have successfully purchased an item from the RoboStock Laboratory Inventory.
@@ -527,19 +761,13 @@ Thank you for your business.
 
 Best regards,
 RoboStock Lab Management
-                    """
-                    send_mail(
-                        subject,
-                        message,
-                        None, # Uses DEFAULT_FROM_EMAIL
-                        [sale.buyer.email],
-                        fail_silently=True,
-                    )
-                except Exception as e:
-                    print(f"Error sending email: {e}")
-
-            messages.success(request, f"Sold {sale.quantity_sold} of {component.name} to {sale.buyer.name if sale.buyer else 'Unknown'}")
-            return redirect('component_detail', pk=pk)
+                        """
+                        outbox.enqueue(subject, message, sale.buyer.email)
+            except stock.InsufficientStock as e:
+                form.add_error('quantity_sold', f"Only {e.available} items available to sell.")
+            else:
+                messages.success(request, f"Sold {sale.quantity_sold} of {component.name} to {sale.buyer.name if sale.buyer else 'Unknown'}")
+                return redirect('component_detail', pk=pk)
     else:
         form = SellForm(component=component)
     
@@ -560,8 +788,9 @@ def restock_component(request, pk):
         if qty <= 0:
             messages.error(request, "Please enter a valid quantity greater than 0.")
         else:
-            component.quantity += qty
-            component.save()
+            with atomic():
+                movement = stock.apply_movement(component, qty, 'RESTOCK', user=request.user)
+                stats.record_component_changed(component, component.component_type, movement.quantity_before)
             messages.success(request, f"Restocked {qty} units of {component.name}. New quantity: {component.quantity}")
     except (ValueError, TypeError):
         messages.error(request, "Invalid quantity entered.")
@@ -571,31 +800,215 @@ def restock_component(request, pk):
 @require_POST
 def mark_sale_paid(request, pk):
     sale = get_object_or_404(Sale, pk=pk)
-    sale.is_paid = True
-    sale.save()
+    with atomic():
+        # Conditional update so a double-submitted form cannot count the payment twice.
+        if Sale.objects.filter(pk=sale.pk, is_paid=False).update(is_paid=True):
+            stats.record_payment(sale.total_price)
     messages.success(request, f"Sale of {sale.component.name} to {sale.buyer.name if sale.buyer else 'Unknown'} marked as paid.")
     return redirect('dashboard')
+
+
+RECONCILE_BALANCE_ROWS = 100
+
+@login_required
+@user_passes_test(is_admin_or_staff)
+def reconcile_payments(request):
+    """Settle a batch of received payments against unpaid sales, next to who still owes what."""
+    result = None
+    if request.method == 'POST':
+        form = PaymentReconcileForm(request.POST, request.FILES)
+        if form.is_valid():
+            dry_run = form.cleaned_data['dry_run']
+            try:
+                result = payments.reconcile(form.rows(), dry_run=dry_run)
+            except (ValueError, UnicodeDecodeError) as e:
+                form.add_error(None, f"Could not read the payments: {e}")
+            else:
+                verb = "Would mark" if dry_run else "Marked"
+                messages.success(request, f"{verb} {result.sales} sale(s) paid from {result.payments} payment(s) (₹{result.amount}).")
+                if result.error_count:
+                    messages.warning(request, f"{result.error_count} payment(s) were not matched.")
+                if not result.error_count and not dry_run:
+                    return redirect('reconcile_payments')
+    else:
+        form = PaymentReconcileForm()
+    return render(request, 'inventory/reconcile_payments.html', {
+        'form': form,
+        'result': result,
+        'balances': payments.outstanding_balances(RECONCILE_BALANCE_ROWS),
+        'balance_rows': RECONCILE_BALANCE_ROWS,
+    })
+
 @login_required
-def component_list(request):
+async def component_list(request):
     query = request.GET.get('q')
-    if query:
-        components = Component.objects.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query) | 
-            Q(category__name__icontains=query) |
-            Q(serial_number__icontains=query) |
-            Q(box_number__icontains=query)
-        )
+    selected = ComponentFilterForm(request.GET).selected()
+    context, facet_groups = await asyncio.gather(
+        acatalogue_page(request),
+        facets.groups(Component.objects.search(query), selected, query),
+    )
+    context.update(facet_groups=facet_groups, selected_facets=selected)
+    return await arender(request, 'inventory/component_list.html', context)
+
+def component_cards(request):
+    """HTML fragment with the next page of catalogue cards, fetched by infinite scroll."""
+    if request.user.is_authenticated:
+        return render(request, 'inventory/partials/component_cards.html', catalogue_page(request))
+    return catalogue_cache.cached_page(request, 'inventory/partials/public_component_cards.html', catalogue_page)
+
+LOW_STOCK_PAGE_SIZE = 50
+LOW_STOCK_ORDERING = panels.LOW_STOCK_ORDERING
+
+async def low_stock_page(request):
+    """Keyset page of low-stock components, read from the partial low-stock index."""
+    components = Component.objects.low_stock().select_related('category')
+    try:
+        page = await akeyset_paginate(components, LOW_STOCK_ORDERING, request.GET.get('cursor'), LOW_STOCK_PAGE_SIZE)
+    except InvalidCursor:
+        page = await akeyset_paginate(components, LOW_STOCK_ORDERING, None, LOW_STOCK_PAGE_SIZE)
+    return page
+
+@login_required
+async def low_stock_list(request):
+    page, snapshot = await asyncio.gather(low_stock_page(request), stats.acurrent())
+    return await arender(request, 'inventory/low_stock.html', {
+        'components': page,
+        'next_query': urlencode({'cursor': page.next_cursor}) if page.has_next else '',
+        'low_stock_count': snapshot.low_stock_count,
+    })
+
+@login_required
+async def low_stock_feed(request):
+    """JSON feed of components at or below their reorder level, most urgent first."""
+    page, snapshot = await asyncio.gather(low_stock_page(request), stats.acurrent())
+    return JsonResponse({
+        'count': snapshot.low_stock_count,
+        'results': [{
+            'id': c.pk,
+            'serial_number': c.serial_number,
+            'name': c.name,
+            'category': c.category.name,
+            'box_number': c.box_number,
+            'quantity': c.quantity,
+            'reorder_level': c.reorder_level,
+            'url': request.build_absolute_uri(reverse('component_detail', args=[c.pk])),
+        } for c in page],
+        'next': request.build_absolute_uri(f"{reverse('low_stock_feed')}?{urlencode({'cursor': page.next_cursor})}") if page.has_next else None,
+    })
+
+OVERDUE_PAGE_SIZE = 50
+OVERDUE_ORDERING = ('due_at', 'id')
+
+@login_required
+async def overdue_list(request):
+    """Open loans past their due date, read from the partial open-loan index."""
+    loans = Transaction.objects.overdue().select_related('component', 'borrower')
+    try:
+        page = await akeyset_paginate(loans, OVERDUE_ORDERING, request.GET.get('cursor'), OVERDUE_PAGE_SIZE)
+    except InvalidCursor:
+        page = await akeyset_paginate(loans, OVERDUE_ORDERING, None, OVERDUE_PAGE_SIZE)
+    return await arender(request, 'inventory/overdue.html', {
+        'loans': page,
+        'next_query': urlencode({'cursor': page.next_cursor}) if page.has_next else '',
+        'overdue_count': await Transaction.objects.overdue().acount(),
+    })
+
+SALE_PAGE_SIZE = 50
+
+@login_required
+async def sale_list(request):
+    sales = Sale.objects.select_related('component', 'buyer', 'authorized_by')
+    try:
+        page = await akeyset_paginate(sales, ('-sale_time', '-id'), request.GET.get('cursor'), SALE_PAGE_SIZE)
+    except InvalidCursor:
+        page = await akeyset_paginate(sales, ('-sale_time', '-id'), None, SALE_PAGE_SIZE)
+    return await arender(request, 'inventory/sale_list.html', {
+        'sales': page,
+        'next_query': urlencode({'cursor': page.next_cursor}) if page.has_next else '',
+        'export_form': ExportFilterForm(),
+    })
+
+@login_required
+@user_passes_test(is_admin_or_staff)
+def export_data(request, kind):
+    """Stream sales, transactions or stock as CSV, optionally filtered by date range and payment status."""
+    if kind not in exports.EXPORTS:
+        raise Http404("Unknown export.")
+    form = ExportFilterForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest("Invalid export filters.")
+    if isinstance(request, ASGIRequest):
+        lines = exports.acsv_lines(exports.arows(kind, **form.filters()))
     else:
-        components = Component.objects.all().order_by('name')
-        
-    return render(request, 'inventory/component_list.html', {
-        'components': components,
-        'query': query
+        lines = exports.csv_lines(exports.rows(kind, **form.filters()))
+    response = StreamingHttpResponse(lines, content_type='text/csv')
+    filename = f"robostock-{kind}-{timezone.localdate():%Y%m%d}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@login_required
+@user_passes_test(is_admin_or_staff)
+def metrics_view(request):
+    """Per-view latency, query and response-size histograms for Prometheus."""
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@login_required
+@user_passes_test(is_admin_or_staff)
+def reports(request):
+    """Revenue and checkout trends by day, week or month, read from the daily rollup tables."""
+    form = ReportFilterForm(request.GET or None)
+    filters = form.cleaned_data if form.is_valid() else {}
+    period = filters.get('period') or 'day'
+    end = filters.get('end') or timezone.localdate()
+    start = filters.get('start') or end - rollups.DEFAULT_SPANS[period]
+    points = rollups.series(period, start, end, filters.get('category'))
+
+    max_revenue = max((p['revenue'] for p in points), default=0) or 1
+    max_checkouts = max((p['checkouts'] for p in points), default=0) or 1
+    for point in points:
+        point['revenue_pct'] = round(point['revenue'] * 100 / max_revenue)
+        point['checkouts_pct'] = round(point['checkouts'] * 100 / max_checkouts)
+
+    return render(request, 'inventory/reports.html', {
+        'form': form,
+        'period': period,
+        'start': start,
+        'end': end,
+        'points': points,
+        'total_revenue': sum(p['revenue'] for p in points),
+        'total_checkouts': sum(p['checkouts'] for p in points),
+        'categories': rollups.top_categories(start, end),
     })
 
+
+def api_resource(request, name):
+    """The API resource called ``name``, or a JSON error response if the user may not read it."""
+    resource = api.RESOURCES.get(name)
+    if resource is None:
+        return None, JsonResponse({'error': f"Unknown resource '{name}'."}, status=404)
+    if resource.staff_only and not is_admin_or_staff(request.user):
+        return None, JsonResponse({'error': 'Staff access required.'}, status=403)
+    return resource, None
+
+@gzip_page
 @login_required
-def sale_list(request):
-    sales = Sale.objects.all().order_by('-sale_time')
-    return render(request, 'inventory/sale_list.html', {'sales': sales})
+def api_list(request, resource):
+    """Read-only JSON list of components, categories, transactions or sales."""
+    resource, error = api_resource(request, resource)
+    if error:
+        return error
+    try:
+        return api.list_response(request, resource)
+    except (api.InvalidRequest, InvalidCursor) as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
+@gzip_page
+@login_required
+def api_detail(request, resource, pk):
+    resource, error = api_resource(request, resource)
+    if error:
+        return error
+    try:
+        return api.detail_response(request, resource, pk)
+    except api.InvalidRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
@@ -40,10 +40,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'inventory',
 ]
 
 MIDDLEWARE = [
+    'inventory.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,9 +53,15 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'inventory.middleware.AsyncWhiteNoiseMiddleware',
 ]
 
+# Log a warning for requests slower than this many seconds or running at
+# least this many queries (0 turns either check off). Histograms for every
+# view are served at /metrics/ regardless.
+METRICS_SLOW_REQUEST_SECONDS = config('METRICS_SLOW_REQUEST_SECONDS', default=0.0, cast=float)
+METRICS_SLOW_REQUEST_QUERIES = config('METRICS_SLOW_REQUEST_QUERIES', default=0, cast=int)
+
 ROOT_URLCONF = 'robostock.urls'
 
 TEMPLATES = [
@@ -98,7 +106,16 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# collectstatic fingerprints every file and writes .gz/.br copies next to it;
+# WhiteNoise serves the fingerprinted names with a far-future immutable
+# Cache-Control. DEBUG serves the app directories as they are, no manifest needed.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -118,3 +135,6 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Days a checkout may be kept before it counts as overdue.
+LOAN_PERIOD_DAYS = config('LOAN_PERIOD_DAYS', default=14, cast=int)